@@ -0,0 +1,120 @@
+"""Micro-benchmark of the cfx.re status parsers against synthetic fixture pages.
+
+Run from the repository root:
+
+    python benchmark/bench_status_parser.py [iterations]
+
+The fixtures are generated, not captured from status.cfx.re: status_page.html
+wraps flat Statuspage component rows in enough filler (styles, scripts,
+incident history) to reach the size of the live page, and summary.json
+carries the same states. Because both come from one generator, the check
+that the HTML and JSON parsers agree on them only guards against
+regressions; the tokenizer is separately checked against
+reference_components.html, which follows Statuspage's own component, group
+and banner markup.
+
+Times the previous 13-search regex parser against the single-pass HTML
+tokenizer and the JSON feed parser, and shows where the old parser differed.
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cfx_status import parse_status_html, parse_summary_json
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# reference_components.html follows Statuspage's component list markup: a plain
+# component, a group whose header nests the expand icons before its name, the
+# group's children (with the description tooltip) and the page-status banner.
+REFERENCE_STATES = {
+    "🎮 FiveM": "🟢 Operativo",
+    "🌐 Web Services": "🟡 Rendimiento Degradado",
+    "💬 Forums": "🟡 Rendimiento Degradado",
+    "🖥️ FXServer": "🔴 Falla Mayor",
+    "overall": "🟡 Algunos sistemas con problemas",
+}
+
+def legacy_parse(content: str) -> dict:
+    """The parser FiveMStatus used before, kept here as the baseline"""
+    status_dict = {}
+    services = {
+        "FiveM": "🎮 FiveM",
+        "RedM": "🤠 RedM",
+        "Cfx.re Platform Server \\(FXServer\\)": "🖥️ FXServer",
+        "Game Services": "🎯 Game Services",
+        "CnL": "🔗 CnL",
+        "Policy": "📋 Policy",
+        "Keymaster": "🔑 Keymaster",
+        "Web Services": "🌐 Web Services",
+        "Forums": "💬 Forums",
+        "Server List Frontend": "📋 Server List",
+        "\"Runtime\"": "⚡ Runtime",
+        "IDMS": "🆔 IDMS",
+        "Portal": "🚪 Portal"
+    }
+    for service_pattern, display_name in services.items():
+        pattern = rf"{service_pattern}.*?(?:Operational|Degraded Performance|Partial Outage|Major Outage|Maintenance)"
+        match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
+        if match:
+            text = match.group(0)
+            if "Operational" in text:
+                status_dict[display_name] = "🟢 Operativo"
+            elif "Degraded Performance" in text:
+                status_dict[display_name] = "🟡 Rendimiento Degradado"
+            elif "Partial Outage" in text:
+                status_dict[display_name] = "🟠 Falla Parcial"
+            elif "Major Outage" in text:
+                status_dict[display_name] = "🔴 Falla Mayor"
+            elif "Maintenance" in text:
+                status_dict[display_name] = "🔧 Mantenimiento"
+            else:
+                status_dict[display_name] = "❓ Desconocido"
+        else:
+            status_dict[display_name] = "❓ No disponible"
+    if "All Systems Operational" in content:
+        status_dict["overall"] = "🟢 Todos los sistemas operativos"
+    elif "Some Systems Experiencing Issues" in content:
+        status_dict["overall"] = "🟡 Algunos sistemas con problemas"
+    elif "Major Service Outage" in content:
+        status_dict["overall"] = "🔴 Falla mayor del servicio"
+    else:
+        status_dict["overall"] = "❓ Estado general desconocido"
+    return status_dict
+
+def read(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+def check_reference_markup():
+    labels = parse_status_html(read('reference_components.html')).labels()
+    found = {name: labels[name] for name in REFERENCE_STATES}
+    assert found == REFERENCE_STATES, f"Tokenizer misread the reference markup: {found}"
+
+def main():
+    check_reference_markup()
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    html = read('status_page.html')
+    feed = read('summary.json')
+
+    cases = [
+        ("legacy regex (html)", lambda: legacy_parse(html.decode('utf-8', errors='replace'))),
+        ("tokenizer (html)", lambda: parse_status_html(html).labels()),
+        ("summary.json", lambda: parse_summary_json(feed).labels()),
+    ]
+    print(f"status_page.html: {len(html) / 1024:.0f} KiB, summary.json: {len(feed) / 1024:.1f} KiB, {iterations} iterations")
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations
+        print(f"  {name:<22} {best * 1e6:10.1f} µs/parse")
+
+    legacy, tokenized, feed_status = (fn() for _, fn in cases)
+    # Same generator behind both fixtures: this only catches regressions
+    assert tokenized == feed_status, f"HTML and JSON parsers disagree: {tokenized} != {feed_status}"
+    diff = {k: (legacy[k], tokenized[k]) for k in legacy if legacy[k] != tokenized[k]}
+    print(f"  legacy vs new: {diff or 'same result'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+from discord.ext import commands, tasks
+import asyncio
+import logging
+from typing import List
+from utils.config_store import config_store
+from utils.guild_settings import ConfigChange
+
+logger = logging.getLogger(__name__)
+
+CONFIG_POLL_SECONDS = 5
+
+class ConfigWatcher(commands.Cog):
+    """Poll the settings store and forward changes to the other cogs.
+
+    Every changed setting is dispatched as an ``on_config_change`` event with
+    a ConfigChange payload, so cogs can update their in-memory state without
+    restarting the bot.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        """Called when the cog is loaded"""
+        config_store.subscribe(self.forward_changes)
+        self.poll_config.start()
+
+    async def cog_unload(self):
+        """Called when the cog is unloaded"""
+        self.poll_config.cancel()
+        config_store.unsubscribe(self.forward_changes)
+
+    def forward_changes(self, changes: List[ConfigChange]):
+        """Store callback; may run outside the event loop thread"""
+        for change in changes:
+            self.bot.loop.call_soon_threadsafe(self.bot.dispatch, 'config_change', change)
+
+    @tasks.loop(seconds=CONFIG_POLL_SECONDS)
+    async def poll_config(self):
+        """Pick up manual edits to the settings store"""
+        try:
+            await asyncio.to_thread(config_store.refresh)
+        except Exception as e:
+            logger.error(f"Error checking settings for changes: {e}")
+
+    @commands.Cog.listener()
+    async def on_config_change(self, change: ConfigChange):
+        logger.debug(f"{change.key} changed for guild {change.guild_id}: {change.old!r} -> {change.new!r}")
+
+async def setup(bot):
+    await bot.add_cog(ConfigWatcher(bot))
@@ -3,74 +3,64 @@ from discord.ext import commands, tasks
 from discord import app_commands
 import aiohttp
 import asyncio
-import logging
-import re
+import hashlib
 import json
+import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Tuple
+from utils.cfx_status import parse_status
+from utils.config_store import config_store
 
 logger = logging.getLogger(__name__)
 
-async def load_config():
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading config: {e}")
-        return {}
+HEARTBEAT_SECONDS = 30 * 60  # Unchanged status is still re-published this often to show the monitor is alive
+
+class StatusMonitor:
+    """Status message of one guild and what it currently shows"""
+
+    __slots__ = ('channel_id', 'message_id', 'embed_hash', 'published_at')
+
+    def __init__(self, channel_id: int, message_id: int, embed_hash: Optional[str] = None, published_at: float = 0.0):
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.embed_hash = embed_hash  # Hash of the status rendered in the message
+        self.published_at = published_at
 
-async def save_config(config):
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
+def status_hash(status_data: Dict[str, str]) -> str:
+    """Stable fingerprint of a parsed status"""
+    return hashlib.sha256(json.dumps(status_data, sort_keys=True).encode('utf-8')).hexdigest()
 
 class FiveMStatus(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.status_url = "https://status.cfx.re"
-        self.server_monitors = {}  # guild_id -> {channel_id, message_id}
+        self.feed_url = f"{self.status_url}/api/v2/summary.json"
+        self.server_monitors: Dict[int, StatusMonitor] = {}
         self.last_status = {}
         self.config_loaded = False
+        # Conditional fetch state: validators per URL and hash of the last body parsed
+        self.validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}  # url -> (ETag, Last-Modified)
+        self.page_hash: Optional[str] = None
+        self.changed_at: float = 0.0  # When the parsed status last differed from the previous one
         
+    def load_monitors(self):
+        """Register the status message of every guild from the config file.
+
+        Messages are not fetched here: the first edit through a partial
+        message tells whether they still exist.
+        """
+        for guild_id, server_config in config_store.iter_servers():
+            channel_id = server_config.get('fivem_status_channel_id')
+            message_id = server_config.get('fivem_status_message_id')
+            if channel_id and message_id and guild_id not in self.server_monitors:
+                self.server_monitors[guild_id] = StatusMonitor(channel_id, message_id)
+                logger.info(f"Loaded FiveM monitor for guild {guild_id}: channel={channel_id}, message={message_id}")
+
     async def setup_monitor_from_config(self):
         """Load monitor configuration from config file"""
         try:
-            config = await load_config()
-            if 'servers' in config:
-                for guild_id_str, server_config in config['servers'].items():
-                    guild_id = int(guild_id_str)
-                    channel_id = server_config.get('fivem_status_channel_id')
-                    message_id = server_config.get('fivem_status_message_id')
-                    
-                    if channel_id and message_id:
-                        # Verificar que el canal y mensaje existen
-                        try:
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await channel.fetch_message(message_id)
-                                self.server_monitors[guild_id] = {
-                                    'channel_id': channel_id,
-                                    'message_id': message_id
-                                }
-                                logger.info(f"Loaded FiveM monitor for guild {guild_id}: channel={channel_id}, message={message_id}")
-                            else:
-                                logger.warning(f"FiveM status channel not found for guild {guild_id}, skipping")
-                        except discord.NotFound:
-                            logger.warning(f"FiveM status message not found for guild {guild_id}, clearing message ID")
-                            # Limpiar mensaje ID inválido
-                            config['servers'][guild_id_str]['fivem_status_message_id'] = None
-                            await save_config(config)
-                        except Exception as e:
-                            logger.error(f"Error validating FiveM status message for guild {guild_id}: {e}")
-                        
+            self.load_monitors()
         except Exception as e:
             logger.error(f"Error loading FiveM monitor config: {e}")
         
@@ -86,76 +76,81 @@ class FiveMStatus(commands.Cog):
         """Called when the cog is unloaded"""
         self.status_monitor.cancel()
     
+    def partial_message(self, monitor: StatusMonitor) -> discord.PartialMessage:
+        channel = self.bot.get_channel(monitor.channel_id) or self.bot.get_partial_messageable(monitor.channel_id)
+        return channel.get_partial_message(monitor.message_id)
+
+    def drop_monitor(self, guild_id: int, monitor: StatusMonitor):
+        """Forget a monitor whose message is gone and clear it from the config"""
+        if self.server_monitors.get(guild_id) is monitor:
+            del self.server_monitors[guild_id]
+        try:
+            config_store.set(guild_id, 'fivem_status_message_id', None)
+        except Exception as config_error:
+            logger.error(f"Error updating config after message deletion: {config_error}")
+
     async def fetch_fivem_status(self) -> Dict[str, str]:
         """Fetch the current FiveM service status"""
+        status_data, _ = await self.fetch_status_if_changed()
+        return status_data
+    
+    async def _get(self, session: aiohttp.ClientSession, url: str) -> Tuple[Optional[bytes], bool]:
+        """Conditional GET: (body, not_modified); body is None on errors"""
+        headers = {}
+        etag, last_modified = self.validators.get(url, (None, None))
+        if self.last_status:
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.status_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        return self.parse_status_content(content)
-                    else:
-                        logger.error(f"Error fetching status: HTTP {response.status}")
-                        return {}
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return None, True
+                if response.status != 200:
+                    logger.warning(f"Error fetching {url}: HTTP {response.status}")
+                    return None, False
+                body = await response.read()
+                self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return body, False
         except Exception as e:
-            logger.error(f"Error fetching FiveM status: {e}")
-            return {}
+            logger.warning(f"Error fetching {url}: {e}")
+            return None, False
     
-    def parse_status_content(self, content: str) -> Dict[str, str]:
-        """Parse the status page content to extract service statuses"""
-        status_dict = {}
-        
-        # Map of service patterns and their display names
-        services = {
-            "FiveM": "🎮 FiveM",
-            "RedM": "🤠 RedM", 
-            "Cfx.re Platform Server \\(FXServer\\)": "🖥️ FXServer",
-            "Game Services": "🎯 Game Services",
-            "CnL": "🔗 CnL",
-            "Policy": "📋 Policy",
-            "Keymaster": "🔑 Keymaster",
-            "Web Services": "🌐 Web Services",
-            "Forums": "💬 Forums",
-            "Server List Frontend": "📋 Server List",
-            "\"Runtime\"": "⚡ Runtime",
-            "IDMS": "🆔 IDMS",
-            "Portal": "🚪 Portal"
-        }
-        
-        # Look for operational status indicators
-        for service_pattern, display_name in services.items():
-            # Create regex pattern to find service status
-            pattern = rf"{service_pattern}.*?(?:Operational|Degraded Performance|Partial Outage|Major Outage|Maintenance)"
-            match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-            
-            if match:
-                text = match.group(0)
-                if "Operational" in text:
-                    status_dict[display_name] = "🟢 Operativo"
-                elif "Degraded Performance" in text:
-                    status_dict[display_name] = "🟡 Rendimiento Degradado"
-                elif "Partial Outage" in text:
-                    status_dict[display_name] = "🟠 Falla Parcial"
-                elif "Major Outage" in text:
-                    status_dict[display_name] = "🔴 Falla Mayor"
-                elif "Maintenance" in text:
-                    status_dict[display_name] = "🔧 Mantenimiento"
-                else:
-                    status_dict[display_name] = "❓ Desconocido"
-            else:
-                status_dict[display_name] = "❓ No disponible"
-        
-        # Check overall system status
-        if "All Systems Operational" in content:
-            status_dict["overall"] = "🟢 Todos los sistemas operativos"
-        elif "Some Systems Experiencing Issues" in content:
-            status_dict["overall"] = "🟡 Algunos sistemas con problemas"
-        elif "Major Service Outage" in content:
-            status_dict["overall"] = "🔴 Falla mayor del servicio"
-        else:
-            status_dict["overall"] = "❓ Estado general desconocido"
-            
-        return status_dict
+    async def fetch_status_if_changed(self) -> Tuple[Dict[str, str], bool]:
+        """Conditional fetch of the status, JSON feed first and HTML page as fallback.
+
+        Returns ``(status, page_changed)``. A 304 or an identical body
+        reuses the last parsed status without parsing again; on errors the
+        status is empty.
+        """
+        async with aiohttp.ClientSession() as session:
+            for url, is_json in ((self.feed_url, True), (self.status_url, False)):
+                body, not_modified = await self._get(session, url)
+                if not_modified and self.last_status:
+                    return self.last_status, False
+                if body is None:
+                    continue
+
+                page_hash = hashlib.sha256(url.encode('utf-8') + body).hexdigest()
+                if page_hash == self.page_hash and self.last_status:
+                    return self.last_status, False
+                # Fuera del bucle de eventos para no retrasar el heartbeat del gateway
+                report = await asyncio.to_thread(parse_status, body, is_json)
+                if report is None:
+                    logger.warning(f"Invalid status feed from {url}, falling back to the status page")
+                    continue
+
+                self.page_hash = page_hash
+                status = report.labels()
+                if status != self.last_status:
+                    # La página cambia más a menudo que el estado (incidentes, horas)
+                    self.changed_at = time.time()
+                self.last_status = status
+                return self.last_status, True
+
+        logger.error("Error fetching FiveM status from every source")
+        return {}, False
     
     def create_status_embed(self, status_data: Dict[str, str]) -> discord.Embed:
         """Create an embed with the current FiveM status"""
@@ -171,10 +166,14 @@ class FiveMStatus(commands.Cog):
         else:
             color = 0x808080  # Gray
         
+        # Las ediciones se omiten mientras el estado no cambia, así que se muestra
+        # cuándo cambió (sigue siendo cierto) y no la última comprobación
+        changed_at = int(self.changed_at or time.time())
         embed = discord.Embed(
             title="📊 Estado de los Servidores FiveM",
             description=f"**Estado General:** {status_data.get('overall', 'Desconocido')}\n\n"
-                       f"Información actualizada desde [status.cfx.re]({self.status_url})",
+                       f"Información actualizada desde [status.cfx.re]({self.status_url})\n"
+                       f"Último cambio detectado: <t:{changed_at}:R>",
             color=color,
             timestamp=datetime.utcnow()
         )
@@ -219,7 +218,7 @@ class FiveMStatus(commands.Cog):
             )
         
         embed.set_footer(
-            text="🔄 Actualizado automáticamente cada 5 minutos • PT Scripts BOT",
+            text="🔄 Comprobado cada 5 minutos • PT Scripts BOT",
             icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None
         )
         
@@ -228,43 +227,38 @@ class FiveMStatus(commands.Cog):
     async def load_config_and_start(self):
         """Load configuration on first monitor run"""
         try:
-            config = await load_config()
-            if 'servers' in config:
-                for guild_id_str, server_config in config['servers'].items():
-                    guild_id = int(guild_id_str)
-                    channel_id = server_config.get('fivem_status_channel_id')
-                    message_id = server_config.get('fivem_status_message_id')
-                    
-                    if channel_id and message_id:
-                        # Verificar que el canal y mensaje existen
-                        try:
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await channel.fetch_message(message_id)
-                                self.server_monitors[guild_id] = {
-                                    'channel_id': channel_id,
-                                    'message_id': message_id
-                                }
-                                logger.info(f"Loaded FiveM monitor for guild {guild_id}: channel={channel_id}, message={message_id}")
-                            else:
-                                logger.warning(f"FiveM status channel not found for guild {guild_id}, skipping")
-                        except discord.NotFound:
-                            logger.warning(f"FiveM status message not found for guild {guild_id}, clearing message ID")
-                            # Limpiar mensaje ID inválido
-                            config['servers'][guild_id_str]['fivem_status_message_id'] = None
-                            await save_config(config)
-                        except Exception as e:
-                            logger.error(f"Error validating FiveM status message for guild {guild_id}: {e}")
-                        
-            self.config_loaded = True
-                        
+            self.load_monitors()
         except Exception as e:
             logger.error(f"Error loading FiveM monitor config on startup: {e}")
-            self.config_loaded = True  # Mark as loaded even if failed to prevent repeated attempts
+        self.config_loaded = True  # Mark as loaded even if failed to prevent repeated attempts
     
+    @commands.Cog.listener()
+    async def on_config_change(self, change):
+        """Keep server_monitors in sync with edits to the settings store"""
+        if change.key not in ('fivem_status_channel_id', 'fivem_status_message_id'):
+            return
+
+        server_config = config_store.get_server(change.guild_id)
+        channel_id = server_config.get('fivem_status_channel_id')
+        message_id = server_config.get('fivem_status_message_id')
+        if channel_id and message_id:
+            monitor = self.server_monitors.get(change.guild_id)
+            if monitor is None or (monitor.channel_id, monitor.message_id) != (channel_id, message_id):
+                self.server_monitors[change.guild_id] = StatusMonitor(channel_id, message_id)
+                logger.info(f"FiveM monitor updated from config for guild {change.guild_id}: channel={channel_id}, message={message_id}")
+        elif self.server_monitors.pop(change.guild_id, None) is not None:
+            logger.info(f"FiveM monitor removed from config for guild {change.guild_id}")
+
     @tasks.loop(minutes=5)
     async def status_monitor(self):
         """Monitor FiveM status every 5 minutes and update all server messages"""
+        await self.update_monitors()
+
+    async def update_monitors(self, force: bool = False):
+        """Edit the status messages whose status changed or whose heartbeat is due.
+
+        ``force`` edits every message regardless.
+        """
         try:
             # Check if we need to load configuration
             if not self.config_loaded or not self.server_monitors:
@@ -274,45 +268,41 @@ class FiveMStatus(commands.Cog):
                     return
             
             logger.info("Status monitor: Checking FiveM status...")
-            status_data = await self.fetch_fivem_status()
+            status_data, page_changed = await self.fetch_status_if_changed()
             if not status_data:
                 logger.error("Status monitor: Failed to fetch status data")
                 return
             
-            # Always update the message (not just when status changes) to show it's active
-            self.last_status = status_data
-            embed = self.create_status_embed(status_data)
+            digest = status_hash(status_data)
+            now = time.time()
+            embed = None
+            skipped = 0
             
-            # Update messages for all configured servers
-            for guild_id, monitor_config in self.server_monitors.items():
-                channel_id = monitor_config['channel_id']
-                message_id = monitor_config['message_id']
-                
-                # Get the channel and message
-                channel = self.bot.get_channel(channel_id)
-                if not channel:
-                    logger.error(f"Status monitor: Channel {channel_id} not found for guild {guild_id}")
+            # Solo se edita si el estado cambió o toca el latido; así se evitan los 429
+            for guild_id, monitor in list(self.server_monitors.items()):
+                if (not force and monitor.embed_hash == digest
+                        and now - monitor.published_at < HEARTBEAT_SECONDS):
+                    skipped += 1
                     continue
+                if embed is None:
+                    embed = self.create_status_embed(status_data)
                 
                 try:
-                    message = await channel.fetch_message(message_id)
-                    await message.edit(embed=embed)
+                    # Edición directa sobre un mensaje parcial: sin fetch_message previo
+                    await self.partial_message(monitor).edit(embed=embed)
+                    monitor.embed_hash = digest
+                    monitor.published_at = now
                     logger.info(f"Status monitor: FiveM status message updated successfully for guild {guild_id}")
                 except discord.NotFound:
-                    # Message was deleted, remove from config and memory
+                    # Message or channel was deleted, remove from config and memory
                     logger.warning(f"Status monitor: Message not found for guild {guild_id}, removing from config")
-                    del self.server_monitors[guild_id]
-                    # Update config file
-                    try:
-                        config = await load_config()
-                        if 'servers' in config and str(guild_id) in config['servers']:
-                            config['servers'][str(guild_id)]['fivem_status_message_id'] = None
-                            await save_config(config)
-                    except Exception as config_error:
-                        logger.error(f"Error updating config after message deletion: {config_error}")
+                    self.drop_monitor(guild_id, monitor)
                 except Exception as e:
                     logger.error(f"Status monitor: Error updating message for guild {guild_id}: {e}")
             
+            if skipped:
+                logger.debug(f"Status monitor: status unchanged (page {'changed' if page_changed else 'unchanged'}), skipped {skipped} message(s)")
+            
         except Exception as e:
             logger.error(f"Status monitor: Unexpected error: {e}")
     
@@ -384,25 +374,13 @@ class FiveMStatus(commands.Cog):
             
             # Store the message and channel info for this guild
             guild_id = interaction.guild.id
-            self.server_monitors[guild_id] = {
-                'channel_id': canal.id,
-                'message_id': message.id
-            }
+            self.server_monitors[guild_id] = StatusMonitor(canal.id, message.id, status_hash(status_data), time.time())
             self.last_status = status_data
             
             # Save to config file for persistence
             try:
-                config = await load_config()
-                guild_id_str = str(interaction.guild.id)
-                if 'servers' not in config:
-                    config['servers'] = {}
-                if guild_id_str not in config['servers']:
-                    config['servers'][guild_id_str] = {}
-                
-                config['servers'][guild_id_str]['fivem_status_channel_id'] = canal.id
-                config['servers'][guild_id_str]['fivem_status_message_id'] = message.id
-                
-                await save_config(config)
+                config_store.set(guild_id, 'fivem_status_channel_id', canal.id)
+                config_store.set(guild_id, 'fivem_status_message_id', message.id)
                 logger.info(f"FiveM monitor config saved: channel={canal.id}, message={message.id}")
             except Exception as e:
                 logger.error(f"Error saving FiveM monitor config: {e}")
@@ -456,17 +434,9 @@ class FiveMStatus(commands.Cog):
             
             # Remove from config file
             try:
-                config = await load_config()
-                guild_id_str = str(interaction.guild.id)
-                if ('servers' in config and 
-                    guild_id_str in config['servers']):
-                    
-                    if 'fivem_status_channel_id' in config['servers'][guild_id_str]:
-                        del config['servers'][guild_id_str]['fivem_status_channel_id']
-                    if 'fivem_status_message_id' in config['servers'][guild_id_str]:
-                        del config['servers'][guild_id_str]['fivem_status_message_id']
-                    
-                    await save_config(config)
+                removed_channel = config_store.delete(guild_id, 'fivem_status_channel_id')
+                removed_message = config_store.delete(guild_id, 'fivem_status_message_id')
+                if removed_channel or removed_message:
                     logger.info("FiveM monitor config removed from file")
             except Exception as e:
                 logger.error(f"Error removing FiveM monitor config: {e}")
@@ -517,7 +487,7 @@ class FiveMStatus(commands.Cog):
             
             # Force run the status monitor
             logger.info(f"Manual FiveM status update requested by {interaction.user}")
-            await self.status_monitor()
+            await self.update_monitors(force=True)
             
             embed = discord.Embed(
                 title="✅ Actualización forzada",
@@ -546,8 +516,8 @@ class FiveMStatus(commands.Cog):
             )
             
             if guild_id in self.server_monitors:
-                monitor_config = self.server_monitors[guild_id]
-                channel = self.bot.get_channel(monitor_config['channel_id'])
+                monitor = self.server_monitors[guild_id]
+                channel = self.bot.get_channel(monitor.channel_id)
                 
                 embed.add_field(
                     name="Estado del Monitor",
@@ -556,7 +526,7 @@ class FiveMStatus(commands.Cog):
                 )
                 embed.add_field(
                     name="Canal Configurado",
-                    value=channel.mention if channel else f"❌ Canal no encontrado (ID: {monitor_config['channel_id']})",
+                    value=channel.mention if channel else f"❌ Canal no encontrado (ID: {monitor.channel_id})",
                     inline=True
                 )
                 embed.add_field(
@@ -566,7 +536,7 @@ class FiveMStatus(commands.Cog):
                 )
                 embed.add_field(
                     name="ID del Mensaje",
-                    value=f"`{monitor_config['message_id']}`",
+                    value=f"`{monitor.message_id}`",
                     inline=True
                 )
                 embed.add_field(
@@ -0,0 +1,47 @@
+import discord
+from discord.ext import commands
+import logging
+from utils.member_index import member_directory
+
+logger = logging.getLogger(__name__)
+
+class MemberDirectory(commands.Cog):
+    """Keep the shared member name index in sync with member events"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Los servidores ya están fragmentados (chunked) cuando llega on_ready
+        for guild in self.bot.guilds:
+            member_directory.index(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        member_directory.schedule_build(guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        member_directory.update(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.nick != after.nick or before.name != after.name or before.global_name != after.global_name:
+            member_directory.update(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if before.name != after.name or before.global_name != after.global_name:
+            member_directory.update_user(after)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        member_directory.remove(payload.guild_id, payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        member_directory.drop(guild.id)
+
+async def setup(bot):
+    await bot.add_cog(MemberDirectory(bot))
@@ -1,36 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
 import logging
-import json
 from datetime import datetime, timedelta
 from typing import Optional
+from utils.config_store import config_store
+from utils.dm_outbox import STATUS_FAILED, STATUS_SENT, dm_outbox
+from utils.guild_settings import GuildSettings
 
-logger = logging.getLogger(__name__)
+BAN_DM_WAIT_SECONDS = 5  # Máximo que el baneo espera al DM de aviso
 
-async def load_config():
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading config: {e}")
-        return {}
-
-async def save_config(config):
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
+logger = logging.getLogger(__name__)
 
-def has_moderation_permission(user: discord.Member, guild_id: int, config: dict) -> bool:
+def has_moderation_permission(user: discord.Member, settings: GuildSettings) -> bool:
     """Check if user has moderation permissions"""
     # Administrators always have permission
     if user.guild_permissions.administrator:
@@ -43,17 +25,7 @@ def has_moderation_permission(user: discord.Member, guild_id: int, config: dict)
         return True
     
     # Check configured moderation roles
-    guild_id_str = str(guild_id)
-    if ('servers' in config and 
-        guild_id_str in config['servers'] and 
-        'moderation_role_ids' in config['servers'][guild_id_str]):
-        
-        moderation_role_ids = config['servers'][guild_id_str]['moderation_role_ids']
-        for role_id in moderation_role_ids:
-            if discord.utils.get(user.roles, id=role_id):
-                return True
-    
-    return False
+    return settings.is_moderator(user)
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
@@ -73,8 +45,7 @@ class Moderation(commands.Cog):
         """Delete a specified number of messages from the channel"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, config_store.settings(interaction.guild.id)):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -130,14 +101,8 @@ class Moderation(commands.Cog):
                     icon_url=interaction.user.display_avatar.url
                 )
                 
-                confirmation = await interaction.followup.send(embed=embed)
-                
-                # Auto-eliminar mensaje de confirmación después de 5 segundos
-                await asyncio.sleep(5)
-                try:
-                    await confirmation.delete()
-                except:
-                    pass
+                # Los mensajes efímeros no hace falta borrarlos
+                await interaction.followup.send(embed=embed, ephemeral=True)
 
                 # Log de la acción
                 logger.info(
@@ -182,8 +147,7 @@ class Moderation(commands.Cog):
         """Ban a user from the server"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, config_store.settings(interaction.guild.id)):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -249,10 +213,12 @@ class Moderation(commands.Cog):
                 )
                 dm_embed.set_footer(text=f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
                 
-                await usuario.send(embed=dm_embed)
-                dm_sent = True
-            except (discord.Forbidden, discord.HTTPException):
-                dm_sent = False
+                # Envío directo, sin cola: tras el baneo ya no se le puede escribir
+                status = await dm_outbox.send_now(usuario.id, embed=dm_embed, kind='ban', timeout=BAN_DM_WAIT_SECONDS)
+                dm_status = "✅ Sí" if status == STATUS_SENT else "❌ No"
+            except Exception as e:
+                logger.error(f"Error enviando DM de baneo: {e}")
+                dm_status = "❌ No"
 
             # Ejecutar el baneo
             await usuario.ban(
@@ -276,7 +242,7 @@ class Moderation(commands.Cog):
             )
             embed.add_field(
                 name="DM enviado", 
-                value="✅ Sí" if dm_sent else "❌ No", 
+                value=dm_status, 
                 inline=True
             )
             embed.set_footer(
@@ -327,8 +293,7 @@ class Moderation(commands.Cog):
         """Timeout a user for a specified duration"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, config_store.settings(interaction.guild.id)):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -408,10 +373,18 @@ class Moderation(commands.Cog):
                     inline=False
                 )
                 
-                await usuario.send(embed=dm_embed)
-                dm_sent = True
-            except (discord.Forbidden, discord.HTTPException):
-                dm_sent = False
+                status = await dm_outbox.send_now(usuario.id, embed=dm_embed, kind='timeout')
+                if status == STATUS_SENT:
+                    dm_status = "✅ Sí"
+                elif status == STATUS_FAILED:
+                    # Sigue en el servidor: la cola lo reintentará
+                    await dm_outbox.send(usuario.id, embed=dm_embed, kind='timeout')
+                    dm_status = "📬 En cola para reintento"
+                else:
+                    dm_status = "❌ No"
+            except Exception as e:
+                logger.error(f"Error enviando DM de timeout: {e}")
+                dm_status = "❌ No"
 
             # Ejecutar el timeout
             await usuario.timeout(
@@ -436,7 +409,7 @@ class Moderation(commands.Cog):
             )
             embed.add_field(
                 name="DM enviado", 
-                value="✅ Sí" if dm_sent else "❌ No", 
+                value=dm_status, 
                 inline=True
             )
             embed.set_footer(
@@ -481,8 +454,7 @@ class Moderation(commands.Cog):
         """Remove timeout from a user"""
         try:
             # Verificar permisos de moderación
-            config = await load_config()
-            if not has_moderation_permission(interaction.user, interaction.guild.id, config):
+            if not has_moderation_permission(interaction.user, config_store.settings(interaction.guild.id)):
                 embed = discord.Embed(
                     title="❌ Sin permisos",
                     description="No tienes permisos para usar comandos de moderación.",
@@ -554,21 +526,8 @@ class Moderation(commands.Cog):
     ):
         """Add a role to moderation permissions"""
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-            if 'moderation_role_ids' not in config['servers'][guild_id_str]:
-                config['servers'][guild_id_str]['moderation_role_ids'] = []
-
             # Agregar el rol si no está ya en la lista
-            if role.id not in config['servers'][guild_id_str]['moderation_role_ids']:
-                config['servers'][guild_id_str]['moderation_role_ids'].append(role.id)
-                
-                await save_config(config)
-                
+            if config_store.add_to_list(interaction.guild.id, 'moderation_role_ids', role.id):
                 embed = discord.Embed(
                     title="✅ Rol de moderación agregado",
                     description=f"Rol agregado: {role.mention}\n"
@@ -604,12 +563,7 @@ class Moderation(commands.Cog):
     ):
         """Remove a role from moderation permissions"""
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            
-            if ('servers' not in config or 
-                guild_id_str not in config['servers'] or 
-                'moderation_role_ids' not in config['servers'][guild_id_str]):
+            if 'moderation_role_ids' not in config_store.get_server(interaction.guild.id):
                 embed = discord.Embed(
                     title="❌ No hay roles configurados",
                     description="No hay roles de moderación configurados en este servidor.",
@@ -618,11 +572,7 @@ class Moderation(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            if role.id in config['servers'][guild_id_str]['moderation_role_ids']:
-                config['servers'][guild_id_str]['moderation_role_ids'].remove(role.id)
-                
-                await save_config(config)
-                
+            if config_store.remove_from_list(interaction.guild.id, 'moderation_role_ids', role.id):
                 embed = discord.Embed(
                     title="✅ Rol de moderación removido",
                     description=f"Rol removido: {role.mention}",
@@ -655,9 +605,7 @@ class Moderation(commands.Cog):
     ):
         """Show current moderation configuration"""
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
+            server_config = config_store.get_server(interaction.guild.id)
             
             embed = discord.Embed(
                 title="🛡️ Configuración del Sistema de Moderación",
@@ -1,43 +1,380 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 import asyncio
+import aiohttp
+import re
+import os
 from datetime import datetime
+from utils.attachment_store import MIN_LOOKUP_PREFIX, attachment_store
+from utils.config_store import config_store
+from utils.dm_outbox import STATUS_BLOCKED, dm_outbox
+from utils.member_index import member_directory
+from utils.message_reaper import message_reaper
+from utils.role_jobs import ACTION_ADD, ACTION_REMOVE, STATUS_CANCELLED, STATUS_DONE, STATUS_RUNNING, RoleJob, role_jobs
+from utils.scheduler import DeadlineScheduler
+from utils.ticket_categories import CATEGORY_CHANNEL_LIMIT, ticket_categories
+from utils.ticket_pool import POOL_MAX_SIZE, ticket_pool
+from utils.ticket_templates import PARTICIPANT, TicketTemplate, ticket_templates
+from utils.ticket_registry import TicketRecord, ticket_registry
+from utils.ticket_queue import ticket_queue
+from utils.ticket_stats import ticket_stats
+from utils.timing import StageTimer
+from utils.transcript_archive import SearchHit, transcript_archive
+from utils.ticket_journal import ticket_journal
+from utils.transcript_html import render_html_transcript
+from utils.transcripts import TRANSCRIPT_MAX_BYTES, build_transcript
 
 logger = logging.getLogger(__name__)
 
-async def load_config():
-    with open('config.json', 'r') as f:
-        return json.load(f)
-
-async def create_transcript(channel: discord.TextChannel, user: discord.User) -> str:
-    messages = []
-    async for message in channel.history(limit=None, oldest_first=True):
-        timestamp = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        author = f"{message.author.display_name} ({message.author.name}#{message.author.discriminator})"
-        content = message.content or "[No content]"
-        if message.embeds:
-            for embed in message.embeds:
-                if embed.title:
-                    content += f"\n[Embed: {embed.title}]"
-                if embed.description:
-                    content += f"\n{embed.description}"
-        if message.attachments:
-            for attachment in message.attachments:
-                content += f"\n[Attachment: {attachment.filename}]"
-        messages.append(f"[{timestamp}] {author}: {content}")
-
-    transcript = (
-        f"Transcript del Ticket: {channel.name}\n"
-        f"Usuario: {user.display_name} ({user.name}#{user.discriminator})\n"
-        f"Creado: {channel.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        f"Cerrado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        + "=" * 50 + "\n\n" + "\n".join(messages)
+LEGACY_TOPIC_OWNER = re.compile(r'\((\d+)\)$')
+
+def ticket_channel_name(user: discord.abc.User) -> str:
+    # Usuarios con el nuevo sistema de nombres tienen discriminador '0'
+    if user.discriminator and user.discriminator != '0':
+        return f'ticket-{user.name.lower()}-{user.discriminator}'
+    return f'ticket-{user.name.lower()}'
+
+CLOSE_COUNTDOWN_SECONDS = 5
+TRANSCRIPT_TIMEOUT_SECONDS = 60
+DELIVERY_TIMEOUT_SECONDS = 30
+ATTACHMENT_TIMEOUT_SECONDS = 60
+PING_LIFETIME_SECONDS = 10
+CHANNEL_DELETE_ATTEMPTS = 5
+INACTIVITY_WARNING_HOURS = 12  # Warning sent this long before an inactivity close (at most half the timeout)
+
+# Inactivity deadlines of every open ticket, keyed by channel ID; run by the Tickets cog
+inactivity_scheduler = DeadlineScheduler("ticket-inactivity")
+
+def inactivity_warning_lead(timeout: float) -> float:
+    return min(INACTIVITY_WARNING_HOURS * 3600, timeout / 2)
+
+def schedule_inactivity(ticket: TicketRecord):
+    """(Re)compute the next inactivity deadline of an open ticket"""
+    hours = config_store.get_server(ticket.guild_id).get('ticket_inactivity_hours')
+    if not hours or not ticket.is_open:
+        inactivity_scheduler.cancel(ticket.channel_id)
+        return
+    timeout = hours * 3600
+    lead = inactivity_warning_lead(timeout)
+    close_at = ticket.last_activity + timeout
+    if ticket.warned_at is None:
+        inactivity_scheduler.schedule(ticket.channel_id, close_at - lead)
+    else:
+        # Un aviso tardío (p. ej. tras un reinicio) siempre deja el margen completo
+        inactivity_scheduler.schedule(ticket.channel_id, max(close_at, ticket.warned_at + lead))
+
+async def send_transcript(destination, embed: discord.Embed, parts):
+    """Send the embed, then each transcript part on its own; a part that fails does not stop the rest"""
+    await destination.send(embed=embed)
+    failed = 0
+    for part_name, part in parts:
+        try:
+            await destination.send(file=part.to_file(part_name))
+        except discord.HTTPException as e:
+            failed += 1
+            logger.error(f"Error enviando {part_name} a {destination}: {e}")
+    if failed:
+        raise RuntimeError(f"{failed}/{len(parts)} parte(s) del transcript no se pudieron enviar")
+
+async def resolve_ticket_creator(client: discord.Client, guild: discord.Guild, owner_id: int) -> discord.abc.User:
+    member = guild.get_member(owner_id)
+    if member:
+        return member
+    # Si no está en el servidor, intentar obtenerlo de Discord
+    return await asyncio.wait_for(client.fetch_user(owner_id), DELIVERY_TIMEOUT_SECONDS)
+
+async def deliver(label: str, coro):
+    """Run one close-time delivery with its own timeout; failures are only logged"""
+    try:
+        await asyncio.wait_for(coro, DELIVERY_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.error(f"Tiempo agotado enviando transcript ({label})")
+    except Exception as e:
+        logger.error(f"Error enviando transcript ({label}): {e}")
+
+async def send_to_transcript_channel(channel, ticket_creator, closer, parts):
+    transcript_channel_id = config_store.settings(channel.guild.id).transcript_channel_id
+    transcript_channel = channel.guild.get_channel(transcript_channel_id) if transcript_channel_id else None
+    if not transcript_channel:
+        return
+    transcript_embed = discord.Embed(
+        title="📝 Transcript del Ticket",
+        description=(
+            f"**Canal:** {channel.name}\n"
+            f"**Usuario:** {ticket_creator.display_name}\n"
+            f"**Cerrado por:** {closer.display_name}\n"
+            f"**Fecha:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        ),
+        color=0x3498db
+    )
+    await send_transcript(transcript_channel, transcript_embed, parts)
+
+async def send_transcript_dm(channel, ticket_creator, closer, parts):
+    """Queue the transcript DM; if the creator has DMs closed, say so in the transcript channel"""
+    dm_embed = discord.Embed(
+        title="📝 Transcript de tu Ticket",
+        description=(
+            f"Tu ticket en **{channel.guild.name}** ha sido cerrado.\n"
+            "Aquí tienes el transcript completo de la conversación.\n\n"
+            f"**Cerrado por:** {closer.display_name}\n"
+            f"**Fecha de cierre:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        ),
+        color=0x3498db
+    )
+    dm_embed.set_footer(text=f"Servidor: {channel.guild.name}")
+    future = await dm_outbox.send(
+        ticket_creator.id, embed=dm_embed,
+        extra_messages=[[(part_name, part.buffer)] for part_name, part in parts],
+        kind='transcript'
     )
-    return transcript
+
+    async def on_delivery(status: str):
+        if status != STATUS_BLOCKED:
+            return
+        logger.warning(f"No se pudo enviar transcript DM a {ticket_creator} - DMs deshabilitados")
+        # Intentar notificar en el servidor si no se puede enviar DM
+        notification_embed = discord.Embed(
+            title="⚠️ No se pudo enviar transcript por DM",
+            description=(
+                f"{ticket_creator.mention}, tu ticket ha sido cerrado pero no pudimos enviarte el transcript por DM.\n"
+                "Por favor, habilita los mensajes directos para recibir transcripts en el futuro."
+            ),
+            color=0xffaa00
+        )
+        transcript_channel_id = config_store.settings(channel.guild.id).transcript_channel_id
+        transcript_channel = channel.guild.get_channel(transcript_channel_id) if transcript_channel_id else None
+        if transcript_channel:
+            await transcript_channel.send(embed=notification_embed)
+
+    dm_outbox.when_done(future, on_delivery)
+
+async def close_ticket_channel(client: discord.Client, channel: discord.TextChannel, ticket: TicketRecord,
+                               user: discord.abc.User, announce):
+    """Transcript, archive and deliver a ticket already marked closed, then delete its channel.
+
+    ``announce`` is the awaitable that tells the channel it is closing; it
+    starts the countdown that overlaps the transcript work.
+    """
+    timer = StageTimer(f"Close {channel.name}")
+    delete_at = asyncio.get_running_loop().time() + CLOSE_COUNTDOWN_SECONDS
+    await timer.timed('announce', announce)
+
+    text_parts = []
+    html_parts = []
+    try:
+        # El creador y el historial no dependen entre sí
+        ticket_creator, records = await asyncio.gather(
+            timer.timed('resolve', resolve_ticket_creator(client, channel.guild, ticket.owner_id)),
+            timer.timed('journal', asyncio.wait_for(ticket_journal.collect(channel), TRANSCRIPT_TIMEOUT_SECONDS)),
+            return_exceptions=True
+        )
+        if isinstance(ticket_creator, BaseException):
+            logger.error(f"No se pudo obtener el usuario {ticket.owner_id}: {ticket_creator}")
+            ticket_creator = None
+        if isinstance(records, BaseException):
+            logger.error(f"Error obteniendo el historial de {channel.name}: {records!r}")
+            records = None
+
+        if records:
+            # Copiar los adjuntos antes de que el canal se borre; lo que no llegue a tiempo se queda sin hash
+            try:
+                stored = await timer.timed('attachments', asyncio.wait_for(
+                    attachment_store.archive(records, channel.guild.id), ATTACHMENT_TIMEOUT_SECONDS
+                ))
+                if stored:
+                    logger.info(f"{stored} adjunto(s) archivados de {channel.name}")
+            except asyncio.TimeoutError:
+                logger.warning(f"Tiempo agotado archivando adjuntos de {channel.name}")
+            except Exception as e:
+                logger.error(f"Error archivando adjuntos de {channel.name}: {e}")
+
+        if ticket_creator and records is not None:
+            max_bytes = min(TRANSCRIPT_MAX_BYTES, channel.guild.filesize_limit)
+            text_parts, html_parts = await asyncio.gather(
+                timer.timed('render_text', asyncio.to_thread(build_transcript, channel, ticket_creator, records, max_bytes)),
+                timer.timed('render_html', asyncio.to_thread(
+                    render_html_transcript, channel, ticket_creator, records, max_bytes
+                ))
+            )
+
+        # A partir de aquí el canal ya no hace falta: la cuenta atrás corre en paralelo a los envíos
+        channel_deleter.schedule(
+            channel, f"Ticket cerrado por {user}",
+            delay=delete_at - asyncio.get_running_loop().time()
+        )
+
+        if text_parts:
+            parts = text_parts + html_parts
+            # El DM solo se encola (copia los ficheros); va antes porque comparte los buffers con el envío al canal
+            await timer.timed('dm', deliver('DM', send_transcript_dm(
+                channel, ticket_creator, user, parts
+            )))
+            await asyncio.gather(
+                timer.timed('archive', deliver('archivo', transcript_archive.add(
+                    channel.guild.id, channel.id, ticket.owner_id, user.id, channel.name,
+                    ticket.opened_at, ticket.closed_at, records
+                ))),
+                timer.timed('transcript_channel', deliver('canal de transcripts', send_to_transcript_channel(
+                    channel, ticket_creator, user, parts
+                )))
+            )
+
+    except Exception as e:
+        logger.error(f"Error creando transcript: {e}")
+        channel_deleter.schedule(
+            channel, f"Ticket cerrado por {user}",
+            delay=delete_at - asyncio.get_running_loop().time()
+        )
+    finally:
+        for _, part in text_parts + html_parts:
+            part.close()
+
+    logger.info(timer.summary())
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+def role_job_embed(job: RoleJob, guild: discord.Guild) -> discord.Embed:
+    """Progress or result of a bulk role job"""
+    role = guild.get_role(job.role_id)
+    role_text = role.mention if role else f"`{job.role_id}`"
+    verb = "Añadiendo" if job.action == ACTION_ADD else "Quitando"
+
+    if job.status == STATUS_RUNNING:
+        title, color = f"🔄 {verb} Rol a Usuarios", 0x3498db
+    elif job.status == STATUS_DONE:
+        title, color = "✅ Proceso Completado", 0x00ff00 if job.errors == 0 else 0xffaa00
+    elif job.status == STATUS_CANCELLED:
+        title, color = "🛑 Proceso Cancelado", 0xffaa00
+    else:
+        title, color = "❌ Proceso Fallido", 0xff0000
+
+    percent = job.cursor / job.total * 100 if job.total else 100
+    description = (
+        f"**Rol:** {role_text}\n"
+        f"**Progreso:** {job.cursor}/{job.total} ({percent:.1f}%)\n"
+        f"**Exitosos:** {job.success}\n"
+        f"**Omitidos:** {job.skipped}\n"
+        f"**Errores:** {job.errors}"
+    )
+    if job.status == STATUS_RUNNING:
+        eta = job.eta_seconds
+        description += f"\n**Tiempo restante estimado:** {format_duration(eta) if eta is not None else 'calculando...'}"
+    elif job.finished_at:
+        description += f"\n**Duración:** {format_duration(job.finished_at - job.started_at)}"
+    embed = discord.Embed(title=title, description=description, color=color)
+
+    if job.error_samples and job.status != STATUS_RUNNING:
+        error_text = "\n".join(job.error_samples)
+        if job.errors > len(job.error_samples):
+            error_text += f"\n... y {job.errors - len(job.error_samples)} más"
+        embed.add_field(name="❌ Errores", value=f"```{error_text}```", inline=False)
+
+    if job.status == STATUS_RUNNING:
+        embed.set_footer(text="Usa /role-job-cancel para detener el proceso")
+    else:
+        requester = guild.get_member(job.requested_by)
+        embed.set_footer(text=f"Ejecutado por {requester or job.requested_by}")
+    return embed
+
+class ChannelDeleter:
+    """Tracked background deletion of closed ticket channels.
+
+    Each deletion is a task that waits out the close countdown and retries
+    transient failures with exponential backoff. Closed tickets whose
+    channel still exists after a restart are scheduled again on startup.
+    """
+
+    def __init__(self, attempts: int = CHANNEL_DELETE_ATTEMPTS):
+        self.attempts = attempts
+        self._jobs: Dict[int, asyncio.Task] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def schedule(self, channel: discord.abc.GuildChannel, reason: str, delay: float = 0) -> asyncio.Task:
+        job = self._jobs.get(channel.id)
+        if job is None:
+            job = asyncio.create_task(self._run(channel, reason, delay), name=f"delete-channel-{channel.id}")
+            self._jobs[channel.id] = job
+            job.add_done_callback(lambda _: self._jobs.pop(channel.id, None))
+        return job
+
+    async def _run(self, channel: discord.abc.GuildChannel, reason: str, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        for attempt in range(1, self.attempts + 1):
+            try:
+                await channel.delete(reason=reason)
+                logger.info(f"Ticket {channel.name} eliminado ({reason})")
+                break
+            except discord.NotFound:
+                break
+            except discord.Forbidden:
+                logger.error(f"Sin permisos para eliminar el ticket {channel.name}")
+                return
+            except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                if attempt == self.attempts:
+                    logger.error(f"Error eliminando el ticket {channel.name} tras {attempt} intentos: {e}")
+                    return
+                backoff = 2 ** attempt
+                logger.warning(f"Error eliminando el ticket {channel.name} (intento {attempt}), reintentando en {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+        ticket_journal.discard(channel.id)
+
+channel_deleter = ChannelDeleter()
+
+def close_ticket_record(channel_id: int, closed_by: Optional[int] = None) -> Optional[TicketRecord]:
+    """Mark a ticket closed and count it in the stats; ``closed_by`` is the staff member, if any"""
+    ticket = ticket_registry.close(channel_id)
+    if ticket is not None:
+        ticket_stats.record_close(ticket.guild_id, ticket.closed_at - ticket.opened_at, closed_by)
+    return ticket
+
+def existing_ticket_channel(guild: discord.Guild, user: discord.abc.User) -> Optional[discord.TextChannel]:
+    """Open ticket channel of a user, if any"""
+    existing = ticket_registry.find_open(guild.id, user.id)
+    if not existing:
+        return None
+    channel = guild.get_channel(existing.channel_id)
+    if channel is None:
+        # El canal fue borrado sin cerrar el ticket
+        close_ticket_record(existing.channel_id)
+    return channel
+
+async def claim_pooled_channel(guild: discord.Guild, user: discord.Member,
+                               template: TicketTemplate, topic: str) -> Optional[discord.TextChannel]:
+    """Turn a pre-created hidden channel into the user's ticket (None if the pool is empty)"""
+    channel = ticket_pool.take(guild)
+    if channel is None:
+        return None
+    # Los canales reservados ya están en una categoría de tickets con hueco
+    category = channel.category
+    if category is None or category.id not in ticket_categories.fills(guild, template.category):
+        category = template.category
+    try:
+        await channel.edit(
+            name=ticket_channel_name(user),
+            category=category,
+            overwrites=template.overwrites_for(user),
+            topic=topic
+        )
+    except discord.HTTPException as e:
+        # Sigue marcado como reservado; se recupera en el próximo reinicio
+        logger.warning(f"Could not claim pooled channel {channel.id} in {guild.name}: {e}")
+        return None
+    return channel
 
 class TicketView(discord.ui.View):
     def __init__(self):
@@ -50,56 +387,72 @@ class TicketView(discord.ui.View):
         custom_id='create_ticket'
     )
     async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
         guild = interaction.guild
         user = interaction.user
 
-        existing_ticket = discord.utils.get(
-            guild.channels,
-            name=f'ticket-{user.name.lower()}-{user.discriminator}'
-        )
+        existing_ticket = existing_ticket_channel(guild, user)
         if existing_ticket:
-            await interaction.followup.send(
+            await interaction.response.send_message(
                 f"❌ Ya tienes un ticket abierto: {existing_ticket.mention}",
                 ephemeral=True
             )
             return
 
+        # La creación espera a que la respuesta inicial esté enviada para poder editarla
+        responded = asyncio.Event()
+
+        async def create():
+            await responded.wait()
+            await self.open_ticket(interaction)
+
+        position = ticket_queue.submit(guild.id, user.id, create)
         try:
-            config = await load_config()
-            guild_id_str = str(guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
-
-            category = None
-            if category_id := server_config.get('ticket_category_id'):
-                category = guild.get_channel(category_id)
-
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                user: discord.PermissionOverwrite(
-                    view_channel=True, send_messages=True,
-                    attach_files=True, embed_links=True
-                ),
-                guild.me: discord.PermissionOverwrite(
-                    view_channel=True, send_messages=True,
-                    manage_channels=True, manage_messages=True
+            if position is None:
+                await interaction.response.send_message(
+                    "⏳ Tu ticket ya se está creando, espera un momento.",
+                    ephemeral=True
                 )
-            }
-
-            for role_id in server_config.get('staff_role_ids', []):
-                role = guild.get_role(role_id)
-                if role:
-                    overwrites[role] = discord.PermissionOverwrite(
-                        view_channel=True, send_messages=True,
-                        manage_messages=True
+            elif position:
+                await interaction.response.send_message(
+                    f"⏳ Estás en la cola para crear tu ticket (posición {position})...",
+                    ephemeral=True
+                )
+            else:
+                await interaction.response.send_message("⏳ Creando tu ticket...", ephemeral=True)
+        finally:
+            responded.set()
+
+    async def open_ticket(self, interaction: discord.Interaction):
+        """Create the ticket channel; runs inside the guild's creation queue"""
+        guild = interaction.guild
+        user = interaction.user
+
+        existing_ticket = existing_ticket_channel(guild, user)
+        if existing_ticket:
+            await interaction.edit_original_response(content=f"❌ Ya tienes un ticket abierto: {existing_ticket.mention}")
+            return
+
+        try:
+            template = ticket_templates.get(guild)
+            topic = f'Support ticket for {user.display_name} ({user.id})'
+
+            ticket_channel = await claim_pooled_channel(guild, user, template, topic)
+            if ticket_channel is None:
+                async with ticket_categories.reserve(guild, template.category) as category:
+                    ticket_channel = await guild.create_text_channel(
+                        name=ticket_channel_name(user),
+                        category=category,
+                        overwrites=template.overwrites_for(user),
+                        topic=topic
                     )
+                    ticket_categories.channel_created(ticket_channel)
+            ticket = ticket_registry.open(guild.id, ticket_channel.id, user.id)
+            ticket_stats.record_open(guild.id, ticket.opened_at)
+            ticket_journal.start(ticket_channel.id)
+            schedule_inactivity(ticket)
 
-            ticket_channel = await guild.create_text_channel(
-                name=f'ticket-{user.name.lower()}-{user.discriminator}',
-                category=category,
-                overwrites=overwrites,
-                topic=f'Support ticket for {user.display_name} ({user.id})'
-            )
+            # Avisar al usuario en cuanto el canal existe; los mensajes iniciales van después
+            await interaction.edit_original_response(content=f"✅ Tu ticket ha sido creado: {ticket_channel.mention}")
 
             close_view = CloseTicketView()
 
@@ -114,32 +467,18 @@ class TicketView(discord.ui.View):
             )
             embed.set_footer(text=f"Ticket creado por {user.display_name}", icon_url=user.display_avatar.url)
 
-            # Mencionar todos los roles de staff configurados
-            staff_role_ids = server_config.get('staff_role_ids', [])
-            staff_mentions = []
-            
-            for role_id in staff_role_ids:
-                staff_role = guild.get_role(role_id)
-                if staff_role:
-                    staff_mentions.append(staff_role.mention)
-            
             # Enviar mensaje inicial con menciones de staff (si hay roles configurados)
-            if staff_mentions:
-                mentions_text = " ".join(staff_mentions)
-                await ticket_channel.send(f"{mentions_text} - Nuevo ticket creado por {user.mention}")
+            if template.staff_mentions:
+                await ticket_channel.send(f"{template.staff_mentions} - Nuevo ticket creado por {user.mention}")
 
             await ticket_channel.send(embed=embed, view=close_view)
-            await interaction.followup.send(
-                f"✅ Tu ticket ha sido creado: {ticket_channel.mention}",
-                ephemeral=True
-            )
             logger.info(f"Ticket created by {user} ({user.id}) in {guild.name}")
 
         except discord.Forbidden:
-            await interaction.followup.send("❌ No tengo permisos para crear canales!", ephemeral=True)
+            await interaction.edit_original_response(content="❌ No tengo permisos para crear canales!")
         except Exception as e:
             logger.error(f"Error creating ticket: {e}")
-            await interaction.followup.send("❌ Ocurrió un error al crear tu ticket!", ephemeral=True)
+            await interaction.edit_original_response(content="❌ Ocurrió un error al crear tu ticket!")
 
 class CloseTicketView(discord.ui.View):
     def __init__(self):
@@ -152,7 +491,8 @@ class CloseTicketView(discord.ui.View):
         custom_id='close_ticket'
     )
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not interaction.channel.name.startswith('ticket-'):
+        ticket = ticket_registry.get_open(interaction.channel.id)
+        if ticket is None:
             await interaction.response.send_message(
                 "❌ Este botón solo puede usarse en canales de ticket!",
                 ephemeral=True
@@ -163,18 +503,11 @@ class CloseTicketView(discord.ui.View):
         channel = interaction.channel
         can_close = False
 
-        if f'-{user.name.lower()}-{user.discriminator}' in channel.name:
+        if ticket.owner_id == user.id:
             can_close = True
 
-        if not can_close:
-            config = await load_config()
-            guild_id_str = str(channel.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
-            staff_role_ids = server_config.get('staff_role_ids', [])
-            for role_id in staff_role_ids:
-                if discord.utils.get(user.roles, id=role_id):
-                    can_close = True
-                    break
+        if not can_close and config_store.settings(channel.guild.id).is_staff(user):
+            can_close = True
 
         if not can_close and channel.permissions_for(user).manage_channels:
             can_close = True
@@ -186,114 +519,245 @@ class CloseTicketView(discord.ui.View):
             )
             return
 
+        close_ticket_record(channel.id, user.id if user.id != ticket.owner_id else None)
+
         embed = discord.Embed(
             title="🔒 Cerrando Ticket",
-            description="Este ticket se cerrará en 5 segundos...",
+            description=f"Este ticket se cerrará en {CLOSE_COUNTDOWN_SECONDS} segundos...",
             color=0xff0000
         )
         embed.set_footer(text=f"Cerrado por {user.display_name}", icon_url=user.display_avatar.url)
-        await interaction.response.send_message(embed=embed)
-
-        # Obtener el creador del ticket desde el topic del canal
-        ticket_creator = None
-        if channel.topic:
-            # El topic tiene formato: "Support ticket for DisplayName (UserID)"
-            import re
-            match = re.search(r'\((\d+)\)$', channel.topic)
-            if match:
-                user_id = int(match.group(1))
-                ticket_creator = channel.guild.get_member(user_id)
-                if not ticket_creator:
-                    # Si no está en el servidor, intentar obtenerlo de Discord
-                    try:
-                        ticket_creator = await self.bot.fetch_user(user_id)
-                    except Exception as e:
-                        logger.error(f"No se pudo obtener el usuario {user_id}: {e}")
+        await close_ticket_channel(
+            interaction.client, channel, ticket, user,
+            interaction.response.send_message(embed=embed)
+        )
 
-        try:
-            if ticket_creator:
-                transcript_content = await create_transcript(channel, ticket_creator)
-
-                import io
-                transcript_file = io.StringIO(transcript_content)
-                file = discord.File(transcript_file, filename=f"transcript-{channel.name}.txt")
-
-                config = await load_config()
-                guild_id_str = str(channel.guild.id)
-                server_config = config.get('servers', {}).get(guild_id_str, {})
-
-                transcript_channel_id = server_config.get('transcript_channel_id')
-                if transcript_channel_id:
-                    transcript_channel = channel.guild.get_channel(transcript_channel_id)
-                    if transcript_channel:
-                        transcript_embed = discord.Embed(
-                            title="📝 Transcript del Ticket",
-                            description=(
-                                f"**Canal:** {channel.name}\n"
-                                f"**Usuario:** {ticket_creator.display_name}\n"
-                                f"**Cerrado por:** {user.display_name}\n"
-                                f"**Fecha:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                            ),
-                            color=0x3498db
-                        )
-                        await transcript_channel.send(embed=transcript_embed, file=file)
-
-                # Siempre intentar enviar DM al creador del ticket
-                try:
-                    transcript_file_dm = io.StringIO(transcript_content)
-                    file_dm = discord.File(transcript_file_dm, filename=f"transcript-{channel.name}.txt")
-                    dm_embed = discord.Embed(
-                        title="📝 Transcript de tu Ticket",
-                        description=(
-                            f"Tu ticket en **{channel.guild.name}** ha sido cerrado.\n"
-                            "Aquí tienes el transcript completo de la conversación.\n\n"
-                            f"**Cerrado por:** {user.display_name}\n"
-                            f"**Fecha de cierre:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                        ),
-                        color=0x3498db
-                    )
-                    dm_embed.set_footer(text=f"Servidor: {channel.guild.name}")
-                    await ticket_creator.send(embed=dm_embed, file=file_dm)
-                    logger.info(f"Transcript DM enviado exitosamente a {ticket_creator} ({ticket_creator.id})")
-                except discord.Forbidden:
-                    logger.warning(f"No se pudo enviar transcript DM a {ticket_creator} - DMs deshabilitados")
-                    # Intentar notificar en el servidor si no se puede enviar DM
-                    try:
-                        notification_embed = discord.Embed(
-                            title="⚠️ No se pudo enviar transcript por DM",
-                            description=(
-                                f"{ticket_creator.mention}, tu ticket ha sido cerrado pero no pudimos enviarte el transcript por DM.\n"
-                                "Por favor, habilita los mensajes directos para recibir transcripts en el futuro."
-                            ),
-                            color=0xffaa00
-                        )
-                        if transcript_channel_id:
-                            transcript_channel = channel.guild.get_channel(transcript_channel_id)
-                            if transcript_channel:
-                                await transcript_channel.send(embed=notification_embed)
-                    except Exception as notif_error:
-                        logger.error(f"Error enviando notificación de DM fallido: {notif_error}")
-                except Exception as e:
-                    logger.error(f"Error enviando transcript DM: {e}")
+SEARCH_PAGE_SIZE = 5
 
-        except Exception as e:
-            logger.error(f"Error creando transcript: {e}")
+class TicketSearchView(discord.ui.View):
+    """Paginated /ticket-search results; each page is queried on demand"""
 
-        await asyncio.sleep(5)
+    def __init__(self, author_id: int, guild_id: int, query: str, owner_id: Optional[int]):
+        super().__init__(timeout=300)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.query = query
+        self.owner_id = owner_id
+        self.page = 0
+        self.has_more = False
 
-        try:
-            await channel.delete(reason=f"Ticket cerrado por {user}")
-            logger.info(f"Ticket {channel.name} cerrado por {user} ({user.id})")
-        except discord.NotFound:
-            pass
-        except Exception as e:
-            logger.error(f"Error cerrando ticket: {e}")
+    async def fetch(self):
+        hits, self.has_more = await transcript_archive.search(
+            self.guild_id, self.query, self.owner_id,
+            limit=SEARCH_PAGE_SIZE, offset=self.page * SEARCH_PAGE_SIZE
+        )
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = not self.has_more
+        return self.build_embed(hits)
+
+    def build_embed(self, hits: List[SearchHit]) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"🔎 Resultados para: {self.query}",
+            color=0x3498db
+        )
+        if not hits:
+            embed.description = "No se encontraron tickets que coincidan con la búsqueda."
+        for hit in hits:
+            closer = f"<@{hit.closer_id}>" if hit.closer_id else "Desconocido"
+            embed.add_field(
+                name=f"#{hit.channel_name}",
+                value=(
+                    f"**Usuario:** <@{hit.owner_id}> · **Cerrado por:** {closer}\n"
+                    f"**Cerrado:** <t:{int(hit.closed_at)}:f> · **Mensajes:** {hit.message_count}\n"
+                    f"{hit.snippet[:700]}"
+                ),
+                inline=False
+            )
+        embed.set_footer(text=f"Página {self.page + 1}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Solo quien hizo la búsqueda puede cambiar de página!", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label='Anterior', style=discord.ButtonStyle.secondary, emoji='◀️')
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(self.page - 1, 0)
+        await interaction.response.edit_message(embed=await self.fetch(), view=self)
+
+    @discord.ui.button(label='Siguiente', style=discord.ButtonStyle.secondary, emoji='▶️')
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await interaction.response.edit_message(embed=await self.fetch(), view=self)
 
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bot.add_view(TicketView())
         self.bot.add_view(CloseTicketView())
+        self.auto_closes = set()
+        self.started = False  # on_ready se repite en cada reconexión
+
+    async def cog_load(self):
+        """Called when the cog is loaded"""
+        for ticket in ticket_registry.open_tickets():
+            schedule_inactivity(ticket)
+        inactivity_scheduler.start(self.on_inactivity_deadline)
+
+    async def cog_unload(self):
+        """Called when the cog is unloaded"""
+        inactivity_scheduler.stop()
+        ticket_pool.stop()
+        ticket_categories.stop()
+
+    async def on_inactivity_deadline(self, channel_id: int):
+        """Warn about, then close, a ticket whose inactivity deadline passed"""
+        await self.bot.wait_until_ready()
+        ticket = ticket_registry.get_open(channel_id)
+        channel = self.bot.get_channel(channel_id)
+        if ticket is None or channel is None:
+            return
+        hours = config_store.get_server(ticket.guild_id).get('ticket_inactivity_hours')
+        if not hours:
+            return
+
+        if ticket.warned_at is None:
+            ticket_registry.mark_warned(channel_id)
+            schedule_inactivity(ticket)
+            close_at = int(inactivity_scheduler.due(channel_id))
+            await channel.send(
+                f"⏰ <@{ticket.owner_id}> Este ticket se cerrará automáticamente por inactividad <t:{close_at}:R> "
+                "si no hay nuevos mensajes."
+            )
+            logger.info(f"Aviso de inactividad enviado en {channel.name}")
+            return
+
+        close_ticket_record(channel_id)
+        embed = discord.Embed(
+            title="🔒 Cerrando Ticket",
+            description=(
+                f"Este ticket se cerrará en {CLOSE_COUNTDOWN_SECONDS} segundos por inactividad "
+                f"({hours} h sin mensajes)."
+            ),
+            color=0xff0000
+        )
+        # El cierre completo (transcript, envíos) corre aparte para no bloquear el planificador
+        task = asyncio.create_task(close_ticket_channel(
+            self.bot, channel, ticket, channel.guild.me, channel.send(embed=embed)
+        ))
+        self.auto_closes.add(task)
+        task.add_done_callback(self.auto_closes.discard)
+        logger.info(f"Ticket {channel.name} cerrado automáticamente por inactividad")
+
+    @commands.Cog.listener()
+    async def on_config_change(self, change):
+        ticket_templates.invalidate(change.guild_id)
+        ticket_categories.config_changed(change)
+        if change.key == 'ticket_pool_size':
+            guild = self.bot.get_guild(change.guild_id)
+            if guild:
+                ticket_pool.refill(guild)
+        if change.key == 'ticket_inactivity_hours':
+            for ticket in ticket_registry.open_tickets(change.guild_id):
+                schedule_inactivity(ticket)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Register ticket channels created before the ticket registry existed"""
+        if self.started:
+            return
+        self.started = True
+
+        adopted = 0
+        for guild in self.bot.guilds:
+            for channel in guild.text_channels:
+                if not channel.name.startswith('ticket-'):
+                    continue
+                record = ticket_registry.get(channel.id)
+                if record:
+                    if not record.is_open:
+                        # Cerrado antes de un reinicio sin llegar a borrar el canal
+                        channel_deleter.schedule(channel, "Ticket cerrado")
+                    continue
+                # El topic tiene formato: "Support ticket for DisplayName (UserID)"
+                match = LEGACY_TOPIC_OWNER.search(channel.topic or '')
+                if match:
+                    ticket = ticket_registry.open(guild.id, channel.id, int(match.group(1)), channel.created_at.timestamp())
+                    schedule_inactivity(ticket)
+                    adopted += 1
+        if adopted:
+            logger.info(f"Registered {adopted} existing ticket channel(s)")
+
+        for guild in self.bot.guilds:
+            ticket_pool.adopt(guild)
+            ticket_pool.refill(guild)
+
+        await self.resume_role_jobs()
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        ticket_templates.role_changed(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        ticket_templates.role_changed(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        ticket_categories.channel_created(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        ticket_categories.channel_moved(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        ticket_templates.channel_deleted(channel)
+        ticket_categories.channel_deleted(channel)
+        ticket_pool.discard(channel.guild.id, channel.id)
+        # Canal borrado manualmente sin usar el botón de cerrar
+        if close_ticket_record(channel.id):
+            ticket_journal.discard(channel.id)
+            logger.info(f"Ticket {channel.name} cerrado al borrar el canal")
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        ticket = ticket_registry.get_open(message.channel.id)
+        if ticket is None:
+            return
+        ticket_journal.record_message(message)
+        # Los mensajes del propio bot (avisos, cierres) no cuentan como actividad
+        if message.author.id == self.bot.user.id:
+            return
+        sent_at = message.created_at.timestamp()
+        schedule_inactivity(ticket_registry.touch(message.channel.id, sent_at))
+
+        # Primera respuesta del staff
+        if (ticket.first_response_at is None and message.author.id != ticket.owner_id
+                and not message.author.bot and isinstance(message.author, discord.Member)):
+            author = message.author
+            if (config_store.settings(message.guild.id).is_staff(author)
+                    or message.channel.permissions_for(author).manage_channels):
+                if ticket_registry.mark_responded(message.channel.id, sent_at):
+                    ticket_stats.record_first_response(ticket.guild_id, sent_at - ticket.opened_at)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if ticket_registry.get_open(payload.channel_id):
+            ticket_journal.record_edit(payload.channel_id, payload.message_id, payload.data)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if ticket_registry.get_open(payload.channel_id):
+            ticket_journal.record_delete(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        if ticket_registry.get_open(payload.channel_id):
+            for message_id in payload.message_ids:
+                ticket_journal.record_delete(payload.channel_id, message_id)
 
     @app_commands.command(name="ticket-panel", description="Crear un panel de tickets con botón")
     @app_commands.describe(channel="Canal para enviar el panel de tickets (opcional)")
@@ -359,16 +823,7 @@ class Tickets(commands.Cog):
         category: discord.CategoryChannel
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-
-            config['servers'][guild_id_str]['ticket_category_id'] = category.id
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            config_store.set(interaction.guild.id, 'ticket_category_id', category.id)
             await interaction.response.send_message(
                 f"✅ Categoría de tickets establecida en: {category.name}",
                 ephemeral=True
@@ -391,22 +846,8 @@ class Tickets(commands.Cog):
         role: discord.Role
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-            if 'staff_role_ids' not in config['servers'][guild_id_str]:
-                config['servers'][guild_id_str]['staff_role_ids'] = []
-
             # Agregar el rol si no está ya en la lista
-            if role.id not in config['servers'][guild_id_str]['staff_role_ids']:
-                config['servers'][guild_id_str]['staff_role_ids'].append(role.id)
-                
-                with open('config.json', 'w') as f:
-                    json.dump(config, f, indent=2)
-                
+            if config_store.add_to_list(interaction.guild.id, 'staff_role_ids', role.id):
                 await interaction.response.send_message(
                     f"✅ Rol de staff agregado: {role.mention}\n"
                     f"Los miembros con este rol ahora pueden cerrar y gestionar tickets.",
@@ -435,24 +876,14 @@ class Tickets(commands.Cog):
         role: discord.Role
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            
-            if ('servers' not in config or 
-                guild_id_str not in config['servers'] or 
-                'staff_role_ids' not in config['servers'][guild_id_str]):
+            if 'staff_role_ids' not in config_store.get_server(interaction.guild.id):
                 await interaction.response.send_message(
                     "❌ No hay roles de staff configurados en este servidor.",
                     ephemeral=True
                 )
                 return
 
-            if role.id in config['servers'][guild_id_str]['staff_role_ids']:
-                config['servers'][guild_id_str]['staff_role_ids'].remove(role.id)
-                
-                with open('config.json', 'w') as f:
-                    json.dump(config, f, indent=2)
-                
+            if config_store.remove_from_list(interaction.guild.id, 'staff_role_ids', role.id):
                 await interaction.response.send_message(
                     f"✅ Rol de staff removido: {role.mention}",
                     ephemeral=True
@@ -490,16 +921,7 @@ class Tickets(commands.Cog):
                 )
                 return
 
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            if 'servers' not in config:
-                config['servers'] = {}
-            if guild_id_str not in config['servers']:
-                config['servers'][guild_id_str] = {}
-
-            config['servers'][guild_id_str]['transcript_channel_id'] = channel.id
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            config_store.set(interaction.guild.id, 'transcript_channel_id', channel.id)
             
             await interaction.response.send_message(
                 f"✅ Canal de transcripts establecido en: {channel.mention}\n"
@@ -522,21 +944,12 @@ class Tickets(commands.Cog):
         interaction: discord.Interaction
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            
-            if ('servers' not in config or 
-                guild_id_str not in config['servers'] or 
-                'transcript_channel_id' not in config['servers'][guild_id_str]):
+            if not config_store.delete(interaction.guild.id, 'transcript_channel_id'):
                 await interaction.response.send_message(
                     "❌ No hay canal de transcripts configurado en este servidor.",
                     ephemeral=True
                 )
                 return
-
-            del config['servers'][guild_id_str]['transcript_channel_id']
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
             
             await interaction.response.send_message(
                 "✅ Canal de transcripts desactivado.\n"
@@ -552,6 +965,128 @@ class Tickets(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="set-ticket-inactivity", description="Cerrar automáticamente tickets sin actividad")
+    @app_commands.describe(horas="Horas sin mensajes antes de cerrar el ticket (0 para desactivar)")
+    @app_commands.default_permissions(manage_channels=True)
+    async def set_ticket_inactivity(
+        self,
+        interaction: discord.Interaction,
+        horas: app_commands.Range[int, 0, 720]
+    ):
+        try:
+            if horas == 0:
+                config_store.delete(interaction.guild.id, 'ticket_inactivity_hours')
+                await interaction.response.send_message(
+                    "✅ Cierre automático por inactividad desactivado.",
+                    ephemeral=True
+                )
+            else:
+                config_store.set(interaction.guild.id, 'ticket_inactivity_hours', horas)
+                await interaction.response.send_message(
+                    f"✅ Los tickets sin mensajes durante {horas} h se cerrarán automáticamente.\n"
+                    f"El creador recibirá un aviso {inactivity_warning_lead(horas * 3600) / 3600:g} h antes del cierre.",
+                    ephemeral=True
+                )
+            logger.info(f"Inactividad de tickets establecida a {horas} h por {interaction.user}")
+
+        except Exception as e:
+            logger.error(f"Error guardando inactividad de tickets: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al establecer el cierre por inactividad!",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="set-ticket-pool", description="Mantener canales de ticket pre-creados para abrir tickets al instante")
+    @app_commands.describe(cantidad=f"Canales ocultos reservados (0 para desactivar, máximo {POOL_MAX_SIZE})")
+    @app_commands.default_permissions(manage_channels=True)
+    async def set_ticket_pool(
+        self,
+        interaction: discord.Interaction,
+        cantidad: app_commands.Range[int, 0, POOL_MAX_SIZE]
+    ):
+        try:
+            if cantidad == 0:
+                config_store.delete(interaction.guild.id, 'ticket_pool_size')
+                await interaction.response.send_message(
+                    "✅ Reserva de canales desactivada. Los canales reservados se borrarán en segundo plano.",
+                    ephemeral=True
+                )
+            else:
+                config_store.set(interaction.guild.id, 'ticket_pool_size', cantidad)
+                await interaction.response.send_message(
+                    f"✅ Se mantendrán {cantidad} canales ocultos listos para nuevos tickets.\n"
+                    "Se crean poco a poco en segundo plano.",
+                    ephemeral=True
+                )
+            ticket_pool.refill(interaction.guild)
+            logger.info(f"Reserva de tickets establecida a {cantidad} por {interaction.user}")
+
+        except Exception as e:
+            logger.error(f"Error guardando reserva de tickets: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al configurar la reserva de canales!",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="ticket-search", description="Buscar en los transcripts de tickets cerrados")
+    @app_commands.describe(
+        consulta="Palabras a buscar en los transcripts",
+        usuario="Solo tickets creados por este usuario (opcional)"
+    )
+    @app_commands.default_permissions(manage_channels=True)
+    async def ticket_search(
+        self,
+        interaction: discord.Interaction,
+        consulta: str,
+        usuario: Optional[discord.Member] = None
+    ):
+        if not consulta.strip():
+            await interaction.response.send_message("❌ La búsqueda no puede estar vacía!", ephemeral=True)
+            return
+
+        try:
+            view = TicketSearchView(
+                interaction.user.id, interaction.guild.id, consulta,
+                usuario.id if usuario else None
+            )
+            embed = await view.fetch()
+            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error buscando transcripts: {e}")
+            await interaction.response.send_message(
+                "❌ Ocurrió un error al buscar en los transcripts!",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="ticket-attachment", description="Recuperar un adjunto archivado de un ticket cerrado")
+    @app_commands.describe(hash="Hash sha256 que aparece en el transcript (al menos los 16 primeros caracteres)")
+    @app_commands.default_permissions(manage_channels=True)
+    async def ticket_attachment(self, interaction: discord.Interaction, hash: str):
+        found = await attachment_store.find(hash.strip().removeprefix('sha256:'), interaction.guild.id)
+        if found is None:
+            await interaction.response.send_message(
+                f"❌ No se encontró ningún adjunto de este servidor con ese hash "
+                f"(se necesitan al menos {MIN_LOOKUP_PREFIX} caracteres).",
+                ephemeral=True
+            )
+            return
+
+        path, meta = found
+        size = meta.get('size') or os.path.getsize(path)
+        if size > interaction.guild.filesize_limit:
+            await interaction.response.send_message(
+                f"⚠️ El adjunto ocupa {size / 1024 / 1024:.1f} MB y supera el límite de subida del servidor.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            f"📎 `{meta.get('filename') or meta['sha256']}`",
+            file=discord.File(path, filename=meta.get('filename') or meta['sha256']),
+            ephemeral=True
+        )
+
     @app_commands.command(name="ticket-info", description="Mostrar configuración actual del sistema de tickets")
     @app_commands.default_permissions(manage_channels=True)
     async def ticket_info(
@@ -559,9 +1094,7 @@ class Tickets(commands.Cog):
         interaction: discord.Interaction
     ):
         try:
-            config = await load_config()
-            guild_id_str = str(interaction.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
+            server_config = config_store.get_server(interaction.guild.id)
             
             embed = discord.Embed(
                 title="🎫 Configuración del Sistema de Tickets",
@@ -573,6 +1106,11 @@ class Tickets(commands.Cog):
             if category_id:
                 category = interaction.guild.get_channel(category_id)
                 category_text = category.name if category else "⚠️ Categoría no encontrada"
+                fills = ticket_categories.fills(interaction.guild, ticket_templates.get(interaction.guild).category)
+                if len(fills) > 1:
+                    category_text += "\n" + "\n".join(
+                        f"<#{shard_id}>: {fill}/{CATEGORY_CHANNEL_LIMIT} canales" for shard_id, fill in fills.items()
+                    )
             else:
                 category_text = "No configurada"
             embed.add_field(
@@ -612,6 +1150,35 @@ class Tickets(commands.Cog):
                 value=transcript_text,
                 inline=False
             )
+
+            # Cierre automático por inactividad
+            inactivity_hours = server_config.get('ticket_inactivity_hours')
+            embed.add_field(
+                name="⏰ Cierre por Inactividad",
+                value=f"Tras {inactivity_hours} h sin mensajes" if inactivity_hours else "Desactivado",
+                inline=False
+            )
+
+            # Reserva de canales pre-creados
+            pool_size = ticket_pool.target_size(interaction.guild.id)
+            embed.add_field(
+                name="⚡ Reserva de Canales",
+                value=f"{ticket_pool.available(interaction.guild.id)}/{pool_size} listos" if pool_size else "Desactivada",
+                inline=False
+            )
+
+            # Rendimiento de la cola de creación
+            queue_stats = ticket_queue.stats(interaction.guild.id)
+            if queue_stats['count']:
+                embed.add_field(
+                    name="⏱️ Creación de Tickets",
+                    value=(
+                        f"Últimos {queue_stats['count']} tickets · {queue_stats['per_minute']:.1f}/min\n"
+                        f"Tiempo hasta el canal: p50 {queue_stats['p50']:.2f}s · p95 {queue_stats['p95']:.2f}s\n"
+                        f"En cola ahora: {queue_stats['waiting']}"
+                    ),
+                    inline=False
+                )
             
             embed.set_footer(text=f"Servidor: {interaction.guild.name}")
             
@@ -624,6 +1191,56 @@ class Tickets(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="ticket-stats", description="Ver estadísticas de tiempos de respuesta y duración de tickets")
+    @app_commands.default_permissions(manage_channels=True)
+    async def ticket_stats_command(self, interaction: discord.Interaction):
+        stats = ticket_stats.get(interaction.guild.id)
+        if not stats.opened and not stats.closed:
+            await interaction.response.send_message(
+                "ℹ️ Todavía no hay estadísticas de tickets en este servidor.",
+                ephemeral=True
+            )
+            return
+
+        embed = discord.Embed(title="📊 Estadísticas de Tickets", color=0x3498db)
+
+        last_day = stats.opened_since(24)
+        embed.add_field(
+            name="🎫 Volumen",
+            value=(
+                f"**Abiertos:** {stats.opened} · **Cerrados:** {stats.closed}\n"
+                f"**Últimas 24 h:** {last_day} ({last_day / 24:.1f}/h)\n"
+                f"**Últimos 7 días:** {stats.opened_since(7 * 24)}"
+            ),
+            inline=False
+        )
+
+        for name, histogram in (
+            ("⚡ Primera Respuesta del Staff", stats.first_response),
+            ("⏳ Duración de los Tickets", stats.open_duration)
+        ):
+            if histogram.total:
+                value = (
+                    f"p50 {format_duration(histogram.percentile(50))} · "
+                    f"p90 {format_duration(histogram.percentile(90))} · "
+                    f"p95 {format_duration(histogram.percentile(95))}\n"
+                    f"Media {format_duration(histogram.mean)} · {histogram.total} tickets"
+                )
+            else:
+                value = "Sin datos todavía"
+            embed.add_field(name=name, value=value, inline=False)
+
+        if stats.closes_by_staff:
+            top = sorted(stats.closes_by_staff.items(), key=lambda item: item[1], reverse=True)[:5]
+            embed.add_field(
+                name="🏆 Tickets Cerrados por Staff",
+                value="\n".join(f"<@{user_id}>: {count}" for user_id, count in top),
+                inline=False
+            )
+
+        embed.set_footer(text="Percentiles aproximados por intervalos")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="rename-ticket", description="Renombrar el canal de ticket actual")
     @app_commands.describe(nuevo_nombre="Nuevo nombre para el ticket (sin espacios ni caracteres especiales)")
     async def rename_ticket(
@@ -634,7 +1251,8 @@ class Tickets(commands.Cog):
         channel = interaction.channel
         
         # Verificar que estamos en un canal de ticket
-        if not channel.name.startswith('ticket-'):
+        ticket = ticket_registry.get_open(channel.id)
+        if ticket is None:
             await interaction.response.send_message(
                 "❌ Este comando solo puede usarse en canales de ticket!",
                 ephemeral=True
@@ -658,15 +1276,7 @@ class Tickets(commands.Cog):
         
         # Verificar si es staff configurado en el servidor
         try:
-            config = await load_config()
-            guild_id_str = str(channel.guild.id)
-            server_config = config.get('servers', {}).get(guild_id_str, {})
-            staff_role_ids = server_config.get('staff_role_ids', [])
-            
-            for role_id in staff_role_ids:
-                if discord.utils.get(user.roles, id=role_id):
-                    can_rename = True
-                    break
+            can_rename = config_store.settings(channel.guild.id).is_staff(user)
         except Exception as e:
             logger.error(f"Error verificando roles de staff: {e}")
         
@@ -726,7 +1336,8 @@ class Tickets(commands.Cog):
         channel = interaction.channel
         
         # Verificar que estamos en un canal de ticket
-        if not channel.name.startswith('ticket-'):
+        ticket = ticket_registry.get_open(channel.id)
+        if ticket is None:
             await interaction.response.send_message(
                 "❌ Este comando solo puede usarse en canales de ticket!",
                 ephemeral=True
@@ -738,20 +1349,13 @@ class Tickets(commands.Cog):
         can_manage = False
         
         # Verificar si es el dueño del ticket
-        if f'-{user.name.lower()}-{user.discriminator}' in channel.name:
+        if ticket.owner_id == user.id:
             can_manage = True
         
         # Verificar si es staff
         if not can_manage:
             try:
-                config = await load_config()
-                guild_id_str = str(channel.guild.id)
-                server_config = config.get('servers', {}).get(guild_id_str, {})
-                staff_role_ids = server_config.get('staff_role_ids', [])
-                for role_id in staff_role_ids:
-                    if discord.utils.get(user.roles, id=role_id):
-                        can_manage = True
-                        break
+                can_manage = config_store.settings(channel.guild.id).is_staff(user)
             except Exception as e:
                 logger.error(f"Error verificando roles de staff: {e}")
         
@@ -776,13 +1380,8 @@ class Tickets(commands.Cog):
         
         try:
             # Dar permisos al usuario
-            await channel.set_permissions(
-                usuario,
-                view_channel=True,
-                send_messages=True,
-                attach_files=True,
-                embed_links=True
-            )
+            await channel.set_permissions(usuario, overwrite=PARTICIPANT)
+            ticket_registry.add_participant(channel.id, usuario.id)
             
             embed = discord.Embed(
                 title="✅ Usuario Añadido al Ticket",
@@ -820,7 +1419,8 @@ class Tickets(commands.Cog):
         channel = interaction.channel
         
         # Verificar que estamos en un canal de ticket
-        if not channel.name.startswith('ticket-'):
+        ticket = ticket_registry.get_open(channel.id)
+        if ticket is None:
             await interaction.response.send_message(
                 "❌ Este comando solo puede usarse en canales de ticket!",
                 ephemeral=True
@@ -832,20 +1432,13 @@ class Tickets(commands.Cog):
         can_manage = False
         
         # Verificar si es el dueño del ticket
-        if f'-{user.name.lower()}-{user.discriminator}' in channel.name:
+        if ticket.owner_id == user.id:
             can_manage = True
         
         # Verificar si es staff
         if not can_manage:
             try:
-                config = await load_config()
-                guild_id_str = str(channel.guild.id)
-                server_config = config.get('servers', {}).get(guild_id_str, {})
-                staff_role_ids = server_config.get('staff_role_ids', [])
-                for role_id in staff_role_ids:
-                    if discord.utils.get(user.roles, id=role_id):
-                        can_manage = True
-                        break
+                can_manage = config_store.settings(channel.guild.id).is_staff(user)
             except Exception as e:
                 logger.error(f"Error verificando roles de staff: {e}")
         
@@ -861,7 +1454,7 @@ class Tickets(commands.Cog):
             return
         
         # Verificar que no se esté intentando quitar al dueño del ticket
-        if f'-{usuario.name.lower()}-{usuario.discriminator}' in channel.name:
+        if usuario.id == ticket.owner_id:
             await interaction.response.send_message(
                 "❌ No puedes quitar al propietario del ticket!",
                 ephemeral=True
@@ -887,6 +1480,7 @@ class Tickets(commands.Cog):
         try:
             # Quitar permisos al usuario
             await channel.set_permissions(usuario, overwrite=None)
+            ticket_registry.remove_participant(channel.id, usuario.id)
             
             embed = discord.Embed(
                 title="✅ Usuario Quitado del Ticket",
@@ -920,7 +1514,8 @@ class Tickets(commands.Cog):
         channel = interaction.channel
         
         # Verificar que estamos en un canal de ticket
-        if not channel.name.startswith('ticket-'):
+        ticket = ticket_registry.get_open(channel.id)
+        if ticket is None:
             await interaction.response.send_message(
                 "❌ Este comando solo puede usarse en canales de ticket!",
                 ephemeral=True
@@ -932,20 +1527,13 @@ class Tickets(commands.Cog):
         can_ping = False
         
         # Verificar si es el dueño del ticket
-        if f'-{user.name.lower()}-{user.discriminator}' in channel.name:
+        if ticket.owner_id == user.id:
             can_ping = True
         
         # Verificar si es staff
         if not can_ping:
             try:
-                config = await load_config()
-                guild_id_str = str(channel.guild.id)
-                server_config = config.get('servers', {}).get(guild_id_str, {})
-                staff_role_ids = server_config.get('staff_role_ids', [])
-                for role_id in staff_role_ids:
-                    if discord.utils.get(user.roles, id=role_id):
-                        can_ping = True
-                        break
+                can_ping = config_store.settings(channel.guild.id).is_staff(user)
             except Exception as e:
                 logger.error(f"Error verificando roles de staff: {e}")
         
@@ -970,38 +1558,8 @@ class Tickets(commands.Cog):
             if not user_input:
                 continue
                 
-            # Intentar encontrar el usuario por diferentes métodos
-            target_user = None
-            
-            # Si es una mención (formato <@123456789>)
-            if user_input.startswith('<@') and user_input.endswith('>'):
-                user_id = user_input.strip('<@!>')
-                try:
-                    target_user = guild.get_member(int(user_id))
-                except ValueError:
-                    pass
-            
-            # Buscar por ID directamente
-            if not target_user:
-                try:
-                    target_user = guild.get_member(int(user_input))
-                except ValueError:
-                    pass
-            
-            # Buscar por nombre de usuario
-            if not target_user:
-                target_user = discord.utils.get(guild.members, name=user_input)
-            
-            # Buscar por display name
-            if not target_user:
-                target_user = discord.utils.get(guild.members, display_name=user_input)
-            
-            # Buscar por nombre que contenga el input
-            if not target_user:
-                for member in guild.members:
-                    if user_input.lower() in member.name.lower() or user_input.lower() in member.display_name.lower():
-                        target_user = member
-                        break
+            # Mención, ID o nombre (índice compartido de miembros)
+            target_user = member_directory.resolve(guild, user_input)
             
             if target_user and target_user not in mentioned_users:
                 mentioned_users.append(target_user)
@@ -1024,20 +1582,9 @@ class Tickets(commands.Cog):
                 ephemeral=True
             )
             
-            # Enviar el mensaje de ping
+            # Enviar el mensaje de ping; se borra automáticamente a los 10 segundos
             ping_msg = await channel.send(ping_message)
-            
-            # Esperar 10 segundos y luego borrar el mensaje
-            await asyncio.sleep(10)
-            
-            try:
-                await ping_msg.delete()
-                logger.info(f"Mensaje de ping borrado automáticamente en {channel.name}")
-            except discord.NotFound:
-                # El mensaje ya fue borrado
-                pass
-            except discord.Forbidden:
-                logger.warning(f"No se pudo borrar el mensaje de ping en {channel.name} - sin permisos")
+            message_reaper.schedule(ping_msg, PING_LIFETIME_SECONDS)
             
             logger.info(f"Ping enviado a {len(mentioned_users)} usuarios en {channel.name} por {user}")
             
@@ -1053,21 +1600,17 @@ class Tickets(commands.Cog):
                 ephemeral=True
             )
 
-    @app_commands.command(name="add-role-all", description="Añadir un rol a todos los usuarios del servidor")
-    @app_commands.describe(rol="Rol que quieres añadir a todos los usuarios")
-    @app_commands.default_permissions(manage_roles=True)
-    async def add_role_all(
-        self,
-        interaction: discord.Interaction,
-        rol: discord.Role
-    ):
+    async def prepare_role_job(self, interaction: discord.Interaction, rol: discord.Role, action: str) -> Optional[RoleJob]:
+        """Validate a bulk role request, ask for confirmation and build the job"""
+        adding = action == ACTION_ADD
+
         # Verificar permisos del usuario
         if not interaction.user.guild_permissions.manage_roles:
             await interaction.response.send_message(
                 "❌ No tienes permisos para gestionar roles!",
                 ephemeral=True
             )
-            return
+            return None
         
         # Verificar permisos del bot
         if not interaction.guild.me.guild_permissions.manage_roles:
@@ -1075,7 +1618,7 @@ class Tickets(commands.Cog):
                 "❌ No tengo permisos para gestionar roles!",
                 ephemeral=True
             )
-            return
+            return None
         
         # Verificar jerarquía de roles
         if rol >= interaction.guild.me.top_role:
@@ -1083,7 +1626,7 @@ class Tickets(commands.Cog):
                 f"❌ No puedo gestionar el rol {rol.mention} porque está por encima de mi rol más alto!",
                 ephemeral=True
             )
-            return
+            return None
         
         # Verificar que el rol no esté por encima del rol del usuario
         if rol >= interaction.user.top_role and interaction.user != interaction.guild.owner:
@@ -1091,7 +1634,7 @@ class Tickets(commands.Cog):
                 f"❌ No puedes gestionar el rol {rol.mention} porque está por encima de tu rol más alto!",
                 ephemeral=True
             )
-            return
+            return None
         
         # Verificar que no sea el rol @everyone
         if rol == interaction.guild.default_role:
@@ -1099,7 +1642,15 @@ class Tickets(commands.Cog):
                 "❌ No puedes gestionar el rol @everyone!",
                 ephemeral=True
             )
-            return
+            return None
+
+        # Un solo proceso masivo por servidor
+        if role_jobs.is_running(interaction.guild.id):
+            await interaction.response.send_message(
+                "❌ Ya hay un proceso masivo de roles en curso. Usa `/role-job-status` o `/role-job-cancel`.",
+                ephemeral=True
+            )
+            return None
         
         guild = interaction.guild
         members = [member for member in guild.members if not member.bot]  # Excluir bots
@@ -1110,27 +1661,28 @@ class Tickets(commands.Cog):
                 "❌ No hay usuarios humanos en el servidor!",
                 ephemeral=True
             )
-            return
+            return None
         
-        # Contar cuántos usuarios ya tienen el rol
-        members_with_role = [member for member in members if rol in member.roles]
-        members_without_role = [member for member in members if rol not in member.roles]
+        # Usuarios a modificar
+        targets = [member.id for member in members if (member.get_role(rol.id) is None) == adding]
         
-        if len(members_without_role) == 0:
+        if len(targets) == 0:
             await interaction.response.send_message(
-                f"✅ Todos los usuarios ya tienen el rol {rol.mention}!",
+                f"✅ Todos los usuarios ya tienen el rol {rol.mention}!" if adding
+                else f"✅ Ningún usuario tiene el rol {rol.mention}!",
                 ephemeral=True
             )
-            return
+            return None
         
         # Confirmar la acción
         embed = discord.Embed(
             title="⚠️ Confirmación Requerida",
             description=(
-                f"Estás a punto de añadir el rol {rol.mention} a **{len(members_without_role)}** usuarios.\n\n"
+                f"Estás a punto de {'añadir' if adding else 'quitar'} el rol {rol.mention} "
+                f"{'a' if adding else 'de'} **{len(targets)}** usuarios.\n\n"
                 f"**Usuarios totales:** {total_members}\n"
-                f"**Ya tienen el rol:** {len(members_with_role)}\n"
-                f"**Recibirán el rol:** {len(members_without_role)}\n\n"
+                f"**Ya tienen el rol:** {total_members - len(targets) if adding else len(targets)}\n"
+                f"**{'Recibirán' if adding else 'Perderán'} el rol:** {len(targets)}\n\n"
                 "⚠️ **Esta acción no se puede deshacer fácilmente.**"
             ),
             color=0xffaa00
@@ -1152,101 +1704,106 @@ class Tickets(commands.Cog):
                 "❌ Tiempo agotado. Operación cancelada.",
                 ephemeral=True
             )
-            return
+            return None
         
         # Borrar mensaje de confirmación
         try:
             await confirmation.delete()
         except discord.NotFound:
             pass
-        
-        # Iniciar el proceso
-        embed_progress = discord.Embed(
-            title="🔄 Añadiendo Rol a Usuarios",
-            description="Iniciando proceso...",
-            color=0x3498db
+
+        return RoleJob(guild.id, rol.id, action, interaction.user.id, interaction.channel.id, targets)
+
+    async def run_role_job(self, interaction: discord.Interaction, job: RoleJob):
+        """Start a confirmed job and keep an ephemeral progress message updated"""
+        progress_msg = await interaction.followup.send(
+            embed=role_job_embed(job, interaction.guild),
+            ephemeral=True
         )
-        
-        progress_msg = await interaction.followup.send(embed=embed_progress, ephemeral=True)
-        
-        success_count = 0
-        error_count = 0
-        errors = []
-        
-        for i, member in enumerate(members_without_role):
+
+        async def on_progress(job: RoleJob):
+            await progress_msg.edit(embed=role_job_embed(job, interaction.guild))
+
+        async def on_finish(job: RoleJob):
             try:
-                await member.add_roles(rol, reason=f"Rol añadido masivamente por {interaction.user}")
-                success_count += 1
-                
-                # Actualizar progreso cada 10 usuarios o al final
-                if (i + 1) % 10 == 0 or i == len(members_without_role) - 1:
-                    progress_embed = discord.Embed(
-                        title="🔄 Añadiendo Rol a Usuarios",
-                        description=(
-                            f"**Progreso:** {i + 1}/{len(members_without_role)}\n"
-                            f"**Exitosos:** {success_count}\n"
-                            f"**Errores:** {error_count}"
-                        ),
-                        color=0x3498db
-                    )
-                    try:
-                        await progress_msg.edit(embed=progress_embed)
-                    except discord.NotFound:
-                        pass
-                
-                # Pequeña pausa para evitar rate limits
-                if i % 5 == 0:
-                    await asyncio.sleep(1)
-                    
-            except discord.Forbidden:
-                error_count += 1
-                errors.append(f"{member.display_name}: Sin permisos")
-            except discord.HTTPException as e:
-                error_count += 1
-                errors.append(f"{member.display_name}: Error HTTP")
-            except Exception as e:
-                error_count += 1
-                errors.append(f"{member.display_name}: Error desconocido")
-        
-        # Resultado final
-        final_embed = discord.Embed(
-            title="✅ Proceso Completado",
-            color=0x00ff00 if error_count == 0 else 0xffaa00
-        )
-        
-        final_embed.add_field(
-            name="📊 Resultados",
-            value=(
-                f"**Rol añadido:** {rol.mention}\n"
-                f"**Usuarios procesados:** {len(members_without_role)}\n"
-                f"**Exitosos:** {success_count}\n"
-                f"**Errores:** {error_count}"
-            ),
-            inline=False
-        )
-        
-        if errors and len(errors) <= 10:
-            error_text = "\n".join(errors[:10])
-            final_embed.add_field(
-                name="❌ Errores",
-                value=f"```{error_text}```",
-                inline=False
+                await progress_msg.edit(embed=role_job_embed(job, interaction.guild))
+            except (discord.NotFound, discord.HTTPException):
+                # El token de la interacción caduca a los 15 minutos
+                await self.report_role_job(job)
+
+        try:
+            role_jobs.start(interaction.guild, job, on_progress, on_finish)
+        except RuntimeError:
+            await progress_msg.edit(embed=discord.Embed(
+                title="❌ Error",
+                description="Ya hay un proceso masivo de roles en curso.",
+                color=0xff0000
+            ))
+
+    async def report_role_job(self, job: RoleJob):
+        """Post the result of a job in the channel it was started from"""
+        channel = self.bot.get_channel(job.channel_id)
+        if channel:
+            await channel.send(content=f"<@{job.requested_by}>", embed=role_job_embed(job, channel.guild))
+
+    async def resume_role_jobs(self):
+        """Continue the bulk role jobs interrupted by a restart"""
+        for job in role_jobs.load_unfinished():
+            guild = self.bot.get_guild(job.guild_id)
+            if guild is None:
+                continue
+            role_jobs.start(guild, job, on_finish=self.report_role_job)
+            logger.info(f"Reanudando proceso masivo de roles en {guild.name}: {job.cursor}/{job.total}")
+
+    @app_commands.command(name="add-role-all", description="Añadir un rol a todos los usuarios del servidor")
+    @app_commands.describe(rol="Rol que quieres añadir a todos los usuarios")
+    @app_commands.default_permissions(manage_roles=True)
+    async def add_role_all(
+        self,
+        interaction: discord.Interaction,
+        rol: discord.Role
+    ):
+        job = await self.prepare_role_job(interaction, rol, ACTION_ADD)
+        if job:
+            await self.run_role_job(interaction, job)
+            logger.info(f"Rol {rol.name} añadido masivamente por {interaction.user}: {job.total} usuarios en cola")
+
+    @app_commands.command(name="remove-role-all", description="Quitar un rol a todos los usuarios del servidor")
+    @app_commands.describe(rol="Rol que quieres quitar a todos los usuarios")
+    @app_commands.default_permissions(manage_roles=True)
+    async def remove_role_all(
+        self,
+        interaction: discord.Interaction,
+        rol: discord.Role
+    ):
+        job = await self.prepare_role_job(interaction, rol, ACTION_REMOVE)
+        if job:
+            await self.run_role_job(interaction, job)
+            logger.info(f"Rol {rol.name} quitado masivamente por {interaction.user}: {job.total} usuarios en cola")
+
+    @app_commands.command(name="role-job-status", description="Ver el progreso del proceso masivo de roles")
+    @app_commands.default_permissions(manage_roles=True)
+    async def role_job_status(self, interaction: discord.Interaction):
+        job = role_jobs.get(interaction.guild.id)
+        if job is None:
+            await interaction.response.send_message(
+                "ℹ️ No hay procesos masivos de roles en este servidor.",
+                ephemeral=True
             )
-        elif errors:
-            final_embed.add_field(
-                name="❌ Errores",
-                value=f"Se produjeron {len(errors)} errores. Revisa los logs para más detalles.",
-                inline=False
+            return
+        await interaction.response.send_message(embed=role_job_embed(job, interaction.guild), ephemeral=True)
+
+    @app_commands.command(name="role-job-cancel", description="Cancelar el proceso masivo de roles en curso")
+    @app_commands.default_permissions(manage_roles=True)
+    async def role_job_cancel(self, interaction: discord.Interaction):
+        if role_jobs.cancel(interaction.guild.id):
+            await interaction.response.send_message("🛑 Proceso masivo de roles cancelado.", ephemeral=True)
+            logger.info(f"Proceso masivo de roles cancelado por {interaction.user}")
+        else:
+            await interaction.response.send_message(
+                "ℹ️ No hay ningún proceso masivo de roles en curso.",
+                ephemeral=True
             )
-        
-        final_embed.set_footer(text=f"Ejecutado por {interaction.user.display_name}")
-        
-        try:
-            await progress_msg.edit(embed=final_embed)
-        except discord.NotFound:
-            await interaction.followup.send(embed=final_embed, ephemeral=True)
-        
-        logger.info(f"Rol {rol.name} añadido masivamente por {interaction.user}: {success_count} exitosos, {error_count} errores")
 
 async def setup(bot):
     await bot.add_cog(Tickets(bot))
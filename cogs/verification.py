@@ -1,21 +1,13 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import logging
 from typing import Optional
+from utils.config_store import config_store
+from utils.dm_outbox import dm_outbox
 
 logger = logging.getLogger(__name__)
 
-def get_server_config(guild_id: int):
-    try:
-        with open("config.json", "r") as f:
-            data = json.load(f)
-        return data["servers"].get(str(guild_id))
-    except Exception as e:
-        logging.error(f"Error loading config for guild {guild_id}: {e}")
-        return None
-
 class Verification(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -25,7 +17,7 @@ class Verification(commands.Cog):
         if payload.user_id == self.bot.user.id:
             return
 
-        config = get_server_config(payload.guild_id)
+        config = config_store.get_server(payload.guild_id)
         if not config:
             return
 
@@ -73,9 +65,9 @@ class Verification(commands.Cog):
                     description=f"You have been successfully verified in **{guild.name}**!",
                     color=0x00ff00
                 )
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                pass
+                await dm_outbox.send(user.id, embed=dm_embed, kind='verification')
+            except OSError as e:
+                logger.error(f"Error queueing verification DM: {e}")
         except discord.Forbidden:
             logger.error(f"Missing permissions to add roles in {guild.name}")
         except Exception as e:
@@ -86,7 +78,7 @@ class Verification(commands.Cog):
         if payload.user_id == self.bot.user.id:
             return
 
-        config = get_server_config(payload.guild_id)
+        config = config_store.get_server(payload.guild_id)
         if not config:
             return
 
@@ -141,7 +133,7 @@ class Verification(commands.Cog):
         interaction: discord.Interaction,
         channel: Optional[discord.TextChannel] = None
     ):
-        config = get_server_config(interaction.guild.id)
+        config = config_store.get_server(interaction.guild.id)
         if not config:
             await interaction.response.send_message("⚠️ This server has no verification config set.", ephemeral=True)
             return
@@ -185,16 +177,7 @@ class Verification(commands.Cog):
             return
 
         try:
-            with open("config.json", "r") as f:
-                data = json.load(f)
-            guild_id = str(interaction.guild.id)
-            if "servers" not in data:
-                data["servers"] = {}
-            if guild_id not in data["servers"]:
-                data["servers"][guild_id] = {}
-            data["servers"][guild_id]["verification_role_id"] = role.id
-            with open("config.json", "w") as f:
-                json.dump(data, f, indent=2)
+            config_store.set(interaction.guild.id, "verification_role_id", role.id)
             await interaction.response.send_message(f"✅ Set verification role to {role.mention}", ephemeral=True)
         except Exception as e:
             logger.error(f"Error setting verification role: {e}")
@@ -209,16 +192,7 @@ class Verification(commands.Cog):
             await test_message.add_reaction(emoji)
             await test_message.delete()
 
-            with open("config.json", "r") as f:
-                data = json.load(f)
-            guild_id = str(interaction.guild.id)
-            if "servers" not in data:
-                data["servers"] = {}
-            if guild_id not in data["servers"]:
-                data["servers"][guild_id] = {}
-            data["servers"][guild_id]["verification_emoji"] = emoji
-            with open("config.json", "w") as f:
-                json.dump(data, f, indent=2)
+            config_store.set(interaction.guild.id, "verification_emoji", emoji)
 
             await interaction.response.send_message(f"✅ Set verification emoji to {emoji}", ephemeral=True)
         except discord.HTTPException:
@@ -3,7 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional
 import logging
-from utils.helpers import load_config, save_config
+from utils.config_store import config_store
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +15,8 @@ class Welcome(commands.Cog):
     async def on_member_join(self, member):
         """Send welcome message when a new member joins"""
         try:
-            config = load_config()
             # Fix: Use 'servers' instead of 'guilds' to match config.json structure
-            guild_config = config.get('servers', {}).get(str(member.guild.id), {})
+            guild_config = config_store.get_server(member.guild.id)
             welcome_channel_id = guild_config.get('welcome_channel_id')
             
             if not welcome_channel_id:
@@ -116,44 +115,26 @@ class Welcome(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
             
-            # Load config
-            config = load_config()
-            
-            # Initialize server config if not exists
-            if 'servers' not in config:
-                config['servers'] = {}
-            if str(interaction.guild.id) not in config['servers']:
-                config['servers'][str(interaction.guild.id)] = {}
-            
             # Set welcome channel for this server
-            config['servers'][str(interaction.guild.id)]['welcome_channel_id'] = canal.id
+            config_store.set(interaction.guild.id, 'welcome_channel_id', canal.id)
             
-            # Save config
-            if save_config(config):
-                embed = discord.Embed(
-                    title="✅ Canal de bienvenida configurado",
-                    description=f"Los mensajes de bienvenida se enviarán en {canal.mention}",
-                    color=0x00ff00
-                )
-                embed.add_field(
-                    name="Servidor",
-                    value=interaction.guild.name,
-                    inline=True
-                )
-                embed.add_field(
-                    name="Canal",
-                    value=canal.mention,
-                    inline=True
-                )
-                await interaction.response.send_message(embed=embed)
-                logger.info(f"Welcome channel set to {canal.id} for guild {interaction.guild.id}")
-            else:
-                embed = discord.Embed(
-                    title="❌ Error",
-                    description="No se pudo guardar la configuración. Inténtalo de nuevo.",
-                    color=0xff0000
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+            embed = discord.Embed(
+                title="✅ Canal de bienvenida configurado",
+                description=f"Los mensajes de bienvenida se enviarán en {canal.mention}",
+                color=0x00ff00
+            )
+            embed.add_field(
+                name="Servidor",
+                value=interaction.guild.name,
+                inline=True
+            )
+            embed.add_field(
+                name="Canal",
+                value=canal.mention,
+                inline=True
+            )
+            await interaction.response.send_message(embed=embed)
+            logger.info(f"Welcome channel set to {canal.id} for guild {interaction.guild.id}")
                 
         except Exception as e:
             logger.error(f"Error setting welcome channel: {e}")
@@ -178,11 +159,8 @@ class Welcome(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
             
-            # Load config
-            config = load_config()
-            
             # Check if server config exists
-            if 'servers' not in config or str(interaction.guild.id) not in config['servers']:
+            if not config_store.get_server(interaction.guild.id):
                 embed = discord.Embed(
                     title="ℹ️ Sin configuración",
                     description="Este servidor no tiene configurados mensajes de bienvenida.",
@@ -191,31 +169,16 @@ class Welcome(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
             
-            # Remove welcome channel configuration
-            if 'welcome_channel_id' in config['servers'][str(interaction.guild.id)]:
-                del config['servers'][str(interaction.guild.id)]['welcome_channel_id']
-            
-            # Clean up empty server config (but keep other settings)
-            if 'welcome_channel_id' not in config['servers'][str(interaction.guild.id)] and len(config['servers'][str(interaction.guild.id)]) <= 1:
-                # Only delete if no other important configs exist
-                pass
+            # Remove welcome channel configuration (other settings are kept)
+            config_store.delete(interaction.guild.id, 'welcome_channel_id')
             
-            # Save config
-            if save_config(config):
-                embed = discord.Embed(
-                    title="✅ Bienvenida desactivada",
-                    description="Los mensajes de bienvenida han sido desactivados para este servidor.",
-                    color=0x00ff00
-                )
-                await interaction.response.send_message(embed=embed)
-                logger.info(f"Welcome messages disabled for guild {interaction.guild.id}")
-            else:
-                embed = discord.Embed(
-                    title="❌ Error",
-                    description="No se pudo guardar la configuración. Inténtalo de nuevo.",
-                    color=0xff0000
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+            embed = discord.Embed(
+                title="✅ Bienvenida desactivada",
+                description="Los mensajes de bienvenida han sido desactivados para este servidor.",
+                color=0x00ff00
+            )
+            await interaction.response.send_message(embed=embed)
+            logger.info(f"Welcome messages disabled for guild {interaction.guild.id}")
                 
         except Exception as e:
             logger.error(f"Error disabling welcome: {e}")
@@ -230,8 +193,7 @@ class Welcome(commands.Cog):
     async def welcome_info(self, interaction: discord.Interaction):
         """Show current welcome configuration"""
         try:
-            config = load_config()
-            guild_config = config.get('servers', {}).get(str(interaction.guild.id), {})
+            guild_config = config_store.get_server(interaction.guild.id)
             welcome_channel_id = guild_config.get('welcome_channel_id')
             
             embed = discord.Embed(
@@ -10,6 +10,14 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from utils.config_store import config_store
+from utils.dm_outbox import STATUS_SENT, dm_outbox
+from utils.message_reaper import message_reaper
+from utils.ticket_journal import ticket_journal
+from utils.ticket_registry import ticket_registry
+from utils.ticket_stats import ticket_stats
+
+SHUTDOWN_DM_WAIT_SECONDS = 5
 
 # Set up logging
 logging.basicConfig(
@@ -57,7 +65,14 @@ class DiscordBot(commands.Bot):
         )
         
     async def setup_hook(self):
+        # Deliver DMs queued before the last shutdown
+        dm_outbox.start(self)
+        # Delete transient messages that expired while the bot was down
+        message_reaper.start(self)
+
         # Load cogs
+        await self.load_extension('cogs.config_watcher')
+        await self.load_extension('cogs.member_directory')
         await self.load_extension('cogs.tickets')
         await self.load_extension('cogs.verification')
         await self.load_extension('cogs.welcome')
@@ -135,24 +150,23 @@ class DiscordBot(commands.Bot):
         """Send notification to admin when bot shuts down"""
         try:
             admin_id = 462635310724022285
-            user = await self.fetch_user(admin_id)
-            if user:
-                embed = discord.Embed(
-                    title="🔴 Bot Desconectado",
-                    description="El bot Neon Vice se ha desconectado del servidor.",
-                    color=0xff0000
-                )
-                embed.add_field(
-                    name="Estado",
-                    value="Bot apagado",
-                    inline=True
-                )
-                embed.add_field(
-                    name="Tiempo",
-                    value=f"<t:{int(discord.utils.utcnow().timestamp())}:F>",
-                    inline=True
-                )
-                await user.send(embed=embed)
+            embed = discord.Embed(
+                title="🔴 Bot Desconectado",
+                description="El bot Neon Vice se ha desconectado del servidor.",
+                color=0xff0000
+            )
+            embed.add_field(
+                name="Estado",
+                value="Bot apagado",
+                inline=True
+            )
+            embed.add_field(
+                name="Tiempo",
+                value=f"<t:{int(discord.utils.utcnow().timestamp())}:F>",
+                inline=True
+            )
+            # Directo y sin cola: un aviso de apagado entregado en el siguiente arranque no sirve
+            if await dm_outbox.send_now(admin_id, embed=embed, kind='shutdown', timeout=SHUTDOWN_DM_WAIT_SECONDS) == STATUS_SENT:
                 logger.info(f"Shutdown notification sent to admin {admin_id}")
             
             # Send email notification
@@ -165,6 +179,12 @@ class DiscordBot(commands.Bot):
         """Override close method to send notification before shutdown"""
         await self.send_shutdown_notification()
         await super().close()
+        # Persist any settings still waiting in the write-behind buffer
+        config_store.flush()
+        ticket_registry.flush()
+        ticket_journal.flush()
+        ticket_stats.flush()
+        message_reaper.flush()
     
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.CommandNotFound):
@@ -0,0 +1,77 @@
+import json
+import os
+from utils.cfx_status import (
+    OVERALL_UNKNOWN, SERVICES, ComponentStatus, parse_status, parse_status_html, parse_summary_json
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmark', 'fixtures')
+
+def read(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+def summary(components, indicator='none') -> bytes:
+    return json.dumps({
+        'status': {'indicator': indicator},
+        'components': [{'name': name, 'status': status} for name, status in components]
+    }).encode('utf-8')
+
+def test_reference_markup():
+    labels = parse_status_html(read('reference_components.html')).labels()
+    assert labels["🎮 FiveM"] == "🟢 Operativo"
+    # Group header: the name is nested after the expand icons
+    assert labels["🌐 Web Services"] == "🟡 Rendimiento Degradado"
+    assert labels["💬 Forums"] == "🟡 Rendimiento Degradado"
+    assert labels["🖥️ FXServer"] == "🔴 Falla Mayor"
+    assert labels["🤠 RedM"] == ComponentStatus.UNAVAILABLE.label
+    assert labels["overall"] == "🟡 Algunos sistemas con problemas"
+
+def test_fixture_page_reads_row_markup_not_incident_text():
+    # The page has an incident titled "Forums partially unavailable" above the
+    # component list; the Forums row itself says partial_outage
+    labels = parse_status_html(read('status_page.html')).labels()
+    assert labels["💬 Forums"] == "🟠 Falla Parcial"
+    assert labels["⚡ Runtime"] == "🟢 Operativo"
+    assert labels == parse_summary_json(read('summary.json')).labels()
+
+def test_summary_json_states():
+    report = parse_summary_json(summary([
+        ("FiveM", "operational"),
+        ("RedM", "degraded_performance"),
+        ("Cfx.re Platform Server (FXServer)", "partial_outage"),
+        ("Game Services", "major_outage"),
+        ("CnL", "under_maintenance"),
+        ("Policy", "something_new"),
+        ("Not a tracked service", "major_outage"),
+    ], indicator='minor'))
+    labels = report.labels()
+    assert labels["🎮 FiveM"] == ComponentStatus.OPERATIONAL.label
+    assert labels["🤠 RedM"] == ComponentStatus.DEGRADED.label
+    assert labels["🖥️ FXServer"] == ComponentStatus.PARTIAL_OUTAGE.label
+    assert labels["🎯 Game Services"] == ComponentStatus.MAJOR_OUTAGE.label
+    assert labels["🔗 CnL"] == ComponentStatus.MAINTENANCE.label
+    assert labels["📋 Policy"] == ComponentStatus.UNKNOWN.label
+    assert labels["🚪 Portal"] == ComponentStatus.UNAVAILABLE.label
+    assert labels["overall"] == "🟡 Algunos sistemas con problemas"
+    assert list(labels) == [name for name, _ in SERVICES] + ["overall"]
+
+def test_summary_json_names_are_case_insensitive_and_first_wins():
+    labels = parse_summary_json(summary([("fivem", "major_outage"), ("FiveM", "operational")])).labels()
+    assert labels["🎮 FiveM"] == ComponentStatus.MAJOR_OUTAGE.label
+
+def test_invalid_summary_json():
+    assert parse_summary_json(b"<html>maintenance page</html>") is None
+    assert parse_summary_json(b'{"status": {}}') is None
+    assert parse_summary_json(b'[]') is None
+    assert parse_summary_json(summary([], indicator='weird')).overall == OVERALL_UNKNOWN
+
+def test_html_without_status_markup():
+    report = parse_status_html(b"<html><body>Operational Major Outage FiveM</body></html>")
+    assert report.components == {}
+    assert report.overall == OVERALL_UNKNOWN
+
+def test_parse_status_dispatch():
+    feed = summary([("FiveM", "operational")])
+    assert parse_status(feed, True).components == {"🎮 FiveM": ComponentStatus.OPERATIONAL}
+    assert parse_status(b"not json", True) is None
+    assert parse_status(b"not json", False).components == {}
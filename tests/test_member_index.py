@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from utils.member_index import MemberNameIndex, member_names, normalize_name, scan_members
+
+MEMBERS = {
+    1: ("alice", "Alice Smith", None),
+    2: ("bob", "Bobby", "Bob the Builder"),
+    3: ("alicia", "Ali", None),
+    4: ("ｃａｒｌｏｓ", "Carlos", None),  # Full-width username
+    5: ("zed", "alice", None),  # Nickname equal to another member's username
+}
+
+def build() -> MemberNameIndex:
+    return MemberNameIndex.build(MEMBERS.items())
+
+def member(member_id: int):
+    name, display_name, global_name = MEMBERS[member_id]
+    return SimpleNamespace(id=member_id, name=name, display_name=display_name, global_name=global_name)
+
+def test_normalization():
+    assert normalize_name("ＡＢＣ") == "abc"
+    assert normalize_name("Straße") == "strasse"
+    assert member_names(member(2)) == ("bob", "bobby", "bob the builder")
+    assert member_names(SimpleNamespace(name="Ann", display_name="ann", global_name=None)) == ("ann",)
+
+def test_exact_prefix_contains():
+    index = build()
+    assert len(index) == 5 and 2 in index
+    assert sorted(index.exact("alice")) == [1, 5]
+    assert index.prefix("ali") == [3, 1, 5]  # Name order: "ali" (3), then "alice" (1 and 5)
+    assert index.prefix("ali", limit=1) == [3]
+    assert sorted(index.contains("builder")) == [2]
+    assert sorted(index.contains("li")) == [1, 3, 5]  # Shorter than a trigram
+    assert index.contains("xyz") == []
+
+def test_find_ranking():
+    index = build()
+    assert index.find("alice") == 1  # Username match beats nickname match
+    assert index.find("  BOB ") == 2
+    assert index.find("carlos") == 4
+    assert index.find("bui") == 2  # Substring of "bob the builder"
+    assert index.find("") is None
+    assert index.find("nobody") is None
+
+def test_add_and_remove_keep_indexes_consistent():
+    index = build()
+    index.add(2, ("robert",))
+    assert index.find("bob") is None
+    assert index.find("rob") == 2
+    assert index.contains("ober") == [2]
+    index.remove(2)
+    index.remove(2)
+    assert 2 not in index and index.find("rob") is None
+    assert "obe" not in index._grams
+    index.add(6, ("bob",))
+    assert index.exact("bob") == [6]
+
+def test_scan_matches_index():
+    index = build()
+    members = [member(member_id) for member_id in MEMBERS]
+    for query in ("alice", "ali", "ALICIA", "bob", "builder", "li", "carlos", "nobody", ""):
+        found = scan_members(members, query)
+        assert (found.id if found else None) == index.find(query), query
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from utils.scheduler import DeadlineScheduler
+
+def test_reschedule_and_cancel_are_lazy():
+    scheduler = DeadlineScheduler()
+    scheduler.schedule('a', 100.0)
+    scheduler.schedule('a', 50.0)
+    scheduler.schedule('b', 75.0)
+    scheduler.cancel('b')
+    scheduler.cancel('missing')
+    assert len(scheduler) == 1
+    assert 'a' in scheduler and 'b' not in scheduler
+    assert scheduler.due('a') == 50.0
+    assert scheduler.items() == [('a', 50.0)]
+    # Stale entries stay in the heap until popped or compacted
+    assert len(scheduler._heap) == 3
+
+def test_compaction_bounds_the_heap():
+    scheduler = DeadlineScheduler()
+    for i in range(1000):
+        scheduler.schedule('key', float(i))
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 65
+    assert scheduler.due('key') == 999.0
+
+def test_runs_due_keys_in_deadline_order():
+    async def main():
+        fired = []
+        done = asyncio.Event()
+        scheduler = DeadlineScheduler()
+        now = time.time()
+
+        async def callback(key):
+            fired.append(key)
+            if key == 'last':
+                done.set()
+
+        scheduler.schedule('last', now + 0.05)
+        scheduler.schedule('first', now - 10)
+        scheduler.schedule('moved', now - 5)
+        scheduler.schedule('moved', now + 0.02)  # The earlier entry must not fire
+        scheduler.schedule('cancelled', now - 1)
+        scheduler.cancel('cancelled')
+        scheduler.start(callback)
+        try:
+            await asyncio.wait_for(done.wait(), 2)
+        finally:
+            scheduler.stop()
+        return fired, len(scheduler)
+
+    fired, pending = asyncio.run(main())
+    assert fired == ['first', 'moved', 'last']
+    assert pending == 0
+
+def test_earlier_deadline_wakes_the_sleeping_task():
+    async def main():
+        fired = asyncio.Event()
+        scheduler = DeadlineScheduler()
+
+        async def callback(key):
+            fired.set()
+
+        scheduler.schedule('late', time.time() + 3600)
+        scheduler.start(callback)
+        await asyncio.sleep(0.01)  # Task is now waiting on the hour-long deadline
+        scheduler.schedule('soon', time.time())
+        try:
+            await asyncio.wait_for(fired.wait(), 1)
+        finally:
+            scheduler.stop()
+        return scheduler.items()
+
+    assert [key for key, _ in asyncio.run(main())] == ['late']
+
+def test_callback_errors_do_not_stop_the_scheduler():
+    async def main():
+        fired = []
+        done = asyncio.Event()
+        scheduler = DeadlineScheduler()
+
+        async def callback(key):
+            fired.append(key)
+            if key == 'bad':
+                raise RuntimeError("boom")
+            done.set()
+
+        now = time.time()
+        scheduler.schedule('bad', now - 2)
+        scheduler.schedule('good', now - 1)
+        scheduler.start(callback)
+        try:
+            await asyncio.wait_for(done.wait(), 1)
+        finally:
+            scheduler.stop()
+        return fired
+
+    assert asyncio.run(main()) == ['bad', 'good']
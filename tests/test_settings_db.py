@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import pytest
+from utils import settings_db
+from utils.settings_db import EMPTY_SETTINGS, SqliteConfigStore, migrate
+
+@pytest.fixture
+def db_path(tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({
+        'servers': {'1': {'a': 1}, '2': {'b': [1]}},
+        'guilds': {'1': {'welcome_channel_id': 5}}
+    }))
+    path = str(tmp_path / 'settings.db')
+    assert migrate(str(config), path) == {'servers': 2, 'guilds': 1}
+    return path
+
+def test_reads_come_from_the_preloaded_cache(db_path):
+    store = SqliteConfigStore(db_path)
+    assert store.get_server(1) == {'a': 1}
+    assert store.get_server('2') == {'b': [1]}
+    assert store.get_server(99) is EMPTY_SETTINGS
+    assert sorted(guild_id for guild_id, _ in store.iter_servers()) == [1, 2]
+    loaded = store.load()
+    assert loaded['guilds'] == {'1': {'welcome_channel_id': 5}}
+    loaded['servers']['1']['a'] = 7  # Private copy
+    assert store.get_server(1) == {'a': 1}
+
+def test_writes_publish_and_persist(db_path):
+    store = SqliteConfigStore(db_path)
+    changes = []
+    store.subscribe(changes.extend)
+    store.set(3, 'x', 1)
+    assert store.add_to_list(2, 'b', 2)
+    assert not store.add_to_list(2, 'b', 2)
+    assert store.delete(1, 'a')
+    assert not store.delete(1, 'a')
+    store.flush()
+    assert [(c.guild_id, c.key, c.old, c.new) for c in changes] == [
+        (3, 'x', None, 1), (2, 'b', [1], [1, 2]), (1, 'a', 1, None)
+    ]
+    reopened = SqliteConfigStore(db_path)
+    assert reopened.get_server(3) == {'x': 1}
+    assert reopened.get_server(2) == {'b': [1, 2]}
+    assert reopened.get_server(1) == {}
+
+def test_refresh_picks_up_external_edits(db_path):
+    store = SqliteConfigStore(db_path)
+    assert not store.refresh()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("UPDATE guild_settings SET data = ? WHERE section = 'servers' AND guild_id = 1", (json.dumps({'a': 2}),))
+    conn.execute("INSERT INTO guild_settings VALUES ('servers', 4, ?, 0)", (json.dumps({'n': 1}),))
+    conn.execute("DELETE FROM guild_settings WHERE section = 'servers' AND guild_id = 2")
+    conn.execute("UPDATE guild_settings SET data = ? WHERE section = 'guilds' AND guild_id = 1", (json.dumps({'w': 1}),))
+    conn.close()
+
+    assert store.refresh()
+    assert store.get_server(1) == {'a': 2}
+    assert store.get_server(4) == {'n': 1}
+    assert store.get_server(2) is EMPTY_SETTINGS
+    assert store.load()['guilds'] == {'1': {'w': 1}}
+    assert not store.refresh()
+
+class FlakyConnection:
+    """Fails the next ``failures`` row writes, like a locked or full database"""
+
+    def __init__(self, conn, failures):
+        self.conn = conn
+        self.failures = failures
+
+    def execute(self, sql, *args):
+        if sql.startswith("INSERT") and self.failures['left']:
+            self.failures['left'] -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self.conn.execute(sql, *args)
+
+def test_failed_writes_are_retried_then_rolled_back(db_path, monkeypatch):
+    monkeypatch.setattr(settings_db, 'WRITE_RETRY_SECONDS', 0)
+    store = SqliteConfigStore(db_path)
+    failures = {'left': 0}
+    connect = store._conn
+    monkeypatch.setattr(store, '_conn', lambda: FlakyConnection(connect(), failures))
+    changes = []
+    store.subscribe(changes.extend)
+
+    failures['left'] = settings_db.WRITE_ATTEMPTS - 1
+    store.set(1, 'b', 2)
+    store.flush()
+    assert store.get_server(1) == {'a': 1, 'b': 2}
+
+    failures['left'] = settings_db.WRITE_ATTEMPTS
+    store.set(1, 'c', 3)
+    store.flush()
+    assert store.get_server(1) == {'a': 1, 'b': 2}
+    assert (changes[-1].key, changes[-1].old, changes[-1].new) == ('c', 3, None)
+
+    failures['left'] = settings_db.WRITE_ATTEMPTS
+    store.set(5, 'x', 1)
+    store.flush()
+    assert store.get_server(5) is EMPTY_SETTINGS
+
+    # A newer queued write carries the full state, so the failed one is not rolled back
+    failures['left'] = settings_db.WRITE_ATTEMPTS
+    store.set(1, 'd', 4)
+    store.set(1, 'e', 5)
+    store.flush()
+    assert store.get_server(1) == {'a': 1, 'b': 2, 'd': 4, 'e': 5}
+    assert SqliteConfigStore(db_path).get_server(1) == store.get_server(1)
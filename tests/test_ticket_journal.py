@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from utils.ticket_journal import TicketJournal
+
+CHANNEL_ID = 500
+
+def fake_message(message_id: int, content: str):
+    author = SimpleNamespace(
+        id=7, name='user', display_name='User', discriminator='0',
+        display_avatar=SimpleNamespace(url='https://cdn.example/avatar.png')
+    )
+    return SimpleNamespace(
+        id=message_id, channel=SimpleNamespace(id=CHANNEL_ID), author=author, content=content,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc), embeds=[], attachments=[]
+    )
+
+class FakeChannel:
+    """Channel whose history() honours ``after`` and records how it was called"""
+
+    def __init__(self, messages):
+        self.id = CHANNEL_ID
+        self.name = 'ticket-user'
+        self.messages = messages
+        self.history_after = 'not called'
+
+    async def history(self, limit=None, after=None, oldest_first=False):
+        self.history_after = after.id if after is not None else None
+        for message in self.messages:
+            if after is None or message.id > after.id:
+                yield message
+
+def make_journal(tmp_path) -> TicketJournal:
+    return TicketJournal(str(tmp_path), flush_delay_ms=60000)
+
+def test_replay_applies_edits_and_deletes(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.start(CHANNEL_ID)
+    for message_id, content in ((1, "hola"), (2, "adios"), (3, "otro")):
+        journal.record_message(fake_message(message_id, content))
+    journal.record_edit(CHANNEL_ID, 1, {'content': "hola editado"})
+    journal.record_edit(CHANNEL_ID, 2, {'pinned': True})  # Nothing transcript-relevant
+    journal.record_delete(CHANNEL_ID, 3)
+    journal.record_edit(CHANNEL_ID, 99, {'content': "never seen"})
+
+    records, complete = journal.replay(CHANNEL_ID)
+    assert complete
+    assert sorted(records) == [1, 2, 3]
+    assert records[1]['content'] == "hola editado" and records[1]['edited']
+    assert 'edited' not in records[2]
+    assert records[3]['deleted']
+
+def test_replay_skips_torn_last_line(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_message(fake_message(1, "hola"))
+    journal.flush()
+    with open(journal._path(CHANNEL_ID), 'a', encoding='utf-8') as f:
+        f.write('{"op": "create", "id": 2, "cont')
+    records, complete = journal.replay(CHANNEL_ID)
+    assert list(records) == [1]
+    assert not complete  # No start marker: journal only has a tail
+
+def test_replay_of_unknown_channel(tmp_path):
+    assert make_journal(tmp_path).replay(12345) == ({}, False)
+
+def test_collect_only_fetches_after_the_last_journaled_message(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.start(CHANNEL_ID)
+    journal.record_message(fake_message(1, "uno"))
+    journal.record_message(fake_message(2, "dos"))
+    journal.record_edit(CHANNEL_ID, 2, {'content': "dos editado"})
+    channel = FakeChannel([fake_message(1, "uno"), fake_message(2, "dos"), fake_message(3, "tres")])
+
+    records = asyncio.run(journal.collect(channel))
+    assert channel.history_after == 2
+    assert [r['id'] for r in records] == [1, 2, 3]
+    assert records[1]['content'] == "dos editado"  # Journal wins over the fetched copy
+
+def test_collect_incomplete_journal_reads_whole_history(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_message(fake_message(2, "dos"))  # Opened before journaling existed
+    channel = FakeChannel([fake_message(1, "uno"), fake_message(2, "dos"), fake_message(3, "tres")])
+
+    records = asyncio.run(journal.collect(channel))
+    assert channel.history_after is None
+    assert [r['id'] for r in records] == [1, 2, 3]
+
+def test_discard_drops_buffer_and_file(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_message(fake_message(1, "uno"))
+    journal.flush()
+    journal.record_message(fake_message(2, "dos"))
+    journal.discard(CHANNEL_ID)
+    assert journal.replay(CHANNEL_ID) == ({}, False)
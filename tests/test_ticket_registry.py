@@ -0,0 +1,79 @@
+import json
+import time
+from utils.ticket_registry import CLOSED_RETENTION_DAYS, TicketRegistry
+
+def make_registry(tmp_path) -> TicketRegistry:
+    # A long delay keeps the debounced writer from flushing behind the test's back
+    return TicketRegistry(str(tmp_path / 'tickets.json'), flush_delay_ms=60000)
+
+def test_open_and_close_update_both_indexes(tmp_path):
+    registry = make_registry(tmp_path)
+    record = registry.open(1, 100, 7)
+    registry.open(2, 200, 7)
+    assert registry.get(100) is record
+    assert registry.get_open(100) is record
+    assert registry.find_open(1, 7) is record
+    assert registry.find_open(1, 8) is None
+    assert {r.channel_id for r in registry.open_tickets()} == {100, 200}
+    assert [r.channel_id for r in registry.open_tickets(2)] == [200]
+
+    assert registry.close(100) is record
+    assert registry.close(100) is None  # Already closed
+    assert registry.get(100) is record and not record.is_open
+    assert registry.get_open(100) is None
+    assert registry.find_open(1, 7) is None
+    assert registry.close(999) is None
+
+def test_reopening_after_close_is_found_by_owner(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.open(1, 100, 7)
+    registry.close(100)
+    second = registry.open(1, 101, 7)
+    assert registry.find_open(1, 7) is second
+    assert registry.get(100) is not None
+
+def test_participants_and_activity(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.open(1, 100, 7, opened_at=1000.0)
+    assert registry.add_participant(100, 9)
+    assert not registry.add_participant(100, 9)
+    assert registry.remove_participant(100, 9)
+    assert not registry.remove_participant(100, 9)
+
+    registry.mark_warned(100)
+    record = registry.touch(100, when=1010.0)
+    assert record.last_activity == 1010.0 and record.warned_at is None
+
+    assert registry.mark_responded(100, when=1020.0).first_response_at == 1020.0
+    assert registry.mark_responded(100, when=1030.0) is None  # Only the first reply counts
+    assert registry.touch(999) is None
+
+def test_round_trip_and_retention(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.open(1, 100, 7, opened_at=1000.0)
+    registry.add_participant(100, 9)
+    registry.open(1, 101, 8)
+    registry.close(101)
+    registry.flush()
+
+    path = tmp_path / 'tickets.json'
+    data = json.loads(path.read_text())
+    # A ticket closed long ago is dropped on the next load
+    data['tickets'].append({
+        'channel_id': 102, 'guild_id': 1, 'owner_id': 9, 'status': 'closed',
+        'closed_at': time.time() - (CLOSED_RETENTION_DAYS + 1) * 86400
+    })
+    data['tickets'].append({'channel_id': 'broken'})
+    path.write_text(json.dumps(data))
+
+    reloaded = make_registry(tmp_path)
+    record = reloaded.find_open(1, 7)
+    assert record.channel_id == 100 and record.opened_at == 1000.0 and record.participants == {9}
+    assert reloaded.get(101) is not None and not reloaded.get(101).is_open
+    assert reloaded.get(102) is None
+    assert len(reloaded.open_tickets()) == 1
+
+def test_missing_or_corrupt_file_starts_empty(tmp_path):
+    assert make_registry(tmp_path).open_tickets() == []
+    (tmp_path / 'tickets.json').write_text("{not json")
+    assert make_registry(tmp_path).open_tickets() == []
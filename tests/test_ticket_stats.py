@@ -0,0 +1,62 @@
+import json
+from utils.ticket_stats import DURATION_BUCKETS, HOURLY_WINDOW, GuildTicketStats, Histogram, TicketStats
+
+def test_histogram_buckets_and_summary():
+    histogram = Histogram()
+    for value in (10, 30, 45, 7200, -5):
+        histogram.add(value)
+    assert histogram.counts[0] == 3  # 10, 30 (bound is inclusive) and -5 clamped to 0
+    assert histogram.counts[1] == 1
+    assert histogram.counts[DURATION_BUCKETS.index(2 * 3600)] == 1
+    assert histogram.total == 5
+    assert histogram.mean == (10 + 30 + 45 + 7200) / 5
+    assert histogram.max == 7200
+
+def test_histogram_percentiles_interpolate_within_buckets():
+    histogram = Histogram()
+    for _ in range(100):
+        histogram.add(45)  # All in the 30-60 s bucket
+    assert histogram.percentile(50) == 45  # Interpolated 45 s, clamped to the max
+    histogram.add(10 * 86400)  # Open-ended bucket is capped by the max seen
+    assert histogram.percentile(100) == 10 * 86400
+    assert 30 <= histogram.percentile(90) <= 60
+    assert Histogram().percentile(50) == 0.0
+    assert Histogram().mean == 0.0
+
+def test_histogram_round_trip_and_bad_counts():
+    histogram = Histogram()
+    histogram.add(100)
+    restored = Histogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+    assert restored.to_dict() == histogram.to_dict()
+    # Counts saved with a different bucket layout are discarded
+    assert Histogram([1, 2, 3]).counts == [0] * (len(DURATION_BUCKETS) + 1)
+
+def test_hourly_ring_buffer():
+    stats = GuildTicketStats()
+    now = 1_000_000 * 3600.0 + 1800  # Counts are per clock hour
+    stats.count_open(now)
+    stats.count_open(now - 1200)
+    stats.count_open(now - 3 * 3600)
+    assert stats.opened == 3
+    assert stats.opened_since(1, now) == 2
+    assert stats.opened_since(24, now) == 3
+    # The same slot a week later is reset before counting
+    stats.count_open(now + HOURLY_WINDOW * 3600)
+    assert stats.opened_since(HOURLY_WINDOW, now + HOURLY_WINDOW * 3600) == 1
+    assert stats.opened_since(10 * HOURLY_WINDOW, now + HOURLY_WINDOW * 3600) == 1
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / 'stats.json')
+    store = TicketStats(path, flush_delay_ms=60000)
+    store.record_open(1, when=3600.0)
+    store.record_first_response(1, 120)
+    store.record_close(1, 4000, closed_by=9)
+    store.record_close(1, 50)
+    store.flush()
+
+    stats = TicketStats(path).get(1)
+    assert stats.opened == 1 and stats.closed == 2
+    assert stats.closes_by_staff == {9: 1}
+    assert stats.first_response.total == 1
+    assert stats.open_duration.max == 4000
+    assert TicketStats(path).get(2).opened == 0
@@ -0,0 +1,55 @@
+import asyncio
+from utils.transcript_archive import TranscriptArchive, fts_query
+
+def record(author: str, content: str) -> dict:
+    return {'time': "2024-01-01 00:00:00", 'author': author, 'content': content, 'embeds': [], 'attachments': []}
+
+def test_fts_query_quotes_every_term():
+    assert fts_query("reembolso tebex") == '"reembolso" "tebex"'
+    assert fts_query('say "hi"') == '"say" """hi"""'
+    assert fts_query("  a   b ") == '"a" "b"'
+    assert fts_query("") == ""
+
+def test_add_search_and_paginate(tmp_path):
+    archive = TranscriptArchive(str(tmp_path / 'archive.db'))
+
+    async def main():
+        for ticket_id in range(1, 8):
+            await archive.add(1, ticket_id, 100 + ticket_id % 2, 9, f"ticket-{ticket_id}", 0.0, float(ticket_id),
+                              [record("User", f"problema con el pago número {ticket_id}")])
+        await archive.add(2, 50, 100, 9, "ticket-other", 0.0, 1.0, [record("User", "problema con el pago")])
+
+        first, more = await archive.search(1, "pago", limit=3)
+        second, _ = await archive.search(1, "pago", limit=3, offset=3)
+        last, no_more = await archive.search(1, "pago", limit=3, offset=6)
+        return first, more, second, last, no_more
+
+    first, more, second, last, no_more = asyncio.run(main())
+    assert more and not no_more
+    ids = [hit.ticket_id for hit in first + second + last]
+    assert sorted(ids) == list(range(1, 8))  # Guild 2 never leaks in
+    assert "**pago**" in first[0].snippet
+    assert first[0].message_count == 1
+
+def test_owner_filter_reindex_and_hostile_queries(tmp_path):
+    archive = TranscriptArchive(str(tmp_path / 'archive.db'))
+
+    async def main():
+        await archive.add(1, 1, 100, None, "ticket-a", None, 1.0, [record("Ana", "cuenta bloqueada")])
+        await archive.add(1, 2, 200, None, "ticket-b", None, 2.0, [record("Beto", "cuenta bloqueada")])
+        by_owner, _ = await archive.search(1, "bloqueada", owner_id=200)
+        # Re-archiving a ticket replaces its document
+        await archive.add(1, 1, 100, None, "ticket-a", None, 3.0, [record("Ana", "todo resuelto")])
+        after, _ = await archive.search(1, "bloqueada")
+        accents, _ = await archive.search(1, "resuélto")
+        hostile = [
+            (await archive.search(1, query))[0]
+            for query in ('cuenta AND', 'NEAR(', '"', 'body:cuenta', '*', 'cuenta OR -x')
+        ]
+        return by_owner, after, accents, hostile
+
+    by_owner, after, accents, hostile = asyncio.run(main())
+    assert [hit.ticket_id for hit in by_owner] == [2]
+    assert [hit.ticket_id for hit in after] == [2]
+    assert [hit.ticket_id for hit in accents] == [1]  # remove_diacritics
+    assert all(isinstance(hits, list) for hits in hostile)
@@ -0,0 +1,114 @@
+import gzip
+import os
+import random
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from utils.transcript_html import render_html_transcript
+from utils.transcripts import _pack, build_transcript, format_record, render_parts
+
+CHANNEL = SimpleNamespace(name='ticket-user', created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+USER = SimpleNamespace(id=7, name='user', display_name='User', discriminator='0')
+
+def record(i: int, content: str = None) -> dict:
+    return {
+        'id': i, 'time': "2024-01-01 00:00:00", 'author_id': 7, 'author': "User (user#0)", 'avatar': None,
+        'content': content if content is not None else f"mensaje {i}", 'embeds': [], 'attachments': []
+    }
+
+def render(rec: dict) -> bytes:
+    return f"{rec['id']}:{rec['content']}\n".encode('utf-8')
+
+def header(part: int) -> bytes:
+    return f"# part {part}\n".encode('utf-8')
+
+def read(transcript) -> bytes:
+    transcript.buffer.seek(0)
+    return transcript.buffer.read()
+
+def close_all(parts):
+    for _, transcript in parts:
+        transcript.close()
+
+def test_pack_respects_budget_and_order():
+    sizes = [4, 4, 4, 10, 1]
+    assert _pack(sizes, range(5), 8) == [[0, 1], [2], [3], [4]]
+    assert _pack(sizes, range(5), 100) == [[0, 1, 2, 3, 4]]
+    assert _pack([], range(0), 10) == [[]]
+
+def test_single_plain_part():
+    records = [record(i) for i in range(3)]
+    parts = render_parts(records, render, header, b"END\n", "transcript-x", ".txt",
+                         max_bytes=10_000, gzip_bytes=10_000)
+    try:
+        assert [name for name, _ in parts] == ["transcript-x.txt"]
+        assert read(parts[0][1]) == b"# part 1\n0:mensaje 0\n1:mensaje 1\n2:mensaje 2\nEND\n"
+        assert parts[0][1].message_count == 3
+    finally:
+        close_all(parts)
+
+def test_splits_into_numbered_parts_under_the_limit():
+    records = [record(i, "x" * 50) for i in range(40)]
+    parts = render_parts(records, render, header, b"", "transcript-x", ".txt",
+                         max_bytes=400, gzip_bytes=1_000_000)
+    try:
+        assert len(parts) > 1
+        assert parts[0][0] == f"transcript-x-parte1de{len(parts)}.txt"
+        ids = []
+        for n, (_, transcript) in enumerate(parts, 1):
+            data = read(transcript)
+            assert len(data) <= 400
+            assert data.startswith(header(n))
+            ids += [int(line.split(b":")[0]) for line in data.splitlines()[1:]]
+        assert ids == list(range(40))
+    finally:
+        close_all(parts)
+
+def test_gzips_large_output_and_keeps_parts_under_the_limit():
+    rng = random.Random(1)
+    # Random text compresses poorly, which forces the split-and-retry path
+    records = [record(i, os.urandom(8).hex() + "".join(rng.choice("abcdef ") for _ in range(300)))
+               for i in range(300)]
+    parts = render_parts(records, render, header, b"END\n", "transcript-x", ".txt",
+                         max_bytes=8_000, gzip_bytes=1_000)
+    try:
+        assert all(name.endswith(".txt.gz") for name, _ in parts)
+        ids = []
+        for _, transcript in parts:
+            assert transcript.size <= 8_000
+            data = gzip.decompress(read(transcript))
+            assert data.endswith(b"END\n")
+            ids += [int(line.split(b":")[0]) for line in data.splitlines()[1:-1]]
+        assert ids == list(range(300))
+        assert sum(transcript.message_count for _, transcript in parts) == 300
+    finally:
+        close_all(parts)
+
+def test_oversized_single_record_still_gets_its_own_part():
+    records = [record(0, "short"), record(1, "y" * 1_000), record(2, "short")]
+    parts = render_parts(records, render, header, b"", "t", ".txt", max_bytes=200, gzip_bytes=1_000_000)
+    try:
+        assert [transcript.message_count for _, transcript in parts] == [1, 1, 1]
+    finally:
+        close_all(parts)
+
+def test_format_record_flags():
+    rec = record(1, "hola")
+    rec.update(edited=True, deleted=True, embeds=[{'title': "T", 'description': "D"}],
+               attachments=[{'filename': "a.png"}])
+    assert format_record(rec) == (
+        "[2024-01-01 00:00:00] User (user#0): [Eliminado]\nhola [Editado]\n[Embed: T]\nD\n[Attachment: a.png]\n"
+    )
+    assert "[No content]" in format_record(record(2, ""))
+
+def test_text_and_html_transcripts():
+    records = [record(1, "<b>hola</b>")]
+    text = build_transcript(CHANNEL, USER, records)
+    html = render_html_transcript(CHANNEL, USER, records)
+    try:
+        assert text[0][0] == "transcript-ticket-user.txt"
+        assert b"<b>hola</b>" in read(text[0][1])
+        assert html[0][0] == "transcript-ticket-user.html"
+        body = read(html[0][1])
+        assert b"&lt;b&gt;hola&lt;/b&gt;" in body and body.endswith(b"</html>\n")
+    finally:
+        close_all(text + html)
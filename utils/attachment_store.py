@@ -0,0 +1,185 @@
+import aiohttp
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.storage import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENTS_DIR = 'data/attachments'
+ATTACHMENT_MAX_BYTES = int(os.getenv('ATTACHMENT_MAX_BYTES', 25 * 1024 * 1024))
+ATTACHMENT_TICKET_MAX_BYTES = int(os.getenv('ATTACHMENT_TICKET_MAX_BYTES', 200 * 1024 * 1024))
+ATTACHMENT_WORKERS = int(os.getenv('ATTACHMENT_WORKERS', 4))
+DOWNLOAD_TIMEOUT_SECONDS = 60
+CHUNK_SIZE = 64 * 1024
+SHORT_HASH = 16  # Hex digits shown in transcripts; enough to find the blob again
+MIN_LOOKUP_PREFIX = SHORT_HASH  # Shorter prefixes could be enumerated
+_HEX = re.compile(r'[0-9a-f]+')
+
+class AttachmentTooLarge(Exception):
+    pass
+
+class AttachmentStore:
+    """Content-addressed copies of ticket attachments.
+
+    Each file is stored once under ``<dir>/<sha[:2]>/<sha256>`` no matter
+    how many tickets posted it, with a small ``.json`` sidecar holding the
+    first filename seen and the guilds whose tickets posted it; lookups are
+    limited to those guilds. Downloads stream to a temporary file while being
+    hashed, so memory use does not depend on attachment size, and run on a
+    bounded number of workers.
+    """
+
+    def __init__(self, directory: str = ATTACHMENTS_DIR, max_file_bytes: int = ATTACHMENT_MAX_BYTES,
+                 max_ticket_bytes: int = ATTACHMENT_TICKET_MAX_BYTES, workers: int = ATTACHMENT_WORKERS):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_ticket_bytes = max_ticket_bytes
+        self.workers = workers
+        self._sidecar_lock = threading.Lock()
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.directory, sha256[:2], sha256)
+
+    async def find(self, prefix: str, guild_id: int) -> Optional[Tuple[str, dict]]:
+        """Blob of ``guild_id`` whose hash starts with ``prefix``: (path, metadata).
+
+        ``prefix`` must be at least ``MIN_LOOKUP_PREFIX`` hex digits.
+        """
+        prefix = prefix.lower()
+        if len(prefix) < MIN_LOOKUP_PREFIX or not _HEX.fullmatch(prefix):
+            return None
+        return await asyncio.to_thread(self._find, prefix, guild_id)
+
+    def _find(self, prefix: str, guild_id: int) -> Optional[Tuple[str, dict]]:
+        try:
+            names = os.listdir(os.path.join(self.directory, prefix[:2]))
+        except FileNotFoundError:
+            return None
+        matches = [name for name in names
+                   if name.startswith(prefix) and not name.endswith('.json') and not name.startswith('.')]
+        if len(matches) != 1:
+            return None
+        path = self.path(matches[0])
+        meta = self._read_meta(path)
+        # Solo se entregan adjuntos de tickets del mismo servidor
+        if guild_id not in meta.get('guilds', ()):
+            return None
+        meta.setdefault('sha256', matches[0])
+        return path, meta
+
+    @staticmethod
+    def _read_meta(path: str) -> dict:
+        try:
+            with open(f"{path}.json", 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _select(self, records: Iterable[dict]) -> Dict[str, List[dict]]:
+        """Attachments to download, grouped by URL, within the size caps"""
+        by_url: Dict[str, List[dict]] = {}
+        budget = self.max_ticket_bytes
+        for record in records:
+            for attachment in record.get('attachments', ()):
+                url = attachment.get('url')
+                if not url or attachment.get('sha256'):
+                    continue
+                if url in by_url:
+                    by_url[url].append(attachment)
+                    continue
+                size = attachment.get('size') or 0
+                if size > self.max_file_bytes or size > budget:
+                    logger.info(f"Skipping attachment {attachment.get('filename')} ({size} bytes): over the size cap")
+                    continue
+                budget -= size
+                by_url[url] = [attachment]
+        return by_url
+
+    async def archive(self, records: Iterable[dict], guild_id: int,
+                      session: Optional[aiohttp.ClientSession] = None) -> int:
+        """Download the attachments of ``records`` and tag each with its ``sha256``.
+
+        ``guild_id`` is recorded as an owner of every blob stored.
+
+        Records are updated as each download finishes, so a caller that
+        times out still keeps whatever was stored. Returns the number of
+        attachments stored.
+        """
+        by_url = self._select(records)
+        if not by_url:
+            return 0
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self._archive(by_url, guild_id, session)
+        return await self._archive(by_url, guild_id, session)
+
+    async def _archive(self, by_url: Dict[str, List[dict]], guild_id: int, session: aiohttp.ClientSession) -> int:
+        slots = asyncio.Semaphore(self.workers)
+        stored = 0
+
+        async def worker(url: str, attachments: List[dict]):
+            nonlocal stored
+            async with slots:
+                try:
+                    sha256 = await self._download(session, url, attachments[0].get('filename'), guild_id)
+                except (aiohttp.ClientError, asyncio.TimeoutError, AttachmentTooLarge, OSError) as e:
+                    logger.warning(f"Could not archive attachment {attachments[0].get('filename')}: {e!r}")
+                    return
+            for attachment in attachments:
+                attachment['sha256'] = sha256
+            stored += len(attachments)
+
+        await asyncio.gather(*(worker(url, attachments) for url, attachments in by_url.items()))
+        return stored
+
+    async def _download(self, session: aiohttp.ClientSession, url: str, filename: Optional[str], guild_id: int) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.download-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                timeout = aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT_SECONDS)
+                async with session.get(url, timeout=timeout) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > self.max_file_bytes:
+                            raise AttachmentTooLarge(f"{filename} is over {self.max_file_bytes} bytes")
+                        hasher.update(chunk)
+                        f.write(chunk)
+            sha256 = hasher.hexdigest()
+            await asyncio.to_thread(self._commit, tmp_path, sha256, filename, size, guild_id)
+            return sha256
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _commit(self, tmp_path: str, sha256: str, filename: Optional[str], size: int, guild_id: int):
+        path = self.path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        # Si ya estaba guardado por otro ticket, el temporal se borra y solo se añade el servidor
+        with self._sidecar_lock:
+            meta = self._read_meta(path) or {'sha256': sha256, 'filename': filename, 'size': size}
+            guilds = meta.setdefault('guilds', [])
+            if guild_id in guilds:
+                return
+            guilds.append(guild_id)
+            atomic_write_bytes(f"{path}.json", json.dumps(meta).encode('utf-8'))
+
+def short_hash(sha256: str) -> str:
+    return sha256[:SHORT_HASH]
+
+# Shared instance used by the tickets cog
+attachment_store = AttachmentStore()
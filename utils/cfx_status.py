@@ -0,0 +1,124 @@
+import json
+import re
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+# (display name, name on status.cfx.re) in the order the embed lists them
+SERVICES: List[Tuple[str, str]] = [
+    ("🎮 FiveM", "FiveM"),
+    ("🤠 RedM", "RedM"),
+    ("🖥️ FXServer", "Cfx.re Platform Server (FXServer)"),
+    ("🎯 Game Services", "Game Services"),
+    ("🔗 CnL", "CnL"),
+    ("📋 Policy", "Policy"),
+    ("🔑 Keymaster", "Keymaster"),
+    ("🌐 Web Services", "Web Services"),
+    ("💬 Forums", "Forums"),
+    ("📋 Server List", "Server List Frontend"),
+    ("⚡ Runtime", "Runtime"),
+    ("🆔 IDMS", "IDMS"),
+    ("🚪 Portal", "Portal"),
+]
+
+class ComponentStatus(Enum):
+    OPERATIONAL = "🟢 Operativo"
+    DEGRADED = "🟡 Rendimiento Degradado"
+    PARTIAL_OUTAGE = "🟠 Falla Parcial"
+    MAJOR_OUTAGE = "🔴 Falla Mayor"
+    MAINTENANCE = "🔧 Mantenimiento"
+    UNKNOWN = "❓ Desconocido"
+    UNAVAILABLE = "❓ No disponible"  # Component not on the page
+
+    @property
+    def label(self) -> str:
+        return self.value
+
+class StatusReport:
+    """Parsed status page: one state per known service plus the overall banner"""
+
+    __slots__ = ('components', 'overall')
+
+    def __init__(self, components: Dict[str, ComponentStatus], overall: str):
+        self.components = components  # display name -> state
+        self.overall = overall
+
+    def labels(self) -> Dict[str, str]:
+        """Display name -> label, with the overall banner under ``overall``"""
+        status_dict = {name: self.components.get(name, ComponentStatus.UNAVAILABLE).label for name, _ in SERVICES}
+        status_dict["overall"] = self.overall
+        return status_dict
+
+OVERALL_UNKNOWN = "❓ Estado general desconocido"
+
+# Statuspage values, used by both the JSON feed and the HTML attributes
+_JSON_STATES = {
+    'operational': ComponentStatus.OPERATIONAL,
+    'degraded_performance': ComponentStatus.DEGRADED,
+    'partial_outage': ComponentStatus.PARTIAL_OUTAGE,
+    'major_outage': ComponentStatus.MAJOR_OUTAGE,
+    'under_maintenance': ComponentStatus.MAINTENANCE,
+}
+_JSON_OVERALL = {
+    'none': "🟢 Todos los sistemas operativos",
+    'minor': "🟡 Algunos sistemas con problemas",
+    'major': "🔴 Falla mayor del servicio",
+    'critical': "🔴 Falla mayor del servicio",
+    'maintenance': "🔧 Mantenimiento programado",
+}
+
+_DISPLAY_BY_NAME = {page_name.casefold(): display for display, page_name in SERVICES}
+
+def _display_name(page_name: str) -> Optional[str]:
+    return _DISPLAY_BY_NAME.get(page_name.strip().strip('"').casefold())
+
+# Statuspage markup: each component row opens with its state in an attribute and
+# then names it in a span (group rows nest the expand icons and another span before
+# the text, so tags are skipped up to the first text); the banner carries the same
+# indicator as the JSON feed. All three tokens are found by one scan of the page.
+_HTML_TOKENS = re.compile(
+    r'data-component-status="(?P<state>[a-z_]+)"'
+    r'|<span class="name">(?:\s*<[^>]*>)*\s*(?P<name>[^<]*?)\s*<'
+    r'|class="page-status status-(?P<indicator>[a-z]+)'
+)
+
+def parse_summary_json(body: bytes) -> Optional[StatusReport]:
+    """Parse the Statuspage ``summary.json`` feed; None if it is not one"""
+    try:
+        data = json.loads(body)
+        components = data['components']
+        indicator = data.get('status', {}).get('indicator')
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+    states: Dict[str, ComponentStatus] = {}
+    for component in components:
+        if not isinstance(component, dict):
+            continue
+        display = _display_name(str(component.get('name', '')))
+        if display is not None and display not in states:
+            states[display] = _JSON_STATES.get(component.get('status'), ComponentStatus.UNKNOWN)
+    return StatusReport(states, _JSON_OVERALL.get(indicator, OVERALL_UNKNOWN))
+
+def parse_status_html(body: bytes) -> StatusReport:
+    """Parse the status page HTML in a single scan"""
+    content = body.decode('utf-8', errors='replace')
+    states: Dict[str, ComponentStatus] = {}
+    overall = OVERALL_UNKNOWN
+    state: Optional[ComponentStatus] = None  # State of the row whose name comes next
+
+    for match in _HTML_TOKENS.finditer(content):
+        kind = match.lastgroup
+        if kind == 'state':
+            state = _JSON_STATES.get(match.group('state'), ComponentStatus.UNKNOWN)
+        elif kind == 'name':
+            display = _display_name(match.group('name'))
+            if state is not None and display is not None and display not in states:
+                states[display] = state
+            state = None
+        elif overall == OVERALL_UNKNOWN:
+            overall = _JSON_OVERALL.get(match.group('indicator'), OVERALL_UNKNOWN)
+    return StatusReport(states, overall)
+
+def parse_status(body: bytes, is_json: bool) -> Optional[StatusReport]:
+    """Parse a fetched body; None when a JSON feed turns out to be invalid"""
+    return parse_summary_json(body) if is_json else parse_status_html(body)
@@ -0,0 +1,202 @@
+import copy
+import json
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, List, Optional, Tuple
+from utils.guild_settings import ChangeNotifier, ConfigChange, GuildSettings, SnapshotCache, diff_settings
+from utils.storage import DebouncedWriter, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = 'config.json'
+FLUSH_DELAY_MS = 500
+
+_DELETE = object()  # Marker for a pending key deletion
+EMPTY_SETTINGS = MappingProxyType({})  # Shared so unconfigured guilds keep one snapshot
+
+class ConfigStore(ChangeNotifier):
+    """Process-wide cache of config.json.
+
+    The file is parsed once and served from memory; it is only re-read when
+    its mtime or size changes, so hot paths (button clicks, raw reaction
+    events) cost a single ``os.stat`` instead of a full ``json.load``.
+
+    Writes go through the patch API (``set``, ``delete``, ``add_to_list``,
+    ``remove_from_list``): they update memory immediately under the
+    per-file lock and a debounced writer persists the whole file once per
+    burst with an atomic temp-file + fsync + rename.
+
+    Subscribers receive a list of ConfigChange for every local patch and
+    for every external edit picked up by ``refresh()``.
+    """
+
+    def __init__(self, path: str = CONFIG_PATH, flush_delay_ms: int = FLUSH_DELAY_MS):
+        super().__init__()
+        self.path = path
+        self._data: dict = {}
+        self._stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the parsed file
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._pending: List[Tuple[str, str, Any]] = []  # Patches not yet on disk
+        self._writer = DebouncedWriter(self._flush, flush_delay_ms, name="config")
+        self._snapshots = SnapshotCache()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self) -> bool:
+        """Re-read the file if it changed on disk. Returns True when reloaded"""
+        stamp = self._file_stamp()
+        if self._loaded and stamp == self._stamp:
+            return False
+
+        with self._lock:
+            if self._loaded and stamp == self._stamp:
+                return False
+
+            if stamp is None:
+                logger.error(f"{self.path} not found")
+                data = {}
+            else:
+                try:
+                    with open(self.path, 'r') as f:
+                        data = json.load(f)
+                except json.JSONDecodeError as e:
+                    # Keep serving the last good copy until the file is fixed
+                    logger.error(f"Invalid JSON in {self.path}: {e}")
+                    self._stamp = stamp
+                    self._loaded = True
+                    return False
+                except OSError as e:
+                    logger.error(f"Error reading {self.path}: {e}")
+                    return False
+
+            # An external edit must not drop our unflushed patches
+            servers = data.setdefault('servers', {})
+            for guild_id_str, key, value in self._pending:
+                self._apply(servers, guild_id_str, key, value)
+
+            changes = diff_settings(self._data.get('servers', {}), servers) if self._loaded else []
+            self._data = data
+            self._stamp = stamp
+            self._loaded = True
+
+        if changes:
+            logger.info(f"{self.path} changed on disk: {len(changes)} setting(s) updated")
+        self._publish(changes)
+        return True
+
+    @property
+    def data(self) -> dict:
+        """The whole parsed config. Treat as read-only"""
+        self.refresh()
+        return self._data
+
+    def get_server(self, guild_id: int) -> dict:
+        """Return the settings of one guild. Treat as read-only"""
+        return self.data.get('servers', {}).get(str(guild_id), EMPTY_SETTINGS)
+
+    def settings(self, guild_id: int) -> GuildSettings:
+        """Compiled, immutable snapshot of one guild's settings"""
+        return self._snapshots.get(int(guild_id), self.get_server(guild_id))
+
+    def iter_servers(self) -> List[Tuple[int, dict]]:
+        """Snapshot of (guild_id, settings) for every configured guild"""
+        return [
+            (int(guild_id_str), server_config)
+            for guild_id_str, server_config in self.data.get('servers', {}).items()
+        ]
+
+    def load(self) -> dict:
+        """Return a private deep copy of the config for read-modify-write callers"""
+        return copy.deepcopy(self.data)
+
+    @staticmethod
+    def _apply(servers: dict, guild_id_str: str, key: str, value: Any):
+        # Copy-on-write per guild: readers holding the old dict never see it change
+        server_config = dict(servers.get(guild_id_str, {}))
+        if value is _DELETE:
+            server_config.pop(key, None)
+        else:
+            server_config[key] = value
+        servers[guild_id_str] = server_config
+
+    def _patch(self, guild_id: int, key: str, value: Any):
+        guild_id_str = str(guild_id)
+        with self._lock:
+            self.refresh()
+            servers = self._data.setdefault('servers', {})
+            old = servers.get(guild_id_str, {}).get(key)
+            self._apply(servers, guild_id_str, key, value)
+            self._pending.append((guild_id_str, key, value))
+        self._writer.schedule()
+        self._publish([ConfigChange(int(guild_id), key, old, None if value is _DELETE else value)])
+
+    def set(self, guild_id: int, key: str, value: Any):
+        """Set one guild setting; persisted by the next debounced flush"""
+        self._patch(guild_id, key, value)
+
+    def delete(self, guild_id: int, key: str) -> bool:
+        """Remove one guild setting. Returns False if it was not set"""
+        with self._lock:
+            if key not in self.get_server(guild_id):
+                return False
+            self._patch(guild_id, key, _DELETE)
+            return True
+
+    def add_to_list(self, guild_id: int, key: str, item: Any) -> bool:
+        """Append ``item`` to a list setting. Returns False if already present"""
+        with self._lock:
+            current = self.get_server(guild_id).get(key, [])
+            if item in current:
+                return False
+            self._patch(guild_id, key, current + [item])
+            return True
+
+    def remove_from_list(self, guild_id: int, key: str, item: Any) -> bool:
+        """Remove ``item`` from a list setting. Returns False if not present"""
+        with self._lock:
+            current = self.get_server(guild_id).get(key, [])
+            if item not in current:
+                return False
+            self._patch(guild_id, key, [x for x in current if x != item])
+            return True
+
+    def _flush(self):
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                payload = json.dumps(self._data, indent=2).encode('utf-8')
+                flushed = len(self._pending)
+
+            atomic_write_bytes(self.path, payload)
+
+            with self._lock:
+                del self._pending[:flushed]
+                self._stamp = self._file_stamp()
+        logger.debug(f"Flushed {flushed} config change(s) to {self.path}")
+
+    def flush(self):
+        """Write pending changes now (called on shutdown)"""
+        self._writer.flush_now()
+
+def create_store():
+    """Build the settings store selected by the SETTINGS_BACKEND env var"""
+    backend = os.getenv('SETTINGS_BACKEND', 'json').lower()
+    if backend == 'sqlite':
+        from utils.settings_db import SETTINGS_DB_PATH, SqliteConfigStore
+        return SqliteConfigStore(os.getenv('SETTINGS_DB_PATH', SETTINGS_DB_PATH))
+    if backend != 'json':
+        logger.warning(f"Unknown SETTINGS_BACKEND '{backend}', falling back to config.json")
+    return ConfigStore()
+
+# Shared instance used by every cog
+config_store = create_store()
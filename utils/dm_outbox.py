@@ -0,0 +1,301 @@
+import discord
+import aiohttp
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from utils.scheduler import DeadlineScheduler
+from utils.storage import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DIR = 'data/outbox'
+DM_INTERVAL_SECONDS = 1.5  # Minimum gap between two DMs, for the whole bot
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 10
+MAX_AGE_SECONDS = 3 * 86400  # Undelivered DMs older than this are dropped
+COPY_CHUNK = 64 * 1024
+DIRECT_TIMEOUT_SECONDS = 5  # send_now gives up after this long
+
+# Error code Discord returns when DM channels are opened too fast
+OPENING_DMS_TOO_FAST = 40003
+
+STATUS_SENT = 'sent'
+STATUS_BLOCKED = 'blocked'  # DMs closed or user unknown; retrying will not help
+STATUS_FAILED = 'failed'
+
+class DMMessage:
+    """One message of a DM: text, embeds and files already copied to disk"""
+
+    __slots__ = ('content', 'embeds', 'files')
+
+    def __init__(self, content: Optional[str] = None, embeds: Sequence[dict] = (),
+                 files: Sequence[Tuple[str, str]] = ()):
+        self.content = content
+        self.embeds = list(embeds)
+        self.files = [tuple(f) for f in files]  # (filename, path)
+
+    def to_dict(self) -> dict:
+        return {'content': self.content, 'embeds': self.embeds, 'files': self.files}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DMMessage':
+        return cls(data.get('content'), data.get('embeds', ()), data.get('files', ()))
+
+class DMItem:
+    """A queued DM to one user, possibly split over several messages"""
+
+    __slots__ = ('id', 'user_id', 'kind', 'messages', 'cursor', 'attempts', 'created_at')
+
+    def __init__(self, id: str, user_id: int, kind: str, messages: List[DMMessage],
+                 cursor: int = 0, attempts: int = 0, created_at: Optional[float] = None):
+        self.id = id
+        self.user_id = user_id
+        self.kind = kind
+        self.messages = messages
+        self.cursor = cursor  # Messages already delivered
+        self.attempts = attempts
+        self.created_at = created_at if created_at is not None else time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'kind': self.kind,
+            'messages': [message.to_dict() for message in self.messages],
+            'cursor': self.cursor,
+            'attempts': self.attempts,
+            'created_at': self.created_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DMItem':
+        return cls(
+            data['id'], int(data['user_id']), data.get('kind', 'dm'),
+            [DMMessage.from_dict(m) for m in data.get('messages', ())],
+            data.get('cursor', 0), data.get('attempts', 0), data.get('created_at')
+        )
+
+class DMOutbox:
+    """Persistent, globally paced queue for direct messages.
+
+    Every DM the bot sends goes through here: it is written to
+    ``data/outbox`` (files included) before ``send`` returns, then delivered
+    by a single worker that keeps at least ``DM_INTERVAL_SECONDS`` between
+    DMs and backs off on rate limits and server errors. Callers get a future
+    with the final status and never wait on Discord; anything still queued
+    at shutdown is delivered after the next start.
+
+    Notices that are worthless later (a ban notice once the member is gone,
+    the shutdown notice) skip the queue through ``send_now``.
+    """
+
+    def __init__(self, directory: str = OUTBOX_DIR, interval: float = DM_INTERVAL_SECONDS):
+        self.directory = directory
+        self.interval = interval
+        self._items: Dict[str, DMItem] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._scheduler = DeadlineScheduler("dm-outbox")
+        self._client: Optional[discord.Client] = None
+        self._next_send = 0.0
+        self._watchers: Set[asyncio.Task] = set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _item_path(self, item_id: str) -> str:
+        return os.path.join(self.directory, f"{item_id}.json")
+
+    def _files_dir(self, item_id: str) -> str:
+        return os.path.join(self.directory, item_id)
+
+    def _save(self, item: DMItem):
+        atomic_write_bytes(self._item_path(item.id), json.dumps(item.to_dict()).encode('utf-8'))
+
+    def _remove(self, item: DMItem):
+        try:
+            os.remove(self._item_path(item.id))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(self._files_dir(item.id), ignore_errors=True)
+
+    def start(self, client: discord.Client):
+        """Load pending DMs from disk and start delivering"""
+        self._client = client
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(self.directory, filename), 'r') as f:
+                        item = DMItem.from_dict(json.load(f))
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Error reading queued DM {filename}: {e}")
+                    continue
+                self._items[item.id] = item
+                self._scheduler.schedule(item.id, item.created_at)
+            if self._items:
+                logger.info(f"Resuming {len(self._items)} queued DM(s)")
+        self._scheduler.start(self._deliver)
+
+    def stop(self):
+        self._scheduler.stop()
+
+    def when_done(self, future: asyncio.Future, callback: Callable[[str], Awaitable[None]]):
+        """Run ``callback(status)`` once a queued DM is delivered or given up on"""
+        async def watch():
+            try:
+                await callback(await future)
+            except Exception as e:
+                logger.error(f"Error handling DM delivery status: {e}")
+        task = asyncio.create_task(watch())
+        self._watchers.add(task)
+        task.add_done_callback(self._watchers.discard)
+
+    async def send(self, user_id: int, content: Optional[str] = None, embed: Optional[discord.Embed] = None,
+                   files: Sequence[Tuple[str, BinaryIO]] = (), kind: str = 'dm',
+                   extra_messages: Sequence[Sequence[Tuple[str, BinaryIO]]] = ()) -> asyncio.Future:
+        """Queue a DM and return a future resolving to its delivery status.
+
+        ``files`` are ``(filename, stream)`` pairs sent with the first
+        message; each entry of ``extra_messages`` is a follow-up message
+        with only files. Streams are copied to disk before this returns, so
+        callers may close them right away.
+        """
+        item_id = uuid.uuid4().hex
+        batches = [files] + list(extra_messages)
+        stored = await asyncio.to_thread(self._store_files, item_id, batches)
+        messages = [DMMessage(content, [embed.to_dict()] if embed else (), stored[0])]
+        messages.extend(DMMessage(files=batch) for batch in stored[1:])
+
+        item = DMItem(item_id, user_id, kind, messages)
+        await asyncio.to_thread(self._save, item)
+        self._items[item.id] = item
+        future = asyncio.get_running_loop().create_future()
+        self._futures[item.id] = future
+        self._scheduler.schedule(item.id, time.time())
+        return future
+
+    def _store_files(self, item_id: str, batches: Sequence[Sequence[Tuple[str, BinaryIO]]]) -> List[List[Tuple[str, str]]]:
+        stored = []
+        for m, batch in enumerate(batches):
+            paths = []
+            for n, (filename, stream) in enumerate(batch):
+                os.makedirs(self._files_dir(item_id), exist_ok=True)
+                path = os.path.join(self._files_dir(item_id), f"{m}-{n}")
+                stream.seek(0)
+                with open(path, 'wb') as f:
+                    shutil.copyfileobj(stream, f, COPY_CHUNK)
+                paths.append((filename, path))
+            stored.append(paths)
+        return stored
+
+    async def send_now(self, user_id: int, content: Optional[str] = None,
+                       embed: Optional[discord.Embed] = None, kind: str = 'dm',
+                       timeout: float = DIRECT_TIMEOUT_SECONDS) -> str:
+        """Send a DM right away, ahead of the queue and its backoff, and return its status.
+
+        Nothing is persisted or retried.
+        """
+        try:
+            user = self._client.get_user(user_id) or await self._client.fetch_user(user_id)
+            await asyncio.wait_for(user.send(content=content, embed=embed), timeout)
+            status = STATUS_SENT
+        except (discord.Forbidden, discord.NotFound):
+            status = STATUS_BLOCKED
+        except (discord.HTTPException, asyncio.TimeoutError) as e:
+            logger.warning(f"Direct DM {kind} to {user_id} failed: {e!r}")
+            status = STATUS_FAILED
+        # La cola respeta el mismo hueco mínimo tras un envío directo
+        self._next_send = max(self._next_send, time.monotonic() + self.interval)
+        log = logger.info if status == STATUS_SENT else logger.warning
+        log(f"DM {kind} to {user_id}: {status} (direct)")
+        return status
+
+    async def _finish(self, item: DMItem, status: str):
+        self._items.pop(item.id, None)
+        await asyncio.to_thread(self._remove, item)
+        future = self._futures.pop(item.id, None)
+        if future is not None and not future.done():
+            future.set_result(status)
+        log = logger.info if status == STATUS_SENT else logger.warning
+        log(f"DM {item.kind} to {item.user_id}: {status} after {item.attempts} attempt(s)")
+
+    async def _retry(self, item: DMItem, error: Exception):
+        if item.attempts >= MAX_ATTEMPTS or time.time() - item.created_at > MAX_AGE_SECONDS:
+            logger.error(f"Giving up on DM {item.kind} to {item.user_id}: {error!r}")
+            await self._finish(item, STATUS_FAILED)
+            return
+        delay = RETRY_BASE_SECONDS * 2 ** (item.attempts - 1)
+        await asyncio.to_thread(self._save, item)
+        self._scheduler.schedule(item.id, time.time() + delay)
+        logger.warning(f"DM {item.kind} to {item.user_id} failed ({error!r}), retrying in {delay}s")
+
+    async def _deliver(self, item_id: str):
+        item = self._items.get(item_id)
+        if item is None:
+            return
+        await self._client.wait_until_ready()
+
+        # Ritmo global: un solo worker, con hueco mínimo entre DMs
+        wait = self._next_send - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        item.attempts += 1
+        try:
+            user = self._client.get_user(item.user_id) or await self._client.fetch_user(item.user_id)
+            while item.cursor < len(item.messages):
+                message = item.messages[item.cursor]
+                try:
+                    files = self._open_files(message)
+                except OSError as e:
+                    logger.error(f"Queued DM {item.id} lost its files: {e}")
+                    await self._finish(item, STATUS_FAILED)
+                    return
+                await user.send(
+                    content=message.content,
+                    embeds=[discord.Embed.from_dict(e) for e in message.embeds],
+                    files=files
+                )
+                item.cursor += 1
+                self._next_send = time.monotonic() + self.interval
+        except (discord.Forbidden, discord.NotFound):
+            self._next_send = time.monotonic() + self.interval
+            await self._finish(item, STATUS_BLOCKED)
+            return
+        except discord.HTTPException as e:
+            if e.status == 429 or e.code == OPENING_DMS_TOO_FAST:
+                # Frenar toda la cola, no solo este mensaje
+                self._next_send = time.monotonic() + RETRY_BASE_SECONDS * 2 ** (item.attempts - 1)
+            await self._retry(item, e)
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Cortes de red: el mensaje se reintenta, no se pierde
+            await self._retry(item, e)
+            return
+        except Exception as e:
+            logger.exception(f"Unexpected error delivering DM {item.id}")
+            await self._retry(item, e)
+            return
+        await self._finish(item, STATUS_SENT)
+
+    @staticmethod
+    def _open_files(message: DMMessage) -> List[discord.File]:
+        """Open the stored attachments of one message; raises OSError if any is missing"""
+        files: List[discord.File] = []
+        try:
+            for filename, path in message.files:
+                files.append(discord.File(path, filename=filename))
+        except OSError:
+            for f in files:
+                f.close()
+            raise
+        return files
+
+# Shared instance; started by the bot in setup_hook
+dm_outbox = DMOutbox()
@@ -0,0 +1,126 @@
+import logging
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+def _id_set(values) -> FrozenSet[int]:
+    return frozenset(int(v) for v in values or () if v is not None)
+
+def member_role_ids(member: discord.Member) -> Iterable[int]:
+    """Role IDs of a member"""
+    return [role.id for role in member.roles]
+
+class GuildSettings:
+    """Immutable, precompiled view of one guild's settings.
+
+    Role lists are compiled into frozensets once per config change, so a
+    permission check is a single set intersection against the member's
+    role IDs instead of a nested loop over ``discord.utils.get``.
+    """
+
+    __slots__ = (
+        'guild_id', 'raw', 'staff_role_ids', 'moderation_role_ids',
+        'ticket_category_id', 'transcript_channel_id'
+    )
+
+    def __init__(self, guild_id: int, raw: dict):
+        set_ = object.__setattr__
+        set_(self, 'guild_id', guild_id)
+        set_(self, 'raw', raw)
+        set_(self, 'staff_role_ids', _id_set(raw.get('staff_role_ids')))
+        set_(self, 'moderation_role_ids', _id_set(raw.get('moderation_role_ids')))
+        set_(self, 'ticket_category_id', raw.get('ticket_category_id'))
+        set_(self, 'transcript_channel_id', raw.get('transcript_channel_id'))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GuildSettings is immutable")
+
+    def __repr__(self):
+        return f"<GuildSettings guild_id={self.guild_id} staff={len(self.staff_role_ids)} moderation={len(self.moderation_role_ids)}>"
+
+    def get(self, key: str, default=None):
+        """Raw setting lookup for keys without a compiled attribute"""
+        return self.raw.get(key, default)
+
+    def is_staff(self, member: discord.Member) -> bool:
+        return not self.staff_role_ids.isdisjoint(member_role_ids(member))
+
+    def is_moderator(self, member: discord.Member) -> bool:
+        return not self.moderation_role_ids.isdisjoint(member_role_ids(member))
+
+class SnapshotCache:
+    """Per-guild GuildSettings snapshots, recompiled when the raw dict changes.
+
+    Settings stores replace a guild's dict on every change (copy-on-write),
+    so comparing identities is enough to detect staleness. A stale snapshot
+    is replaced with a single dict assignment and readers never lock.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[int, GuildSettings] = {}
+
+    def get(self, guild_id: int, raw: dict) -> GuildSettings:
+        snapshot = self._snapshots.get(guild_id)
+        if snapshot is None or snapshot.raw is not raw:
+            snapshot = GuildSettings(guild_id, raw)
+            self._snapshots[guild_id] = snapshot
+        return snapshot
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        if guild_id is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(guild_id, None)
+
+class ConfigChange(NamedTuple):
+    """One setting that changed for one guild (``None`` when unset)"""
+    guild_id: int
+    key: str
+    old: Any
+    new: Any
+
+_MISSING = object()
+
+def diff_settings(old_servers: Mapping, new_servers: Mapping) -> List[ConfigChange]:
+    """Compare two ``servers`` maps and list every per-guild setting that changed"""
+    changes = []
+    for guild_id in old_servers.keys() | new_servers.keys():
+        old = old_servers.get(guild_id) or {}
+        new = new_servers.get(guild_id) or {}
+        if old is new:
+            continue
+        for key in old.keys() | new.keys():
+            old_value = old.get(key, _MISSING)
+            new_value = new.get(key, _MISSING)
+            if old_value != new_value:
+                changes.append(ConfigChange(
+                    int(guild_id), key,
+                    None if old_value is _MISSING else old_value,
+                    None if new_value is _MISSING else new_value
+                ))
+    return changes
+
+class ChangeNotifier:
+    """Publish ConfigChange batches to subscribed callbacks"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[List[ConfigChange]], None]] = []
+
+    def subscribe(self, callback: Callable[[List[ConfigChange]], None]):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[ConfigChange]], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, changes: List[ConfigChange]):
+        if not changes:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(changes)
+            except Exception as e:
+                logger.error(f"Error in config change subscriber {callback}: {e}")
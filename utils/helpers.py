@@ -1,48 +1,29 @@
 import discord
-import json
 import logging
 from typing import Optional, List
+from utils.config_store import config_store
+from utils.guild_settings import GuildSettings
+from utils.ticket_registry import ticket_registry
 
 logger = logging.getLogger(__name__)
 
 def load_config() -> dict:
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.error("config.json not found")
-        return {}
-    except json.JSONDecodeError:
-        logger.error("Invalid JSON in config.json")
-        return {}
-
-def save_config(config: dict) -> bool:
-    """Save configuration to config.json"""
-    try:
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving config: {e}")
-        return False
+    """Load a private copy of the configuration (served from the shared ConfigStore)"""
+    return config_store.load()
 
-def has_staff_role(user: discord.Member, config: dict) -> bool:
+def has_staff_role(user: discord.Member, settings: GuildSettings) -> bool:
     """Check if user has any staff role"""
-    staff_role_ids = config.get('staff_role_ids', [])
-    for role in user.roles:
-        if role.id in staff_role_ids:
-            return True
-    return False
+    return settings.is_staff(user)
 
-def can_manage_tickets(user: discord.Member, channel: discord.TextChannel, config: dict) -> bool:
+def can_manage_tickets(user: discord.Member, channel: discord.TextChannel, settings: GuildSettings) -> bool:
     """Check if user can manage tickets (close, etc.)"""
     # Check if user is ticket creator
-    if f'-{user.name.lower()}-{user.discriminator}' in channel.name:
+    ticket = ticket_registry.get_open(channel.id)
+    if ticket and ticket.owner_id == user.id:
         return True
     
     # Check if user has staff role
-    if has_staff_role(user, config):
+    if has_staff_role(user, settings):
         return True
     
     # Check if user has manage channels permission
@@ -107,17 +88,10 @@ def validate_permissions(channel: discord.TextChannel, member: discord.Member, r
     
     return missing_perms
 
-def get_ticket_user_from_channel(channel: discord.TextChannel) -> Optional[str]:
-    """Extract username from ticket channel name"""
-    if not channel.name.startswith('ticket-'):
-        return None
-    
-    parts = channel.name.split('-')
-    if len(parts) >= 3:
-        # ticket-username-discriminator
-        return '-'.join(parts[1:-1])  # Handle usernames with dashes
-    
-    return None
+def get_ticket_owner_id(channel: discord.TextChannel) -> Optional[int]:
+    """Get the creator of an open ticket channel from the ticket registry"""
+    ticket = ticket_registry.get_open(channel.id)
+    return ticket.owner_id if ticket else None
 
 class BotColors:
     """Standard colors for bot embeds"""
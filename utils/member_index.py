@@ -0,0 +1,268 @@
+import discord
+import asyncio
+import bisect
+import logging
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+NGRAM = 3
+MENTION_PATTERN = re.compile(r'^<@!?(\d+)>$')
+
+def normalize_name(name: str) -> str:
+    """Case- and width-insensitive form used for every lookup"""
+    return unicodedata.normalize('NFKC', name).casefold()
+
+def ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+def raw_names(member: discord.Member) -> Tuple[Optional[str], ...]:
+    return (member.name, member.display_name, member.global_name)
+
+def normalize_names(raw: Iterable[Optional[str]]) -> Tuple[str, ...]:
+    names = []
+    for name in raw:
+        if name:
+            name = normalize_name(name)
+            if name not in names:
+                names.append(name)
+    return tuple(names)
+
+def member_names(member: discord.Member) -> Tuple[str, ...]:
+    """Normalized names a member can be found by, username first"""
+    return normalize_names(raw_names(member))
+
+class MemberNameIndex:
+    """Name lookup for the members of one guild.
+
+    ``(name, member_id)`` pairs are kept in a sorted list so exact and prefix
+    matches are a binary search, and every name is split into trigrams so a
+    substring query only checks the members sharing all of its trigrams
+    instead of lowering every member's names on every lookup.
+    """
+
+    def __init__(self):
+        self._names: Dict[int, Tuple[str, ...]] = {}
+        self._sorted: List[Tuple[str, int]] = []
+        self._grams: Dict[str, Set[int]] = {}
+
+    @classmethod
+    def build(cls, members: Iterable[Tuple[int, Sequence[Optional[str]]]]) -> 'MemberNameIndex':
+        """Index ``(member_id, raw names)`` pairs in one go; sorts once instead of inserting per name"""
+        index = cls()
+        for member_id, raw in members:
+            names = normalize_names(raw)
+            index._names[member_id] = names
+            for name in names:
+                index._sorted.append((name, member_id))
+                for gram in ngrams(name):
+                    index._grams.setdefault(gram, set()).add(member_id)
+        index._sorted.sort()
+        return index
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._names
+
+    def add(self, member_id: int, names: Iterable[str]):
+        """Index a member (replaces whatever was indexed for it)"""
+        names = tuple(names)
+        if self._names.get(member_id) == names:
+            return
+        self.remove(member_id)
+        self._names[member_id] = names
+        for name in names:
+            bisect.insort(self._sorted, (name, member_id))
+            for gram in ngrams(name):
+                self._grams.setdefault(gram, set()).add(member_id)
+
+    def remove(self, member_id: int):
+        names = self._names.pop(member_id, None)
+        if names is None:
+            return
+        for name in names:
+            i = bisect.bisect_left(self._sorted, (name, member_id))
+            if i < len(self._sorted) and self._sorted[i] == (name, member_id):
+                del self._sorted[i]
+            for gram in ngrams(name):
+                holders = self._grams.get(gram)
+                if holders is not None:
+                    holders.discard(member_id)
+                    if not holders:
+                        del self._grams[gram]
+
+    def exact(self, query: str) -> List[int]:
+        """Members with a name equal to ``query``"""
+        found: List[int] = []
+        i = bisect.bisect_left(self._sorted, (query, 0))
+        while i < len(self._sorted) and self._sorted[i][0] == query:
+            found.append(self._sorted[i][1])
+            i += 1
+        return found
+
+    def prefix(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Members with a name starting with ``query``, in name order"""
+        found: List[int] = []
+        i = bisect.bisect_left(self._sorted, (query, 0))
+        while i < len(self._sorted) and self._sorted[i][0].startswith(query):
+            member_id = self._sorted[i][1]
+            if member_id not in found:
+                found.append(member_id)
+                if limit is not None and len(found) >= limit:
+                    break
+            i += 1
+        return found
+
+    def contains(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Members with a name containing ``query``"""
+        if len(query) < NGRAM:
+            # Too short for trigrams: scan the already-normalized names
+            candidates = self._names.keys()
+        else:
+            candidates = None
+            for gram in sorted(ngrams(query), key=lambda g: len(self._grams.get(g, ()))):
+                holders = self._grams.get(gram)
+                if not holders:
+                    return []
+                candidates = set(holders) if candidates is None else candidates & holders
+                if not candidates:
+                    return []
+        found = sorted(
+            (min(name for name in self._names[member_id] if query in name), member_id)
+            for member_id in candidates
+            if any(query in name for name in self._names[member_id])
+        )
+        return [member_id for _, member_id in found[:limit]]
+
+    def find(self, query: str) -> Optional[int]:
+        """Best match for free text: exact name, then prefix, then substring"""
+        query = normalize_name(query.strip())
+        if not query:
+            return None
+        exact = self.exact(query)
+        if exact:
+            # Prefer a username match over a nickname match
+            return min(exact, key=lambda member_id: self._names[member_id].index(query))
+        matches = self.prefix(query, 1) or self.contains(query, 1)
+        return matches[0] if matches else None
+
+def scan_members(members: Iterable[discord.Member], query: str) -> Optional[discord.Member]:
+    """Same ranking as ``MemberNameIndex.find`` without an index"""
+    query = normalize_name(query.strip())
+    if not query:
+        return None
+    best, best_rank = None, None
+    for member in members:
+        names = member_names(member)
+        if query in names:
+            rank = (0, names.index(query), '')
+        else:
+            starts = [name for name in names if name.startswith(query)]
+            if starts:
+                rank = (1, 0, min(starts))
+            else:
+                inside = [name for name in names if query in name]
+                if not inside:
+                    continue
+                rank = (2, 0, min(inside))
+        if best_rank is None or rank < best_rank:
+            best, best_rank = member, rank
+    return best
+
+class MemberDirectory:
+    """Per-guild member name indexes shared by every cog.
+
+    Indexes are built in a worker thread from a snapshot of the member
+    cache when the guild becomes ready (see the member directory cog) and
+    then kept current by the member events it forwards. Events that arrive
+    while a build is running are replayed on the new index. Until a guild
+    has an index, lookups fall back to scanning the member cache.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[int, MemberNameIndex] = {}
+        self._complete: Set[int] = set()  # Guilds indexed from a fully chunked member list
+        self._builds: Dict[int, asyncio.Task] = {}
+        self._pending: Dict[int, List[Callable[[MemberNameIndex], None]]] = {}
+
+    def index(self, guild: discord.Guild) -> Optional[MemberNameIndex]:
+        """Cached index of a guild; schedules a build when missing or when chunking has since completed"""
+        if guild.id not in self._indexes or (guild.id not in self._complete and guild.chunked):
+            self.schedule_build(guild)
+        return self._indexes.get(guild.id)
+
+    def schedule_build(self, guild: discord.Guild):
+        task = self._builds.get(guild.id)
+        if task is None or task.done():
+            self._builds[guild.id] = asyncio.create_task(self._build(guild), name=f"member-index-{guild.id}")
+
+    async def _build(self, guild: discord.Guild):
+        chunked = guild.chunked
+        members = [(member.id, raw_names(member)) for member in guild.members]
+        self._pending[guild.id] = []
+        try:
+            index = await asyncio.to_thread(MemberNameIndex.build, members)
+        except Exception as e:
+            logger.error(f"Error indexing members of {guild.name}: {e}")
+            return
+        finally:
+            pending = self._pending.pop(guild.id, [])
+        for apply in pending:
+            apply(index)
+        self._indexes[guild.id] = index
+        if chunked:
+            self._complete.add(guild.id)
+        logger.debug(f"Indexed {len(index)} member(s) of {guild.name}")
+
+    def _apply(self, guild_id: int, apply: Callable[[MemberNameIndex], None]):
+        index = self._indexes.get(guild_id)
+        if index is not None:
+            apply(index)
+        pending = self._pending.get(guild_id)
+        if pending is not None:
+            pending.append(apply)
+
+    def update(self, member: discord.Member):
+        member_id, names = member.id, member_names(member)
+        self._apply(member.guild.id, lambda index: index.add(member_id, names))
+
+    def update_user(self, user: discord.User):
+        """Username or global name changed; applies to every guild"""
+        for guild in user.mutual_guilds:
+            member = guild.get_member(user.id)
+            if member is not None:
+                self.update(member)
+
+    def remove(self, guild_id: int, member_id: int):
+        self._apply(guild_id, lambda index: index.remove(member_id))
+
+    def drop(self, guild_id: int):
+        self._indexes.pop(guild_id, None)
+        self._complete.discard(guild_id)
+        task = self._builds.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+
+    def resolve(self, guild: discord.Guild, text: str) -> Optional[discord.Member]:
+        """Member from a mention, an ID, or (part of) a name"""
+        text = text.strip()
+        if not text:
+            return None
+        match = MENTION_PATTERN.match(text)
+        if match or text.isdigit():
+            member = guild.get_member(int(match.group(1) if match else text))
+            if member is not None:
+                return member
+        index = self.index(guild)
+        if index is None:
+            # Aún sin índice: búsqueda lineal mientras se construye
+            return scan_members(guild.members, text)
+        member_id = index.find(text)
+        return guild.get_member(member_id) if member_id is not None else None
+
+# Shared instance used by the cogs
+member_directory = MemberDirectory()
@@ -0,0 +1,128 @@
+import discord
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from utils.scheduler import DeadlineScheduler
+from utils.storage import DebouncedWriter, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_MESSAGES_PATH = 'data/transient_messages.json'
+FLUSH_DELAY_MS = 1000
+BATCH_WINDOW_SECONDS = 0.5  # Deletions due this close together in one channel share a request
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = 14 * 86400 - 60  # Discord refuses bulk deletes of older messages
+
+MessageKey = Tuple[int, int]  # (channel_id, message_id)
+
+class MessageReaper:
+    """Delete transient bot messages (pings, confirmations) when they expire.
+
+    Deadlines live in one persistent DeadlineScheduler instead of a sleeping
+    task per message, so a restart just deletes whatever came due while the
+    bot was down. Messages that fall due together in a channel are removed
+    with a single bulk delete.
+    """
+
+    def __init__(self, path: str = TRANSIENT_MESSAGES_PATH):
+        self.path = path
+        self._scheduler = DeadlineScheduler("message-reaper")
+        self._batches: Dict[int, Set[int]] = {}
+        self._flushes: Dict[int, asyncio.Task] = {}
+        self._client: Optional[discord.Client] = None
+        self._writer = DebouncedWriter(self._save, FLUSH_DELAY_MS, name="transient-messages")
+
+    def __len__(self):
+        return len(self._scheduler)
+
+    def _entries(self) -> List[List[float]]:
+        return [[channel_id, message_id, when] for (channel_id, message_id), when in self._scheduler.items()]
+
+    def _save(self):
+        atomic_write_bytes(self.path, json.dumps({'messages': self._entries()}).encode('utf-8'))
+
+    def start(self, client: discord.Client):
+        """Load pending deletions and start the scheduler"""
+        self._client = client
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f).get('messages', [])
+        except FileNotFoundError:
+            entries = []
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error reading {self.path}: {e}")
+            entries = []
+        for channel_id, message_id, when in entries:
+            self._scheduler.schedule((int(channel_id), int(message_id)), when)
+        if entries:
+            logger.info(f"{len(entries)} transient message(s) pending deletion")
+        self._scheduler.start(self._due)
+
+    def stop(self):
+        self._scheduler.stop()
+        for task in self._flushes.values():
+            task.cancel()
+
+    def schedule(self, message: discord.abc.Snowflake, delay: float, channel_id: Optional[int] = None):
+        """Delete ``message`` after ``delay`` seconds (survives restarts)"""
+        channel_id = channel_id if channel_id is not None else message.channel.id
+        self._scheduler.schedule((channel_id, message.id), time.time() + delay)
+        self._writer.schedule()
+
+    def flush(self):
+        """Write pending changes now (called on shutdown)"""
+        if self._writer.pending:
+            self._writer.flush_now()
+
+    async def _due(self, key: MessageKey):
+        channel_id, message_id = key
+        self._batches.setdefault(channel_id, set()).add(message_id)
+        task = self._flushes.get(channel_id)
+        if task is None or task.done():
+            self._flushes[channel_id] = asyncio.create_task(self._delete_batch(channel_id), name=f"reap-{channel_id}")
+
+    async def _delete_batch(self, channel_id: int):
+        await self._client.wait_until_ready()
+        # Seguir mientras vayan venciendo más mensajes del mismo canal
+        while True:
+            await asyncio.sleep(BATCH_WINDOW_SECONDS)
+            message_ids = sorted(self._batches.pop(channel_id, ()))
+            if not message_ids:
+                return
+            await self._delete(channel_id, message_ids)
+            self._writer.schedule()
+
+    async def _delete(self, channel_id: int, message_ids: List[int]):
+        channel = self._client.get_channel(channel_id) or self._client.get_partial_messageable(channel_id)
+
+        # Solo se pueden borrar en bloque mensajes de menos de 14 días
+        cutoff = time.time() - BULK_DELETE_MAX_AGE
+        recent = [i for i in message_ids if discord.utils.snowflake_time(i).timestamp() > cutoff]
+        single = [i for i in message_ids if i not in recent]
+        if len(recent) > 1 and hasattr(channel, 'delete_messages'):
+            for start in range(0, len(recent), BULK_DELETE_LIMIT):
+                chunk = recent[start:start + BULK_DELETE_LIMIT]
+                try:
+                    await channel.delete_messages([discord.Object(id=i) for i in chunk], reason="Mensaje temporal")
+                except discord.NotFound:
+                    pass
+                except discord.HTTPException as e:
+                    # Sin Manage Messages el bot aún puede borrar sus propios mensajes uno a uno
+                    logger.warning(f"Bulk delete failed in channel {channel_id}, deleting one by one: {e}")
+                    single.extend(chunk)
+        else:
+            single.extend(recent)
+
+        for message_id in single:
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except (discord.NotFound, discord.Forbidden):
+                pass
+            except discord.HTTPException as e:
+                logger.warning(f"Could not delete transient message {message_id} in channel {channel_id}: {e}")
+        logger.debug(f"Deleted {len(message_ids)} transient message(s) in channel {channel_id}")
+
+# Shared instance; started by the bot in setup_hook
+message_reaper = MessageReaper()
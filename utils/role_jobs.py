@@ -0,0 +1,310 @@
+"""Resumable bulk role assignment.
+
+A job holds the member IDs still to process and a cursor into that list.
+The member list is written once to ``data/role_jobs/<guild_id>.members.json``
+when the job starts; the cursor and counters are checkpointed to
+``data/role_jobs/<guild_id>.json`` as it runs, so an interrupted job picks
+up where it stopped after a restart.
+
+Pacing: discord.py does not expose response headers, but its HTTP client
+already reads ``X-RateLimit-Remaining``/``Reset-After`` per bucket and
+waits before a request would be rejected. Jobs therefore issue requests
+back to back on a single lane per guild and let the library's header-driven
+bucket do the pacing, backing off exponentially only when a request still
+fails with a 429 or a 5xx.
+"""
+import discord
+import asyncio
+import collections
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from utils.storage import DebouncedWriter, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+ROLE_JOBS_DIR = 'data/role_jobs'
+MEMBERS_SUFFIX = '.members.json'
+CHECKPOINT_DELAY_MS = 2000
+PROGRESS_INTERVAL_SECONDS = 5
+MAX_RETRIES = 5
+MAX_ERROR_SAMPLES = 10
+RATE_WINDOW_SECONDS = 60  # Members/second is measured over this much recent wall-clock time
+RATE_MIN_SPAN_SECONDS = 2  # No rate (and no ETA) until the window spans this long
+
+ACTION_ADD = 'add'
+ACTION_REMOVE = 'remove'
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_CANCELLED = 'cancelled'
+STATUS_FAILED = 'failed'
+
+class RoleJob:
+    """State of one bulk role job; everything needed to resume it"""
+
+    __slots__ = (
+        'guild_id', 'role_id', 'action', 'requested_by', 'channel_id', 'member_ids', 'cursor',
+        'success', 'skipped', 'errors', 'error_samples', 'started_at', 'finished_at', 'status', 'rate'
+    )
+
+    def __init__(self, guild_id: int, role_id: int, action: str, requested_by: int, channel_id: int,
+                 member_ids: List[int], cursor: int = 0, success: int = 0, skipped: int = 0, errors: int = 0,
+                 error_samples: Optional[List[str]] = None, started_at: Optional[float] = None,
+                 finished_at: Optional[float] = None, status: str = STATUS_RUNNING):
+        self.guild_id = guild_id
+        self.role_id = role_id
+        self.action = action
+        self.requested_by = requested_by
+        self.channel_id = channel_id
+        self.member_ids = member_ids
+        self.cursor = cursor
+        self.success = success
+        self.skipped = skipped  # Members who left the guild before their turn
+        self.errors = errors
+        self.error_samples = error_samples or []
+        self.started_at = started_at if started_at is not None else time.time()
+        self.finished_at = finished_at
+        self.status = status
+        self.rate = 0.0  # Members processed per second over the recent window
+
+    @property
+    def total(self) -> int:
+        return len(self.member_ids)
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.cursor
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.rate <= 0:
+            return None
+        return self.remaining / self.rate
+
+    def to_dict(self) -> dict:
+        """Checkpoint state; the member list is stored separately"""
+        return {
+            'guild_id': self.guild_id,
+            'role_id': self.role_id,
+            'action': self.action,
+            'requested_by': self.requested_by,
+            'channel_id': self.channel_id,
+            'cursor': self.cursor,
+            'success': self.success,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'error_samples': self.error_samples,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'status': self.status
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, member_ids: Optional[List[int]] = None) -> 'RoleJob':
+        data = dict(data)
+        if member_ids is not None:
+            data['member_ids'] = member_ids
+        return cls(**data)
+
+class RoleJobManager:
+    """Runs at most one bulk role job per guild and checkpoints it to disk"""
+
+    def __init__(self, directory: str = ROLE_JOBS_DIR):
+        self.directory = directory
+        self._jobs: Dict[int, RoleJob] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._writers: Dict[int, DebouncedWriter] = {}
+        self._cancel_requested: Set[int] = set()
+
+    def _path(self, guild_id: int) -> str:
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+    def _members_path(self, guild_id: int) -> str:
+        return os.path.join(self.directory, f"{guild_id}{MEMBERS_SUFFIX}")
+
+    def _load(self, path: str) -> RoleJob:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if 'member_ids' in data:
+            return RoleJob.from_dict(data)  # Checkpoint written before the member list had its own file
+        with open(self._members_path(data['guild_id']), 'r') as f:
+            return RoleJob.from_dict(data, json.load(f))
+
+    def _writer(self, guild_id: int) -> DebouncedWriter:
+        writer = self._writers.get(guild_id)
+        if writer is None:
+            writer = DebouncedWriter(lambda: self._save(guild_id), CHECKPOINT_DELAY_MS, name=f"role-job-{guild_id}")
+            self._writers[guild_id] = writer
+        return writer
+
+    def _save(self, guild_id: int):
+        job = self._jobs.get(guild_id)
+        if job is not None:
+            atomic_write_bytes(self._path(guild_id), json.dumps(job.to_dict()).encode('utf-8'))
+
+    def load_unfinished(self) -> List[RoleJob]:
+        """Jobs that were still running when the bot stopped"""
+        jobs = []
+        if not os.path.isdir(self.directory):
+            return jobs
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json') or filename.endswith(MEMBERS_SUFFIX):
+                continue
+            try:
+                job = self._load(os.path.join(self.directory, filename))
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.error(f"Error reading role job {filename}: {e}")
+                continue
+            if job.status == STATUS_RUNNING and job.guild_id not in self._tasks:
+                jobs.append(job)
+        return jobs
+
+    def get(self, guild_id: int) -> Optional[RoleJob]:
+        """Current or most recent job of a guild"""
+        job = self._jobs.get(guild_id)
+        if job is None:
+            try:
+                job = self._load(self._path(guild_id))
+            except (OSError, ValueError, TypeError, KeyError):
+                return None
+        return job
+
+    def is_running(self, guild_id: int) -> bool:
+        task = self._tasks.get(guild_id)
+        return task is not None and not task.done()
+
+    def start(self, guild: discord.Guild, job: RoleJob,
+              on_progress: Optional[Callable[[RoleJob], Awaitable[None]]] = None,
+              on_finish: Optional[Callable[[RoleJob], Awaitable[None]]] = None) -> asyncio.Task:
+        if self.is_running(job.guild_id):
+            raise RuntimeError(f"A role job is already running for guild {job.guild_id}")
+        self._jobs[job.guild_id] = job
+        if job.cursor == 0 or not os.path.exists(self._members_path(job.guild_id)):
+            # La lista de miembros se escribe una sola vez; los checkpoints solo guardan el cursor
+            atomic_write_bytes(self._members_path(job.guild_id), json.dumps(job.member_ids).encode('utf-8'))
+        self._writer(job.guild_id).flush_now()
+        task = asyncio.create_task(self._run(guild, job, on_progress, on_finish), name=f"role-job-{job.guild_id}")
+        self._tasks[job.guild_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.guild_id, None))
+        return task
+
+    def cancel(self, guild_id: int) -> bool:
+        task = self._tasks.get(guild_id)
+        if task is None or task.done():
+            return False
+        self._cancel_requested.add(guild_id)
+        task.cancel()
+        return True
+
+    async def _apply(self, guild: discord.Guild, role: discord.Role, job: RoleJob, member_id: int) -> bool:
+        """Apply the job to one member; False if the member is no longer in the guild"""
+        member = guild.get_member(member_id)
+        if member is None:
+            return False
+        has_role = member.get_role(role.id) is not None
+        reason = f"Rol {'añadido' if job.action == ACTION_ADD else 'quitado'} masivamente por {job.requested_by}"
+        if job.action == ACTION_ADD and not has_role:
+            await member.add_roles(role, reason=reason)
+        elif job.action == ACTION_REMOVE and has_role:
+            await member.remove_roles(role, reason=reason)
+        return True
+
+    async def _run(self, guild: discord.Guild, job: RoleJob,
+                   on_progress: Optional[Callable[[RoleJob], Awaitable[None]]],
+                   on_finish: Optional[Callable[[RoleJob], Awaitable[None]]]):
+        writer = self._writer(job.guild_id)
+        role = guild.get_role(job.role_id)
+        last_progress = time.monotonic()
+        # (instante, cursor): los miembros saltados también cuentan para el ritmo
+        window = collections.deque([(last_progress, job.cursor)])
+        try:
+            if role is None:
+                raise RuntimeError(f"Role {job.role_id} no longer exists")
+
+            while job.cursor < job.total:
+                member_id = job.member_ids[job.cursor]
+                for attempt in range(1, MAX_RETRIES + 1):
+                    try:
+                        if await self._apply(guild, role, job, member_id):
+                            job.success += 1
+                        else:
+                            job.skipped += 1
+                        break
+                    except discord.Forbidden:
+                        self._record_error(job, member_id, "Sin permisos")
+                        break
+                    except discord.NotFound:
+                        job.skipped += 1  # Se fue justo antes de la petición
+                        break
+                    except discord.HTTPException as e:
+                        if (e.status == 429 or e.status >= 500) and attempt < MAX_RETRIES:
+                            await asyncio.sleep(2 ** attempt)
+                            continue
+                        self._record_error(job, member_id, f"Error HTTP {e.status}")
+                        break
+
+                job.cursor += 1
+                self._update_rate(job, window)
+                writer.schedule()
+
+                if on_progress and time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                    last_progress = time.monotonic()
+                    if not await self._notify(on_progress, job):
+                        # P. ej. el token de la interacción caducó: no insistir durante horas
+                        logger.warning(f"Stopped progress updates for role job in guild {job.guild_id}")
+                        on_progress = None
+
+            job.status = STATUS_DONE
+        except asyncio.CancelledError:
+            if job.guild_id not in self._cancel_requested:
+                # Bot shutting down: leave the checkpoint as running so it resumes
+                writer.flush_now()
+                raise
+            job.status = STATUS_CANCELLED
+        except Exception as e:
+            logger.error(f"Role job for guild {job.guild_id} failed: {e}")
+            job.status = STATUS_FAILED
+        finally:
+            self._cancel_requested.discard(job.guild_id)
+
+        job.finished_at = time.time()
+        writer.flush_now()
+        logger.info(
+            f"Role job {job.action} {job.role_id} in guild {job.guild_id} {job.status}: "
+            f"{job.cursor}/{job.total} processed, {job.success} ok, {job.skipped} skipped, {job.errors} errors"
+        )
+
+        if on_finish:
+            await self._notify(on_finish, job)
+
+    @staticmethod
+    def _update_rate(job: RoleJob, window: Deque[Tuple[float, int]]):
+        """Members processed over wall-clock time across the last RATE_WINDOW_SECONDS"""
+        now = time.monotonic()
+        window.append((now, job.cursor))
+        while len(window) > 2 and now - window[1][0] >= RATE_WINDOW_SECONDS:
+            window.popleft()
+        since, cursor = window[0]
+        if now - since >= RATE_MIN_SPAN_SECONDS:
+            job.rate = (job.cursor - cursor) / (now - since)
+
+    @staticmethod
+    def _record_error(job: RoleJob, member_id: int, message: str):
+        job.errors += 1
+        if len(job.error_samples) < MAX_ERROR_SAMPLES:
+            job.error_samples.append(f"{member_id}: {message}")
+
+    @staticmethod
+    async def _notify(callback: Callable[[RoleJob], Awaitable[None]], job: RoleJob) -> bool:
+        try:
+            await callback(job)
+            return True
+        except Exception as e:
+            logger.error(f"Error reporting role job progress for guild {job.guild_id}: {e}")
+            return False
+
+# Shared instance used by the tickets cog
+role_jobs = RoleJobManager()
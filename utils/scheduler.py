@@ -0,0 +1,88 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class DeadlineScheduler:
+    """Single-task scheduler for many keyed deadlines.
+
+    Deadlines live in one min-heap; rescheduling a key pushes a new entry
+    and stale ones are skipped when popped (lazy deletion), so updates are
+    O(log n) and there is never more than one sleeping task no matter how
+    many keys are tracked. Deadlines are wall-clock timestamps so they can
+    be persisted and restored after a restart.
+    """
+
+    def __init__(self, name: str = "scheduler"):
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._due: Dict[Hashable, float] = {}
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._due)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._due
+
+    def due(self, key: Hashable) -> Optional[float]:
+        return self._due.get(key)
+
+    def items(self) -> List[Tuple[Hashable, float]]:
+        """Snapshot of every pending (key, deadline)"""
+        return list(self._due.items())
+
+    def schedule(self, key: Hashable, when: float):
+        """Set (or move) the deadline of ``key`` to the timestamp ``when``"""
+        self._due[key] = when
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._compact()
+        heapq.heappush(self._heap, (when, next(self._counter), key))
+        if self._wakeup is not None and self._heap[0][2] == key:
+            self._wakeup.set()  # New earliest deadline
+
+    def cancel(self, key: Hashable):
+        self._due.pop(key, None)
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._due.get(entry[2]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def start(self, callback: Callable[[Hashable], Awaitable[None]]):
+        """Run ``callback(key)`` for every deadline that passes"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(callback), name=self.name)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, callback: Callable[[Hashable], Awaitable[None]]):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                when, _, key = heapq.heappop(self._heap)
+                if self._due.get(key) != when:
+                    continue  # Rescheduled or cancelled
+                del self._due[key]
+                try:
+                    await callback(key)
+                except Exception as e:
+                    logger.error(f"Error in {self.name} callback for {key}: {e}")
+
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,285 @@
+"""SQLite backend for guild settings.
+
+Each guild's settings live in their own row, so a write touches a single
+row instead of rewriting config.json. Every row is loaded into memory once
+at startup; after that reads never touch the database.
+
+Enable it with ``SETTINGS_BACKEND=sqlite`` (optionally ``SETTINGS_DB_PATH``)
+after importing the current config once::
+
+    python -m utils.settings_db migrate config.json settings.db
+"""
+import argparse
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+from utils.guild_settings import ChangeNotifier, GuildSettings, SnapshotCache, diff_settings
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_DB_PATH = 'settings.db'
+SECTIONS = ('servers', 'guilds')
+EMPTY_SETTINGS = MappingProxyType({})  # Shared so unconfigured guilds keep one snapshot
+WRITE_ATTEMPTS = 3
+WRITE_RETRY_SECONDS = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    section    TEXT    NOT NULL,
+    guild_id   INTEGER NOT NULL,
+    data       TEXT    NOT NULL,
+    updated_at REAL    NOT NULL,
+    PRIMARY KEY (section, guild_id)
+) WITHOUT ROWID;
+"""
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the settings database and make sure the schema exists"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+class SqliteConfigStore(ChangeNotifier):
+    """Drop-in replacement for ConfigStore backed by one row per guild.
+
+    Every SQLite call runs on a single dedicated worker thread that owns the
+    connection. All rows are read into the cache when the store is created
+    (at import, before the event loop runs), so reads are pure cache
+    lookups; writes update the cache immediately and are queued to the
+    worker, so hot paths never wait on disk. Only ``refresh`` and ``flush``
+    block, and they are called from a worker thread and at shutdown. A write
+    that still fails after ``WRITE_ATTEMPTS`` is undone in the cache from the
+    stored row and published as a change, so nothing reports a setting the
+    database does not have.
+    """
+
+    def __init__(self, path: str = SETTINGS_DB_PATH):
+        super().__init__()
+        self.path = path
+        self._sections: Dict[str, Dict[int, dict]] = {section: {} for section in SECTIONS}
+        self._cache = self._sections['servers']
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="settings-db")
+        self._snapshots = SnapshotCache()
+        self._write_seq: Dict[Tuple[str, int], int] = {}  # Latest queued write per row
+        self._data_version, sections = self._call(self._read_all)
+        for section, rows in sections.items():
+            self._sections[section].update(rows)
+        logger.info(f"Loaded settings of {len(self._cache)} guild(s) from {self.path}")
+
+    # -- worker thread ---------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def _read_data_version(self) -> int:
+        # Only bumped by commits from other connections (external edits)
+        return self._conn().execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_all(self) -> Tuple[int, Dict[str, Dict[int, dict]]]:
+        """Data version and every row, read in one transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            version = self._read_data_version()
+            sections = {section: {} for section in SECTIONS}
+            for section, guild_id, data in conn.execute("SELECT section, guild_id, data FROM guild_settings"):
+                if section in sections:
+                    sections[section][guild_id] = json.loads(data)
+        finally:
+            conn.execute("COMMIT")
+        return version, sections
+
+    def _write_row(self, section: str, guild_id: int, payload: str, seq: int):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self._conn().execute(
+                    "INSERT INTO guild_settings (section, guild_id, data, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(section, guild_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                    (section, guild_id, payload, time.time())
+                )
+                return
+            except sqlite3.Error as e:
+                error = e
+                if attempt < WRITE_ATTEMPTS:
+                    time.sleep(WRITE_RETRY_SECONDS * attempt)
+        logger.error(f"Error saving settings for guild {guild_id}, reverting to the stored copy: {error}")
+        self._revert_row(section, guild_id, seq)
+
+    def _revert_row(self, section: str, guild_id: int, seq: int):
+        """Put the stored row back in the cache after its write failed for good"""
+        try:
+            row = self._conn().execute(
+                "SELECT data FROM guild_settings WHERE section = ? AND guild_id = ?",
+                (section, guild_id)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error re-reading settings for guild {guild_id}: {e}")
+            return
+        stored = json.loads(row[0]) if row else None
+        rows = self._sections[section]
+        with self._lock:
+            if self._write_seq.get((section, guild_id)) != seq:
+                return  # Una escritura posterior lleva el estado completo
+            old = rows.get(guild_id, {})
+            if stored is None:
+                rows.pop(guild_id, None)
+            else:
+                rows[guild_id] = stored
+        if section == 'servers':
+            self._publish(diff_settings({guild_id: old}, {guild_id: stored or {}}))
+
+    def _call(self, fn, *args):
+        return self._executor.submit(fn, *args).result()
+
+    # -- accessor API (same as ConfigStore) ------------------------------
+
+    def refresh(self) -> bool:
+        """Reload the cache if another process wrote to the database.
+
+        Blocks on the database; the config watcher runs it in a worker thread.
+        """
+        version = self._call(self._read_data_version)
+        if version == self._data_version:
+            return False
+
+        version, sections = self._call(self._read_all)
+        self._data_version = version
+        with self._lock:
+            self._sections['guilds'].clear()
+            self._sections['guilds'].update(sections['guilds'])
+            fresh = sections['servers']
+            changes = diff_settings(self._cache, fresh)
+            for guild_id in {change.guild_id for change in changes}:
+                if guild_id in fresh:
+                    self._cache[guild_id] = fresh[guild_id]
+                else:
+                    self._cache.pop(guild_id, None)
+
+        if changes:
+            logger.info(f"{self.path} changed externally: {len(changes)} setting(s) updated")
+        self._publish(changes)
+        return True
+
+    def get_server(self, guild_id: int) -> dict:
+        """Return the settings of one guild. Treat as read-only"""
+        return self._cache.get(int(guild_id), EMPTY_SETTINGS)
+
+    def settings(self, guild_id: int) -> GuildSettings:
+        """Compiled, immutable snapshot of one guild's settings"""
+        return self._snapshots.get(int(guild_id), self.get_server(guild_id))
+
+    def iter_servers(self) -> List[Tuple[int, dict]]:
+        """Snapshot of (guild_id, settings) for every configured guild"""
+        with self._lock:
+            return list(self._cache.items())
+
+    def load(self) -> dict:
+        """Return a private deep copy of every section, shaped like config.json"""
+        with self._lock:
+            return copy.deepcopy({
+                section: {str(guild_id): data for guild_id, data in rows.items()}
+                for section, rows in self._sections.items()
+            })
+
+    def _patch(self, guild_id: int, server_config: dict):
+        guild_id = int(guild_id)
+        with self._lock:
+            old = self._cache.get(guild_id, {})
+            self._cache[guild_id] = server_config
+            seq = self._write_seq[('servers', guild_id)] = self._write_seq.get(('servers', guild_id), 0) + 1
+            self._executor.submit(self._write_row, 'servers', guild_id, json.dumps(server_config), seq)
+        self._publish(diff_settings({guild_id: old}, {guild_id: server_config}))
+
+    def set(self, guild_id: int, key: str, value: Any):
+        """Set one guild setting"""
+        with self._lock:
+            server_config = dict(self.get_server(guild_id))
+            server_config[key] = value
+            self._patch(guild_id, server_config)
+
+    def delete(self, guild_id: int, key: str) -> bool:
+        """Remove one guild setting. Returns False if it was not set"""
+        with self._lock:
+            current = self.get_server(guild_id)
+            if key not in current:
+                return False
+            server_config = dict(current)
+            del server_config[key]
+            self._patch(guild_id, server_config)
+            return True
+
+    def add_to_list(self, guild_id: int, key: str, item: Any) -> bool:
+        """Append ``item`` to a list setting. Returns False if already present"""
+        with self._lock:
+            current = self.get_server(guild_id).get(key, [])
+            if item in current:
+                return False
+            self.set(guild_id, key, current + [item])
+            return True
+
+    def remove_from_list(self, guild_id: int, key: str, item: Any) -> bool:
+        """Remove ``item`` from a list setting. Returns False if not present"""
+        with self._lock:
+            current = self.get_server(guild_id).get(key, [])
+            if item not in current:
+                return False
+            self.set(guild_id, key, [x for x in current if x != item])
+            return True
+
+    def flush(self):
+        """Wait until every queued write has reached the database"""
+        self._call(lambda: None)
+
+def migrate(config_path: str, db_path: str) -> Dict[str, int]:
+    """Import the ``servers`` and ``guilds`` sections of config.json.
+
+    Existing rows for the same guild are overwritten, so the migration can
+    be re-run safely. Returns the number of rows imported per section.
+    """
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    counts = {}
+    conn = connect(db_path)
+    try:
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN")
+            for section in SECTIONS:
+                entries = config.get(section, {}) or {}
+                conn.executemany(
+                    "INSERT OR REPLACE INTO guild_settings (section, guild_id, data, updated_at) VALUES (?, ?, ?, ?)",
+                    [(section, int(guild_id), json.dumps(data), now) for guild_id, data in entries.items()]
+                )
+                counts[section] = len(entries)
+    finally:
+        conn.close()
+    return counts
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Guild settings database tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="Import config.json into the settings database")
+    migrate_parser.add_argument('config', nargs='?', default='config.json')
+    migrate_parser.add_argument('database', nargs='?', default=SETTINGS_DB_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        counts = migrate(args.config, args.database)
+        print(f"Imported {counts['servers']} server(s) and {counts['guilds']} guild(s) into {args.database}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+def atomic_write_bytes(path: str, payload: bytes):
+    """Write a file atomically: temp file in the same directory + fsync + rename.
+
+    A crash mid-write leaves either the old file or the new one on disk,
+    never a truncated mix of both.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{os.path.basename(path)}.",
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2):
+    """Serialize ``data`` as JSON and write it atomically"""
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode('utf-8'))
+
+class DebouncedWriter:
+    """Coalesce bursts of write requests into a single flush.
+
+    ``schedule()`` is cheap and never touches the disk: the first call arms
+    a timer and further calls inside the window are absorbed by it. The
+    flush callback runs on a background timer thread, so callers on the
+    event loop never wait on I/O.
+    """
+
+    def __init__(self, flush: Callable[[], None], delay_ms: int = 500, name: str = "writer"):
+        self._flush = flush
+        self.delay = delay_ms / 1000
+        self.name = name
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        return self._timer is not None
+
+    def schedule(self):
+        """Request a flush within ``delay_ms``"""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.name = f"{self.name}-flush"
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self._flush()
+        except Exception as e:
+            logger.error(f"Error flushing {self.name}: {e}")
+
+    def flush_now(self):
+        """Cancel any pending timer and flush synchronously (e.g. on shutdown)"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self._flush()
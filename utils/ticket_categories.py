@@ -0,0 +1,188 @@
+import discord
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+from utils.config_store import config_store
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_CHANNEL_LIMIT = 50  # Discord limit per category
+OVERFLOW_KEY = 'ticket_overflow_category_ids'
+OVERFLOW_IDLE_SECONDS = 600  # An empty overflow category is removed after this long
+
+class GuildShards:
+    """Ticket categories of one guild and the channels each one holds"""
+
+    __slots__ = ('primary_id', 'overflow_ids', 'channels', 'reserved', 'creating')
+
+    def __init__(self, primary_id: int, overflow_ids: List[int]):
+        self.primary_id = primary_id
+        self.overflow_ids = overflow_ids
+        self.channels: Dict[int, Set[int]] = {}
+        self.reserved: Dict[int, int] = {}  # Channel creations in flight per category
+        self.creating: Optional[asyncio.Future] = None
+
+    @property
+    def category_ids(self) -> List[int]:
+        return [self.primary_id] + self.overflow_ids
+
+    def fill(self, category_id: int) -> int:
+        return len(self.channels.get(category_id, ())) + self.reserved.get(category_id, 0)
+
+class TicketCategoryShards:
+    """Spread ticket channels over the ticket category and overflow categories.
+
+    Each category's channel IDs are counted once when a guild is first used
+    and then kept current from channel create/delete/update events, so
+    picking the least-full category never scans the guild's channels. When
+    every category is full a new overflow category is created with the
+    primary category's permissions; overflow categories that stay empty are
+    deleted again. The overflow list is stored in the guild settings.
+    """
+
+    def __init__(self):
+        self._guilds: Dict[int, GuildShards] = {}
+        self._cleanups: Dict[int, asyncio.Task] = {}
+
+    def _state(self, guild: discord.Guild, primary: discord.CategoryChannel) -> GuildShards:
+        state = self._guilds.get(guild.id)
+        if state is not None and state.primary_id == primary.id:
+            return state
+
+        overflow_ids = []
+        for category_id in config_store.get_server(guild.id).get(OVERFLOW_KEY, []):
+            if isinstance(guild.get_channel(category_id), discord.CategoryChannel):
+                overflow_ids.append(category_id)
+            else:
+                config_store.remove_from_list(guild.id, OVERFLOW_KEY, category_id)
+
+        state = GuildShards(primary.id, overflow_ids)
+        for category_id in state.category_ids:
+            category = guild.get_channel(category_id)
+            state.channels[category_id] = {channel.id for channel in category.channels}
+        self._guilds[guild.id] = state
+        logger.debug(
+            f"Ticket categories for {guild.name}: "
+            + ", ".join(f"{category_id}={state.fill(category_id)}" for category_id in state.category_ids)
+        )
+        return state
+
+    def fills(self, guild: discord.Guild, primary: Optional[discord.CategoryChannel]) -> Dict[int, int]:
+        """Channels per ticket category, primary first"""
+        if primary is None:
+            return {}
+        state = self._state(guild, primary)
+        return {category_id: state.fill(category_id) for category_id in state.category_ids}
+
+    @asynccontextmanager
+    async def reserve(self, guild: discord.Guild,
+                      primary: Optional[discord.CategoryChannel]) -> AsyncIterator[Optional[discord.CategoryChannel]]:
+        """Category with room for one more channel, held while the channel is created"""
+        if primary is None:
+            yield None
+            return
+        state = self._state(guild, primary)
+        category_id = await self._pick(guild, primary, state)
+        state.reserved[category_id] = state.reserved.get(category_id, 0) + 1
+        try:
+            yield guild.get_channel(category_id)
+        finally:
+            state.reserved[category_id] -= 1
+
+    async def _pick(self, guild: discord.Guild, primary: discord.CategoryChannel, state: GuildShards) -> int:
+        while True:
+            category_id = min(state.category_ids, key=state.fill)
+            if state.fill(category_id) < CATEGORY_CHANNEL_LIMIT:
+                return category_id
+            if state.creating is not None:
+                # Otra creación ya está abriendo una categoría nueva
+                await asyncio.shield(state.creating)
+                continue
+            state.creating = asyncio.get_running_loop().create_future()
+            try:
+                category = await guild.create_category(
+                    name=f"{primary.name} {len(state.category_ids) + 1}",
+                    overwrites=primary.overwrites,
+                    reason="Categoría de tickets llena"
+                )
+                state.overflow_ids.append(category.id)
+                state.channels[category.id] = set()
+                config_store.add_to_list(guild.id, OVERFLOW_KEY, category.id)
+                logger.info(f"Created overflow ticket category {category.name} in {guild.name}")
+                return category.id
+            finally:
+                state.creating.set_result(None)
+                state.creating = None
+
+    def _tracked(self, channel: discord.abc.GuildChannel) -> Optional[GuildShards]:
+        return self._guilds.get(channel.guild.id)
+
+    def channel_created(self, channel: discord.abc.GuildChannel):
+        state = self._tracked(channel)
+        if state is not None and channel.category_id in state.channels:
+            state.channels[channel.category_id].add(channel.id)
+
+    def channel_deleted(self, channel: discord.abc.GuildChannel):
+        state = self._tracked(channel)
+        if state is None:
+            return
+        if channel.id in state.channels:
+            # Se borró una de las categorías
+            self._guilds.pop(channel.guild.id, None)
+            return
+        members = state.channels.get(channel.category_id)
+        if members is not None:
+            members.discard(channel.id)
+            if not members and channel.category_id in state.overflow_ids:
+                self._schedule_cleanup(channel.guild)
+
+    def channel_moved(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if before.category_id != after.category_id:
+            self.channel_deleted(before)
+            self.channel_created(after)
+
+    def invalidate(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def config_changed(self, change):
+        """Drop the state of a guild whose categories were changed from outside"""
+        state = self._guilds.get(change.guild_id)
+        if state is None:
+            return
+        if change.key == 'ticket_category_id' or (
+                change.key == OVERFLOW_KEY and set(change.new or ()) != set(state.overflow_ids)):
+            self.invalidate(change.guild_id)
+
+    def _schedule_cleanup(self, guild: discord.Guild):
+        task = self._cleanups.get(guild.id)
+        if task is None or task.done():
+            self._cleanups[guild.id] = asyncio.create_task(self._cleanup(guild), name=f"ticket-categories-{guild.id}")
+
+    async def _cleanup(self, guild: discord.Guild):
+        """Delete overflow categories that stayed empty"""
+        await asyncio.sleep(OVERFLOW_IDLE_SECONDS)
+        state = self._guilds.get(guild.id)
+        if state is None:
+            return
+        for category_id in list(state.overflow_ids):
+            if state.fill(category_id):
+                continue
+            state.overflow_ids.remove(category_id)
+            state.channels.pop(category_id, None)
+            config_store.remove_from_list(guild.id, OVERFLOW_KEY, category_id)
+            category = guild.get_channel(category_id)
+            if category is not None:
+                try:
+                    await category.delete(reason="Categoría de tickets vacía")
+                    logger.info(f"Removed empty overflow ticket category {category.name} in {guild.name}")
+                except discord.HTTPException as e:
+                    logger.error(f"Error deleting overflow ticket category {category_id}: {e}")
+
+    def stop(self):
+        for task in self._cleanups.values():
+            task.cancel()
+        self._cleanups.clear()
+
+# Shared instance used by the tickets cog
+ticket_categories = TicketCategoryShards()
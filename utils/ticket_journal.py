@@ -0,0 +1,142 @@
+import discord
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Tuple
+from utils.storage import DebouncedWriter
+from utils.transcripts import message_record
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = 'data/journal'
+FLUSH_DELAY_MS = 1000
+
+class TicketJournal:
+    """Append-only per-ticket log of messages, edits and deletes.
+
+    Events are buffered in memory and appended to ``<channel_id>.jsonl`` by
+    a debounced writer. Closing a ticket replays its log locally and only
+    asks Discord for messages newer than the last journaled one (e.g. sent
+    while the bot was offline), so close latency does not grow with the
+    length of the ticket.
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR, flush_delay_ms: int = FLUSH_DELAY_MS):
+        self.directory = directory
+        self._buffers: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = DebouncedWriter(self._flush, flush_delay_ms, name="journal")
+
+    def _path(self, channel_id: int) -> str:
+        return os.path.join(self.directory, f"{channel_id}.jsonl")
+
+    def _append(self, channel_id: int, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffers.setdefault(channel_id, []).append(line)
+        self._writer.schedule()
+
+    def start(self, channel_id: int):
+        """Mark the journal of a new ticket as complete from its first message"""
+        self._append(channel_id, {'op': 'start'})
+
+    def record_message(self, message: discord.Message):
+        self._append(message.channel.id, {'op': 'create', **message_record(message)})
+
+    def record_edit(self, channel_id: int, message_id: int, data: dict):
+        """Journal an edit from a raw MESSAGE_UPDATE payload"""
+        entry = {'op': 'edit', 'id': message_id}
+        if 'content' in data:
+            entry['content'] = data['content']
+        if 'embeds' in data:
+            entry['embeds'] = data['embeds']
+        if 'attachments' in data:
+            entry['attachments'] = [
+                {'filename': a.get('filename'), 'url': a.get('url'), 'size': a.get('size')}
+                for a in data['attachments']
+            ]
+        if len(entry) > 2:
+            self._append(channel_id, entry)
+
+    def record_delete(self, channel_id: int, message_id: int):
+        self._append(channel_id, {'op': 'delete', 'id': message_id})
+
+    def _flush(self):
+        with self._write_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+            if not buffers:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            for channel_id, lines in buffers.items():
+                try:
+                    with open(self._path(channel_id), 'a', encoding='utf-8') as f:
+                        f.writelines(lines)
+                except OSError as e:
+                    logger.error(f"Error writing ticket journal for channel {channel_id}: {e}")
+
+    def flush(self):
+        """Write buffered events now (called on shutdown)"""
+        self._writer.flush_now()
+
+    def replay(self, channel_id: int) -> Tuple[Dict[int, dict], bool]:
+        """Current state of every journaled message, keyed by message ID.
+
+        The flag tells whether the journal covers the ticket since it was
+        opened; tickets opened before journaling existed only have a tail.
+        """
+        self.flush()
+        records: Dict[int, dict] = {}
+        complete = False
+        try:
+            with open(self._path(channel_id), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line after a crash
+                    op = entry.pop('op', None)
+                    message_id = entry.get('id')
+                    if op == 'start':
+                        complete = True
+                    elif op == 'create':
+                        records[message_id] = entry
+                    elif message_id in records:
+                        if op == 'edit':
+                            records[message_id].update(entry, edited=True)
+                        elif op == 'delete':
+                            records[message_id]['deleted'] = True
+        except FileNotFoundError:
+            pass
+        return records, complete
+
+    async def collect(self, channel: discord.TextChannel) -> List[dict]:
+        """Journaled messages plus anything sent since the last journaled one"""
+        records, complete = await asyncio.to_thread(self.replay, channel.id)
+        after = discord.Object(id=max(records)) if complete and records else None
+        fetched = 0
+        async for message in channel.history(limit=None, after=after, oldest_first=True):
+            if message.id not in records:
+                records[message.id] = message_record(message)
+                fetched += 1
+        if fetched:
+            logger.info(f"Fetched {fetched} message(s) missing from the journal of {channel.name}")
+        return [records[message_id] for message_id in sorted(records)]
+
+    def discard(self, channel_id: int):
+        """Delete the journal of a closed ticket"""
+        with self._write_lock:
+            with self._lock:
+                self._buffers.pop(channel_id, None)
+            try:
+                os.remove(self._path(channel_id))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error deleting ticket journal for channel {channel_id}: {e}")
+
+# Shared instance used by the tickets cog
+ticket_journal = TicketJournal()
@@ -0,0 +1,104 @@
+import discord
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from utils.config_store import config_store
+from utils.ticket_categories import ticket_categories
+from utils.ticket_templates import BOT, HIDDEN, ticket_templates
+
+logger = logging.getLogger(__name__)
+
+POOL_TOPIC = "Canal reservado para tickets (no borrar)"
+POOL_CHANNEL_NAME = "ticket-libre"
+POOL_MAX_SIZE = 10
+POOL_REFILL_INTERVAL_SECONDS = 15  # Pause between background creations
+POOL_ERROR_BACKOFF_SECONDS = 300
+
+class TicketChannelPool:
+    """Hidden, pre-created ticket channels waiting to be claimed.
+
+    With ``ticket_pool_size`` set for a guild, opening a ticket renames and
+    re-permissions a pooled channel (one edit) instead of creating one, so
+    the user is not waiting on channel creation or its rate limit. The pool
+    is refilled by one background task per guild, one channel at a time.
+    Pooled channels are recognised by their topic, so the pool survives
+    restarts without any extra state.
+    """
+
+    def __init__(self):
+        self._channels: Dict[int, List[int]] = {}
+        self._refills: Dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    def target_size(guild_id: int) -> int:
+        return min(config_store.get_server(guild_id).get('ticket_pool_size', 0), POOL_MAX_SIZE)
+
+    def available(self, guild_id: int) -> int:
+        return len(self._channels.get(guild_id, ()))
+
+    def adopt(self, guild: discord.Guild):
+        """Pick up pooled channels left from a previous run"""
+        # Se amplía la lista existente: un _refill en curso sigue usando la misma
+        pooled = self._channels.setdefault(guild.id, [])
+        found = [channel.id for channel in guild.text_channels if channel.topic == POOL_TOPIC and channel.id not in pooled]
+        pooled.extend(found)
+        if found:
+            logger.info(f"Adopted {len(found)} pooled ticket channel(s) in {guild.name}")
+
+    def take(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Claim a pooled channel, if any, and start refilling"""
+        pooled = self._channels.get(guild.id)
+        channel = None
+        while pooled and channel is None:
+            channel = guild.get_channel(pooled.pop(0))
+        self.refill(guild)
+        return channel
+
+    def discard(self, guild_id: int, channel_id: int):
+        pooled = self._channels.get(guild_id)
+        if pooled and channel_id in pooled:
+            pooled.remove(channel_id)
+
+    def refill(self, guild: discord.Guild):
+        """Bring the pool of a guild to its configured size in the background"""
+        task = self._refills.get(guild.id)
+        if task is not None and not task.done():
+            return
+        if self.available(guild.id) == self.target_size(guild.id):
+            return
+        self._refills[guild.id] = asyncio.create_task(self._refill(guild), name=f"ticket-pool-{guild.id}")
+
+    async def _refill(self, guild: discord.Guild):
+        pooled = self._channels.setdefault(guild.id, [])
+        try:
+            while len(pooled) > self.target_size(guild.id):
+                channel = guild.get_channel(pooled.pop())
+                if channel is not None:
+                    await channel.delete(reason="Reserva de tickets reducida")
+
+            while len(pooled) < self.target_size(guild.id):
+                template = ticket_templates.get(guild)
+                async with ticket_categories.reserve(guild, template.category) as category:
+                    channel = await guild.create_text_channel(
+                        name=POOL_CHANNEL_NAME,
+                        category=category,
+                        overwrites={guild.default_role: HIDDEN, guild.me: BOT},
+                        topic=POOL_TOPIC,
+                        reason="Reserva de canales de ticket"
+                    )
+                    ticket_categories.channel_created(channel)
+                if channel.id not in pooled:
+                    pooled.append(channel.id)
+                logger.debug(f"Ticket pool for {guild.name}: {len(pooled)}/{self.target_size(guild.id)}")
+                await asyncio.sleep(POOL_REFILL_INTERVAL_SECONDS)
+        except discord.HTTPException as e:
+            logger.error(f"Error refilling ticket pool for {guild.name}: {e}")
+            await asyncio.sleep(POOL_ERROR_BACKOFF_SECONDS)
+
+    def stop(self):
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
+
+# Shared instance used by the tickets cog
+ticket_pool = TicketChannelPool()
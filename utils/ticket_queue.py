@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Channel creations running at once per guild; the rest wait in line
+TICKET_CREATE_CONCURRENCY = int(os.getenv('TICKET_CREATE_CONCURRENCY', 2))
+STATS_WINDOW = 500  # Latest creations kept for throughput / percentiles
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of an unsorted sequence (0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+class TicketCreationQueue:
+    """Per-guild queue for ticket channel creation.
+
+    A user can have at most one request in flight per guild, so double
+    clicks cannot create two channels. Each guild runs at most
+    ``concurrency`` creations at once; everyone else waits in FIFO order
+    (asyncio semaphores wake waiters in order) instead of all hitting the
+    channel-creation rate limit together.
+    """
+
+    def __init__(self, concurrency: int = TICKET_CREATE_CONCURRENCY):
+        self.concurrency = concurrency
+        self._slots: Dict[int, asyncio.Semaphore] = {}
+        self._pending: Dict[int, int] = {}  # Queued or running, per guild
+        self._in_flight: Set[Tuple[int, int]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._samples: Dict[int, Deque[Tuple[float, float]]] = {}  # guild -> (finished_at, seconds)
+        self._burst: Dict[int, int] = {}
+
+    def is_pending(self, guild_id: int, user_id: int) -> bool:
+        return (guild_id, user_id) in self._in_flight
+
+    def submit(self, guild_id: int, user_id: int,
+               create: Callable[[], Awaitable[None]]) -> Optional[int]:
+        """Queue a creation. Returns the position in line (0 = starting now),
+        or None if this user already has a request in flight."""
+        key = (guild_id, user_id)
+        if key in self._in_flight:
+            return None
+        slots = self._slots.setdefault(guild_id, asyncio.Semaphore(self.concurrency))
+        pending = self._pending.get(guild_id, 0)
+        position = max(pending - self.concurrency + 1, 0)
+
+        self._in_flight.add(key)
+        self._pending[guild_id] = pending + 1
+        task = asyncio.create_task(self._run(guild_id, key, slots, create), name=f"ticket-create-{guild_id}-{user_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return position
+
+    async def _run(self, guild_id: int, key: Tuple[int, int], slots: asyncio.Semaphore,
+                   create: Callable[[], Awaitable[None]]):
+        queued_at = time.monotonic()
+        try:
+            async with slots:
+                await create()
+            finished_at = time.monotonic()
+            self._samples.setdefault(guild_id, deque(maxlen=STATS_WINDOW)).append((finished_at, finished_at - queued_at))
+            self._burst[guild_id] = self._burst.get(guild_id, 0) + 1
+        except Exception as e:
+            logger.error(f"Error in ticket creation queue for guild {guild_id}: {e}")
+        finally:
+            self._in_flight.discard(key)
+            self._pending[guild_id] -= 1
+            if not self._pending[guild_id]:
+                del self._pending[guild_id]
+                self._report(guild_id)
+
+    def _report(self, guild_id: int):
+        created = self._burst.pop(guild_id, 0)
+        if created > 1:
+            stats = self.stats(guild_id)
+            logger.info(
+                f"Ticket queue drained for guild {guild_id}: {created} ticket(s), "
+                f"{stats['per_minute']:.1f}/min, p50={stats['p50']:.2f}s p95={stats['p95']:.2f}s"
+            )
+
+    def stats(self, guild_id: int) -> dict:
+        """Throughput and time-to-channel percentiles over the latest creations"""
+        samples = self._samples.get(guild_id) or ()
+        latencies = [seconds for _, seconds in samples]
+        per_minute = 0.0
+        if len(samples) > 1:
+            span = samples[-1][0] - samples[0][0]
+            per_minute = (len(samples) - 1) / span * 60 if span > 0 else 0.0
+        return {
+            'count': len(latencies),
+            'waiting': max(self._pending.get(guild_id, 0) - self.concurrency, 0),
+            'per_minute': per_minute,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95)
+        }
+
+# Shared instance used by the tickets cog
+ticket_queue = TicketCreationQueue()
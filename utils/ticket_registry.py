@@ -0,0 +1,239 @@
+import json
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.storage import DebouncedWriter, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+TICKETS_PATH = 'data/tickets.json'
+FLUSH_DELAY_MS = 500
+CLOSED_RETENTION_DAYS = 30
+ACTIVITY_PERSIST_SECONDS = 60  # Activity updates closer together than this are not re-saved
+
+STATUS_OPEN = 'open'
+STATUS_CLOSED = 'closed'
+
+class TicketRecord:
+    """One ticket channel and who it belongs to"""
+
+    __slots__ = (
+        'channel_id', 'guild_id', 'owner_id', 'opened_at', 'status', 'closed_at', 'participants',
+        'last_activity', 'warned_at', 'first_response_at', '_saved_activity'
+    )
+
+    def __init__(self, channel_id: int, guild_id: int, owner_id: int, opened_at: Optional[float] = None,
+                 status: str = STATUS_OPEN, closed_at: Optional[float] = None,
+                 participants: Iterable[int] = (), last_activity: Optional[float] = None,
+                 warned_at: Optional[float] = None, first_response_at: Optional[float] = None):
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.owner_id = owner_id
+        self.opened_at = opened_at if opened_at is not None else time.time()
+        self.status = status
+        self.closed_at = closed_at
+        self.participants = set(participants)
+        self.last_activity = last_activity if last_activity is not None else self.opened_at
+        self.warned_at = warned_at
+        self.first_response_at = first_response_at
+        self._saved_activity = self.last_activity
+
+    def __repr__(self):
+        return f"<TicketRecord channel_id={self.channel_id} owner_id={self.owner_id} status={self.status}>"
+
+    @property
+    def is_open(self) -> bool:
+        return self.status == STATUS_OPEN
+
+    def to_dict(self) -> dict:
+        return {
+            'channel_id': self.channel_id,
+            'guild_id': self.guild_id,
+            'owner_id': self.owner_id,
+            'opened_at': self.opened_at,
+            'status': self.status,
+            'closed_at': self.closed_at,
+            'participants': sorted(self.participants),
+            'last_activity': self.last_activity,
+            'warned_at': self.warned_at,
+            'first_response_at': self.first_response_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TicketRecord':
+        return cls(
+            int(data['channel_id']), int(data['guild_id']), int(data['owner_id']),
+            data.get('opened_at'), data.get('status', STATUS_OPEN), data.get('closed_at'),
+            (int(x) for x in data.get('participants', ())),
+            data.get('last_activity'), data.get('warned_at'), data.get('first_response_at')
+        )
+
+class TicketRegistry:
+    """Persistent index of ticket channels.
+
+    Tickets are looked up by channel ID and by (guild, owner), so finding a
+    user's open ticket or the owner of a channel is a dict lookup instead of
+    scanning channel names or parsing topics. Changes are persisted by a
+    debounced atomic write, like the settings store.
+    """
+
+    def __init__(self, path: str = TICKETS_PATH, flush_delay_ms: int = FLUSH_DELAY_MS):
+        self.path = path
+        self._by_channel: Dict[int, TicketRecord] = {}
+        self._open_by_owner: Dict[Tuple[int, int], TicketRecord] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._writer = DebouncedWriter(self._flush, flush_delay_ms, name="tickets")
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, 'r') as f:
+                    entries = json.load(f).get('tickets', [])
+            except FileNotFoundError:
+                entries = []
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Error reading {self.path}: {e}")
+                entries = []
+
+            cutoff = time.time() - CLOSED_RETENTION_DAYS * 86400
+            for entry in entries:
+                try:
+                    record = TicketRecord.from_dict(entry)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Skipping invalid ticket entry {entry}: {e}")
+                    continue
+                if not record.is_open and (record.closed_at or 0) < cutoff:
+                    continue
+                self._index(record)
+            self._loaded = True
+            logger.info(f"Loaded {len(self._open_by_owner)} open ticket(s) from {self.path}")
+
+    def _index(self, record: TicketRecord):
+        self._by_channel[record.channel_id] = record
+        if record.is_open:
+            self._open_by_owner[(record.guild_id, record.owner_id)] = record
+
+    def _changed(self):
+        self._writer.schedule()
+
+    def get(self, channel_id: int) -> Optional[TicketRecord]:
+        """Ticket stored for a channel, open or closed"""
+        self._ensure_loaded()
+        return self._by_channel.get(channel_id)
+
+    def get_open(self, channel_id: int) -> Optional[TicketRecord]:
+        """Open ticket stored for a channel"""
+        record = self.get(channel_id)
+        return record if record is not None and record.is_open else None
+
+    def find_open(self, guild_id: int, owner_id: int) -> Optional[TicketRecord]:
+        """Open ticket of a user in a guild"""
+        self._ensure_loaded()
+        return self._open_by_owner.get((guild_id, owner_id))
+
+    def open_tickets(self, guild_id: Optional[int] = None) -> List[TicketRecord]:
+        """Snapshot of open tickets, optionally for one guild"""
+        self._ensure_loaded()
+        return [
+            record for record in list(self._open_by_owner.values())
+            if guild_id is None or record.guild_id == guild_id
+        ]
+
+    def open(self, guild_id: int, channel_id: int, owner_id: int, opened_at: Optional[float] = None) -> TicketRecord:
+        """Register a new ticket channel"""
+        self._ensure_loaded()
+        with self._lock:
+            record = TicketRecord(channel_id, guild_id, owner_id, opened_at)
+            self._index(record)
+        self._changed()
+        return record
+
+    def close(self, channel_id: int) -> Optional[TicketRecord]:
+        """Mark a ticket closed. Returns None if it was not open"""
+        self._ensure_loaded()
+        with self._lock:
+            record = self._by_channel.get(channel_id)
+            if record is None or not record.is_open:
+                return None
+            record.status = STATUS_CLOSED
+            record.closed_at = time.time()
+            key = (record.guild_id, record.owner_id)
+            if self._open_by_owner.get(key) is record:
+                del self._open_by_owner[key]
+        self._changed()
+        return record
+
+    def add_participant(self, channel_id: int, user_id: int) -> bool:
+        record = self.get_open(channel_id)
+        if record is None or user_id in record.participants:
+            return False
+        with self._lock:
+            record.participants.add(user_id)
+        self._changed()
+        return True
+
+    def remove_participant(self, channel_id: int, user_id: int) -> bool:
+        record = self.get_open(channel_id)
+        if record is None or user_id not in record.participants:
+            return False
+        with self._lock:
+            record.participants.discard(user_id)
+        self._changed()
+        return True
+
+    def touch(self, channel_id: int, when: Optional[float] = None) -> Optional[TicketRecord]:
+        """Record activity in an open ticket (clears any inactivity warning)"""
+        record = self.get_open(channel_id)
+        if record is None:
+            return None
+        with self._lock:
+            record.last_activity = when if when is not None else time.time()
+            warned, record.warned_at = record.warned_at, None
+            save = warned is not None or record.last_activity - record._saved_activity >= ACTIVITY_PERSIST_SECONDS
+        if save:
+            self._changed()
+        return record
+
+    def mark_responded(self, channel_id: int, when: Optional[float] = None) -> Optional[TicketRecord]:
+        """Record the first staff reply. Returns the ticket only the first time"""
+        record = self.get_open(channel_id)
+        if record is None or record.first_response_at is not None:
+            return None
+        with self._lock:
+            record.first_response_at = when if when is not None else time.time()
+        self._changed()
+        return record
+
+    def mark_warned(self, channel_id: int) -> Optional[TicketRecord]:
+        record = self.get_open(channel_id)
+        if record is None:
+            return None
+        with self._lock:
+            record.warned_at = time.time()
+        self._changed()
+        return record
+
+    def _flush(self):
+        with self._lock:
+            payload = json.dumps(
+                {'tickets': [record.to_dict() for record in self._by_channel.values()]},
+                indent=2
+            ).encode('utf-8')
+            for record in self._by_channel.values():
+                record._saved_activity = record.last_activity
+        atomic_write_bytes(self.path, payload)
+        logger.debug(f"Saved {len(self._by_channel)} ticket(s) to {self.path}")
+
+    def flush(self):
+        """Write pending changes now (called on shutdown)"""
+        if self._writer.pending:
+            self._writer.flush_now()
+
+# Shared instance used by the tickets cog
+ticket_registry = TicketRegistry()
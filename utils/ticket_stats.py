@@ -0,0 +1,194 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from utils.storage import DebouncedWriter, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+TICKET_STATS_PATH = 'data/ticket_stats.json'
+STATS_FLUSH_DELAY_MS = 30000  # Aggregates are cheap to lose; save at most every 30 s
+HOURLY_WINDOW = 7 * 24  # Hours of ticket-open counts kept for the rate
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is open-ended
+DURATION_BUCKETS = (
+    30, 60, 120, 300, 600, 900, 1800, 3600, 2 * 3600, 4 * 3600, 8 * 3600,
+    12 * 3600, 86400, 2 * 86400, 3 * 86400, 7 * 86400, 14 * 86400
+)
+
+class Histogram:
+    """Fixed-bucket histogram of durations.
+
+    Adding a value is a binary search over the (constant) bucket bounds, and
+    percentiles are interpolated from the bucket counts, so neither depends
+    on how many values have been recorded.
+    """
+
+    __slots__ = ('counts', 'total', 'sum', 'max')
+
+    def __init__(self, counts: Optional[List[int]] = None, total: int = 0, sum: float = 0.0, max: float = 0.0):
+        self.counts = counts if counts and len(counts) == len(DURATION_BUCKETS) + 1 else [0] * (len(DURATION_BUCKETS) + 1)
+        self.total = total
+        self.sum = sum
+        self.max = max
+
+    def add(self, value: float):
+        value = max(value, 0.0)
+        self.counts[bisect.bisect_left(DURATION_BUCKETS, value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Approximate ``q``-th percentile (linear within the bucket)"""
+        if not self.total:
+            return 0.0
+        rank = q / 100 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = DURATION_BUCKETS[i - 1] if i else 0.0
+                high = DURATION_BUCKETS[i] if i < len(DURATION_BUCKETS) else self.max
+                return min(low + (high - low) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {'counts': self.counts, 'total': self.total, 'sum': self.sum, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Histogram':
+        return cls(data.get('counts'), data.get('total', 0), data.get('sum', 0.0), data.get('max', 0.0))
+
+class GuildTicketStats:
+    """Running ticket aggregates of one guild"""
+
+    __slots__ = ('opened', 'closed', 'first_response', 'open_duration', 'closes_by_staff', 'hourly', 'hourly_stamp')
+
+    def __init__(self, data: Optional[dict] = None):
+        data = data or {}
+        self.opened: int = data.get('opened', 0)
+        self.closed: int = data.get('closed', 0)
+        self.first_response = Histogram.from_dict(data.get('first_response', {}))
+        self.open_duration = Histogram.from_dict(data.get('open_duration', {}))
+        self.closes_by_staff: Dict[int, int] = {int(k): v for k, v in data.get('closes_by_staff', {}).items()}
+        # Ring buffer of tickets opened per hour; hourly_stamp[i] says which hour slot i holds
+        self.hourly: List[int] = data.get('hourly') or [0] * HOURLY_WINDOW
+        self.hourly_stamp: List[int] = data.get('hourly_stamp') or [0] * HOURLY_WINDOW
+
+    def count_open(self, when: float):
+        self.opened += 1
+        hour = int(when // 3600)
+        slot = hour % HOURLY_WINDOW
+        if self.hourly_stamp[slot] != hour:
+            self.hourly_stamp[slot] = hour
+            self.hourly[slot] = 0
+        self.hourly[slot] += 1
+
+    def opened_since(self, hours: int, now: Optional[float] = None) -> int:
+        """Tickets opened during the last ``hours`` hours (at most a week)"""
+        current = int((now if now is not None else time.time()) // 3600)
+        return sum(
+            count for count, stamp in zip(self.hourly, self.hourly_stamp)
+            if current - min(hours, HOURLY_WINDOW) < stamp <= current
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'opened': self.opened,
+            'closed': self.closed,
+            'first_response': self.first_response.to_dict(),
+            'open_duration': self.open_duration.to_dict(),
+            'closes_by_staff': {str(k): v for k, v in self.closes_by_staff.items()},
+            'hourly': self.hourly,
+            'hourly_stamp': self.hourly_stamp
+        }
+
+class TicketStats:
+    """Per-guild ticket analytics updated as events happen.
+
+    Every event is an O(1) update of in-memory aggregates; the whole set is
+    saved by a debounced write, so ``/ticket-stats`` never has to rescan
+    closed tickets or logs.
+    """
+
+    def __init__(self, path: str = TICKET_STATS_PATH, flush_delay_ms: int = STATS_FLUSH_DELAY_MS):
+        self.path = path
+        self._guilds: Dict[int, GuildTicketStats] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._writer = DebouncedWriter(self._flush, flush_delay_ms, name="ticket-stats")
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f).get('guilds', {})
+            except FileNotFoundError:
+                data = {}
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Error reading {self.path}: {e}")
+                data = {}
+            for guild_id, entry in data.items():
+                try:
+                    self._guilds[int(guild_id)] = GuildTicketStats(entry)
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Skipping invalid ticket stats for guild {guild_id}: {e}")
+            self._loaded = True
+
+    def get(self, guild_id: int) -> GuildTicketStats:
+        self._ensure_loaded()
+        stats = self._guilds.get(guild_id)
+        if stats is None:
+            with self._lock:
+                stats = self._guilds.setdefault(guild_id, GuildTicketStats())
+        return stats
+
+    def record_open(self, guild_id: int, when: Optional[float] = None):
+        stats = self.get(guild_id)
+        with self._lock:
+            stats.count_open(when if when is not None else time.time())
+        self._writer.schedule()
+
+    def record_first_response(self, guild_id: int, seconds: float):
+        stats = self.get(guild_id)
+        with self._lock:
+            stats.first_response.add(seconds)
+        self._writer.schedule()
+
+    def record_close(self, guild_id: int, open_seconds: float, closed_by: Optional[int] = None):
+        """A ticket closed; ``closed_by`` is the staff member who closed it, if any"""
+        stats = self.get(guild_id)
+        with self._lock:
+            stats.closed += 1
+            stats.open_duration.add(open_seconds)
+            if closed_by is not None:
+                stats.closes_by_staff[closed_by] = stats.closes_by_staff.get(closed_by, 0) + 1
+        self._writer.schedule()
+
+    def _flush(self):
+        with self._lock:
+            payload = json.dumps(
+                {'guilds': {str(guild_id): stats.to_dict() for guild_id, stats in self._guilds.items()}}
+            ).encode('utf-8')
+        atomic_write_bytes(self.path, payload)
+        logger.debug(f"Saved ticket stats for {len(self._guilds)} guild(s) to {self.path}")
+
+    def flush(self):
+        """Write pending changes now (called on shutdown)"""
+        if self._writer.pending:
+            self._writer.flush_now()
+
+# Shared instance used by the tickets cog
+ticket_stats = TicketStats()
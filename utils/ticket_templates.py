@@ -0,0 +1,90 @@
+import discord
+import logging
+from typing import Dict, Optional, Tuple
+from utils.config_store import config_store
+
+logger = logging.getLogger(__name__)
+
+# Permisos de cada tipo de participante en un canal de ticket
+HIDDEN = discord.PermissionOverwrite(view_channel=False)
+PARTICIPANT = discord.PermissionOverwrite(
+    view_channel=True, send_messages=True,
+    attach_files=True, embed_links=True
+)
+STAFF = discord.PermissionOverwrite(
+    view_channel=True, send_messages=True,
+    manage_messages=True
+)
+BOT = discord.PermissionOverwrite(
+    view_channel=True, send_messages=True,
+    manage_channels=True, manage_messages=True
+)
+
+class TicketTemplate:
+    """Everything a new ticket channel needs that only depends on the guild"""
+
+    __slots__ = ('guild_id', 'category', 'staff_roles', 'overwrites', 'staff_mentions')
+
+    def __init__(self, guild: discord.Guild):
+        server_config = config_store.get_server(guild.id)
+        self.guild_id = guild.id
+
+        self.category: Optional[discord.CategoryChannel] = None
+        if category_id := server_config.get('ticket_category_id'):
+            category = guild.get_channel(category_id)
+            if isinstance(category, discord.CategoryChannel):
+                self.category = category
+
+        self.staff_roles: Tuple[discord.Role, ...] = tuple(
+            role for role in map(guild.get_role, server_config.get('staff_role_ids', [])) if role
+        )
+
+        self.overwrites: Dict[discord.abc.Snowflake, discord.PermissionOverwrite] = {
+            guild.default_role: HIDDEN,
+            guild.me: BOT
+        }
+        for role in self.staff_roles:
+            self.overwrites[role] = STAFF
+
+        self.staff_mentions = " ".join(role.mention for role in self.staff_roles)
+
+    def overwrites_for(self, *users: discord.abc.Snowflake) -> Dict[discord.abc.Snowflake, discord.PermissionOverwrite]:
+        """Channel overwrites for a ticket visible to ``users`` (and staff)"""
+        overwrites = dict(self.overwrites)
+        for user in users:
+            overwrites[user] = PARTICIPANT
+        return overwrites
+
+    def uses_role(self, role_id: int) -> bool:
+        return any(role.id == role_id for role in self.staff_roles)
+
+class TicketTemplateCache:
+    """Per-guild TicketTemplate, built on first use and dropped when the
+    roles or settings it was built from change"""
+
+    def __init__(self):
+        self._templates: Dict[int, TicketTemplate] = {}
+
+    def get(self, guild: discord.Guild) -> TicketTemplate:
+        template = self._templates.get(guild.id)
+        if template is None:
+            template = self._templates[guild.id] = TicketTemplate(guild)
+            logger.debug(f"Built ticket template for {guild.name}: {len(template.staff_roles)} staff role(s)")
+        return template
+
+    def invalidate(self, guild_id: int):
+        self._templates.pop(guild_id, None)
+
+    def role_changed(self, role: discord.Role):
+        """A role was updated or deleted"""
+        template = self._templates.get(role.guild.id)
+        if template is not None and (template.uses_role(role.id) or role.is_default()):
+            self.invalidate(role.guild.id)
+
+    def channel_deleted(self, channel: discord.abc.GuildChannel):
+        template = self._templates.get(channel.guild.id)
+        if template is not None and template.category is not None and template.category.id == channel.id:
+            self.invalidate(channel.guild.id)
+
+# Shared instance used by the tickets cog
+ticket_templates = TicketTemplateCache()
@@ -0,0 +1,38 @@
+import time
+from contextlib import contextmanager
+from typing import Awaitable, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+class StageTimer:
+    """Wall-clock duration of each named stage of one operation.
+
+    Stages may overlap (``timed`` wraps awaitables run with ``gather``),
+    so the stage durations do not have to add up to ``elapsed``.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.stage(name):
+            return await awaitable
+
+    def summary(self) -> str:
+        parts = [f"{name}={duration * 1000:.0f}ms" for name, duration in self.stages]
+        parts.append(f"total={self.elapsed * 1000:.0f}ms")
+        return f"{self.name}: " + " ".join(parts)
@@ -0,0 +1,120 @@
+"""Local full-text archive of closed ticket transcripts.
+
+Every closed ticket is stored as one row in ``tickets`` (guild, owner,
+closer, dates) plus one document in an FTS5 index, so staff can search old
+cases with ranked snippets instead of scrolling the transcript channel.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from utils.transcripts import format_record
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATH = os.getenv('TRANSCRIPT_ARCHIVE_PATH', 'data/archive.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id     INTEGER PRIMARY KEY,
+    guild_id      INTEGER NOT NULL,
+    owner_id      INTEGER NOT NULL,
+    closer_id     INTEGER,
+    channel_name  TEXT    NOT NULL,
+    opened_at     REAL,
+    closed_at     REAL    NOT NULL,
+    message_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tickets_guild_closed ON tickets (guild_id, closed_at);
+CREATE INDEX IF NOT EXISTS tickets_guild_owner ON tickets (guild_id, owner_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5 (
+    channel_name, authors, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+class SearchHit(NamedTuple):
+    ticket_id: int
+    owner_id: int
+    closer_id: Optional[int]
+    channel_name: str
+    opened_at: Optional[float]
+    closed_at: float
+    message_count: int
+    snippet: str
+
+def fts_query(text: str) -> str:
+    """Quote every term so user input can never be parsed as FTS5 syntax"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+class TranscriptArchive:
+    """SQLite FTS5 archive; every call runs on one worker thread"""
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcript-archive")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _add(self, guild_id: int, ticket_id: int, owner_id: int, closer_id: Optional[int], channel_name: str,
+             opened_at: Optional[float], closed_at: float, records: List[dict]):
+        authors = " ".join(sorted({record.get('author', '') for record in records}))
+        body = "".join(format_record(record) for record in records)
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(
+                "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ticket_id, guild_id, owner_id, closer_id, channel_name, opened_at, closed_at, len(records))
+            )
+            conn.execute("DELETE FROM transcripts_fts WHERE rowid = ?", (ticket_id,))
+            conn.execute(
+                "INSERT INTO transcripts_fts (rowid, channel_name, authors, body) VALUES (?, ?, ?, ?)",
+                (ticket_id, channel_name, authors, body)
+            )
+
+    async def add(self, guild_id: int, ticket_id: int, owner_id: int, closer_id: Optional[int], channel_name: str,
+                  opened_at: Optional[float], closed_at: float, records: Iterable[dict]):
+        """Archive one closed ticket (re-archiving the same channel replaces it)"""
+        await self._run(self._add, guild_id, ticket_id, owner_id, closer_id, channel_name,
+                        opened_at, closed_at, list(records))
+
+    def _search(self, guild_id: int, query: str, owner_id: Optional[int], limit: int, offset: int) -> List[SearchHit]:
+        sql = (
+            "SELECT t.ticket_id, t.owner_id, t.closer_id, t.channel_name, t.opened_at, t.closed_at, t.message_count, "
+            "snippet(transcripts_fts, 2, '**', '**', '…', 16) "
+            "FROM transcripts_fts JOIN tickets t ON t.ticket_id = transcripts_fts.rowid "
+            "WHERE transcripts_fts MATCH ? AND t.guild_id = ?"
+        )
+        params: list = [fts_query(query), guild_id]
+        if owner_id is not None:
+            sql += " AND t.owner_id = ?"
+            params.append(owner_id)
+        sql += " ORDER BY bm25(transcripts_fts) LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        return [SearchHit(*row) for row in self._conn().execute(sql, params).fetchall()]
+
+    async def search(self, guild_id: int, query: str, owner_id: Optional[int] = None,
+                     limit: int = 5, offset: int = 0) -> Tuple[List[SearchHit], bool]:
+        """One page of ranked matches and whether more pages exist"""
+        hits = await self._run(self._search, guild_id, query, owner_id, limit + 1, offset)
+        return hits[:limit], len(hits) > limit
+
+# Shared instance used by the tickets cog
+transcript_archive = TranscriptArchive()
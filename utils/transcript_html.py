@@ -0,0 +1,120 @@
+"""Self-contained HTML transcripts.
+
+Rendering happens in two passes over the journaled records: the first only
+measures each message, the second writes the packed parts straight into
+spooled temporary files, so memory stays bounded for very long tickets.
+Large output is gzipped and anything over the upload limit is split into
+numbered parts. Everything here is synchronous and meant to run in a worker
+thread via ``asyncio.to_thread``.
+"""
+import discord
+import html
+from datetime import datetime
+from typing import List, Sequence, Tuple
+from utils.attachment_store import short_hash
+from utils.transcripts import (
+    TRANSCRIPT_GZIP_BYTES, TRANSCRIPT_MAX_BYTES, TRANSCRIPT_SPOOL_BYTES, Transcript, render_parts
+)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+STYLE = """
+body{background:#313338;color:#dbdee1;font-family:"gg sans","Helvetica Neue",Helvetica,Arial,sans-serif;margin:0;padding:24px}
+header{border-bottom:1px solid #4e5058;margin-bottom:16px;padding-bottom:12px}
+header h1{color:#f2f3f5;font-size:20px;margin:0 0 8px}
+header p{color:#b5bac1;font-size:13px;margin:2px 0}
+.msg{display:flex;gap:12px;padding:6px 0}
+.msg.deleted{opacity:.5}
+.avatar{border-radius:50%;flex:none;height:40px;width:40px}
+.author{color:#f2f3f5;font-weight:600}
+.time,.flag{color:#949ba4;font-size:12px;margin-left:6px}
+.content{white-space:pre-wrap;word-wrap:break-word}
+.embed{background:#2b2d31;border-left:4px solid #1e1f22;border-radius:4px;margin-top:6px;max-width:520px;padding:8px 12px}
+.embed-title{color:#f2f3f5;font-weight:600}
+.embed-field{margin-top:6px}
+.embed-field b{color:#f2f3f5;display:block;font-size:13px}
+.attachment{display:block;margin-top:6px}
+.attachment img{border-radius:4px;max-height:300px;max-width:400px}
+a{color:#00a8fc}
+"""
+
+def _esc(value) -> str:
+    return html.escape(str(value)) if value else ''
+
+def _render_embed(embed: dict) -> str:
+    color = embed.get('color')
+    style = f' style="border-left-color:#{color:06x}"' if isinstance(color, int) else ''
+    parts = [f'<div class="embed"{style}>']
+    if embed.get('title'):
+        title = _esc(embed['title'])
+        if embed.get('url'):
+            title = f'<a href="{_esc(embed["url"])}">{title}</a>'
+        parts.append(f'<div class="embed-title">{title}</div>')
+    if embed.get('description'):
+        parts.append(f'<div class="content">{_esc(embed["description"])}</div>')
+    for field in embed.get('fields', ()):
+        parts.append(
+            f'<div class="embed-field"><b>{_esc(field.get("name"))}</b>'
+            f'<span class="content">{_esc(field.get("value"))}</span></div>'
+        )
+    image = (embed.get('image') or {}).get('url')
+    if image:
+        parts.append(f'<a class="attachment" href="{_esc(image)}"><img src="{_esc(image)}" alt=""></a>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+def _render_attachment(attachment: dict) -> str:
+    filename = _esc(attachment.get('filename'))
+    url = _esc(attachment.get('url'))
+    # Los enlaces de Discord caducan; el hash identifica la copia archivada
+    stored = f'<span class="flag">sha256:{short_hash(attachment["sha256"])}</span>' if attachment.get('sha256') else ''
+    if not url:
+        return f'<span class="attachment">📎 {filename}{stored}</span>'
+    if filename.lower().endswith(IMAGE_EXTENSIONS):
+        return f'<a class="attachment" href="{url}"><img src="{url}" alt="{filename}"></a>{stored}'
+    return f'<a class="attachment" href="{url}">📎 {filename}</a>{stored}'
+
+def render_record(record: dict) -> bytes:
+    """One message as an HTML block"""
+    classes = 'msg deleted' if record.get('deleted') else 'msg'
+    flags = ''
+    if record.get('edited'):
+        flags += '<span class="flag">(editado)</span>'
+    if record.get('deleted'):
+        flags += '<span class="flag">(eliminado)</span>'
+    avatar = f'<img class="avatar" src="{_esc(record["avatar"])}" alt="">' if record.get('avatar') else '<div class="avatar"></div>'
+    body = [
+        f'<div class="{classes}">{avatar}<div>',
+        f'<span class="author">{_esc(record.get("author"))}</span>',
+        f'<span class="time">{_esc(record.get("time"))}</span>{flags}'
+    ]
+    if record.get('content'):
+        body.append(f'<div class="content">{_esc(record["content"])}</div>')
+    body.extend(_render_embed(embed) for embed in record.get('embeds', ()))
+    body.extend(_render_attachment(attachment) for attachment in record.get('attachments', ()))
+    body.append('</div></div>\n')
+    return ''.join(body).encode('utf-8')
+
+def _render_header(channel: discord.TextChannel, user: discord.abc.User, part: int) -> bytes:
+    title = f"Transcript del Ticket: {channel.name}"
+    if part > 1:
+        title += f" (parte {part})"
+    return (
+        '<!DOCTYPE html>\n<html lang="es"><head><meta charset="utf-8">'
+        f'<title>{_esc(title)}</title><style>{STYLE}</style></head><body>\n'
+        f'<header><h1>{_esc(title)}</h1>'
+        f'<p>Usuario: {_esc(user.display_name)} ({_esc(user.name)}) · ID {user.id}</p>'
+        f'<p>Creado: {channel.created_at.strftime("%Y-%m-%d %H:%M:%S")}</p>'
+        f'<p>Cerrado: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p></header>\n<main>\n'
+    ).encode('utf-8')
+
+FOOTER = b'</main></body></html>\n'
+
+def render_html_transcript(channel: discord.TextChannel, user: discord.abc.User, records: Sequence[dict],
+                           max_bytes: int = TRANSCRIPT_MAX_BYTES, gzip_bytes: int = TRANSCRIPT_GZIP_BYTES,
+                           spool_bytes: int = TRANSCRIPT_SPOOL_BYTES) -> List[Tuple[str, Transcript]]:
+    """Render records into (filename, Transcript) parts, each at most ``max_bytes``"""
+    return render_parts(
+        records, render_record, lambda part: _render_header(channel, user, part), FOOTER,
+        f"transcript-{channel.name}", '.html', max_bytes, gzip_bytes, spool_bytes
+    )
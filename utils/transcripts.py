@@ -0,0 +1,198 @@
+import discord
+import gzip
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Callable, Iterable, List, Sequence, Tuple
+from utils.attachment_store import short_hash
+
+logger = logging.getLogger(__name__)
+
+# Transcripts larger than this are spilled from memory to a temporary file
+TRANSCRIPT_SPOOL_BYTES = int(os.getenv('TRANSCRIPT_SPOOL_BYTES', 1024 * 1024))
+# Largest file produced; also capped by the guild's upload limit
+TRANSCRIPT_MAX_BYTES = int(os.getenv('TRANSCRIPT_MAX_BYTES', 8 * 1024 * 1024))
+# Output bigger than this is gzipped
+TRANSCRIPT_GZIP_BYTES = int(os.getenv('TRANSCRIPT_GZIP_BYTES', 512 * 1024))
+# Conservative compression ratio used to size gzipped parts; checked after writing
+GZIP_RATIO = 4
+
+def message_record(message: discord.Message) -> dict:
+    """Plain-data snapshot of a message, as stored in the ticket journal"""
+    return {
+        'id': message.id,
+        'time': message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        'author_id': message.author.id,
+        'author': f"{message.author.display_name} ({message.author.name}#{message.author.discriminator})",
+        'avatar': message.author.display_avatar.url,
+        'content': message.content,
+        # Same shape as the raw gateway payload, so journaled edits can replace it
+        'embeds': [embed.to_dict() for embed in message.embeds],
+        'attachments': [
+            {'filename': attachment.filename, 'url': attachment.url, 'size': attachment.size}
+            for attachment in message.attachments
+        ]
+    }
+
+def format_record(record: dict) -> str:
+    """Render one message record as a transcript line"""
+    parts = [record.get('content') or "[No content]"]
+    for embed in record.get('embeds', ()):
+        if embed.get('title'):
+            parts.append(f"[Embed: {embed['title']}]")
+        if embed.get('description'):
+            parts.append(embed['description'])
+    for attachment in record.get('attachments', ()):
+        if attachment.get('sha256'):
+            parts.append(f"[Attachment: {attachment['filename']} (sha256:{short_hash(attachment['sha256'])})]")
+        else:
+            parts.append(f"[Attachment: {attachment['filename']}]")
+    if record.get('edited'):
+        parts[0] += " [Editado]"
+    if record.get('deleted'):
+        parts.insert(0, "[Eliminado]")
+    content = "\n".join(parts)
+    return f"[{record['time']}] {record['author']}: {content}\n"
+
+def format_message(message: discord.Message) -> str:
+    """Render one message as a transcript line"""
+    return format_record(message_record(message))
+
+class Transcript:
+    """Rendered transcript kept in a spooled temporary file.
+
+    Stays in memory up to ``spool_bytes`` and moves to disk beyond that, so
+    long tickets never hold the whole history as Python strings. The bytes
+    are written once and every ``to_file()`` call rewinds the same buffer.
+    """
+
+    def __init__(self, spool_bytes: int = TRANSCRIPT_SPOOL_BYTES):
+        self._buffer = tempfile.SpooledTemporaryFile(max_size=spool_bytes, mode='w+b')
+        self.message_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return self._buffer.tell() if not self._buffer.closed else 0
+
+    @property
+    def buffer(self):
+        """Underlying binary file, for writers that wrap it (e.g. gzip)"""
+        return self._buffer
+
+    def write(self, text: str):
+        self._buffer.write(text.encode('utf-8'))
+
+    def write_lines(self, lines: List[str]):
+        self.write("".join(lines))
+
+    def to_file(self, filename: str) -> discord.File:
+        """Upload-ready discord.File over the rendered bytes"""
+        self._buffer.seek(0)
+        return discord.File(self._buffer, filename=filename)
+
+    def close(self):
+        self._buffer.close()
+
+def _pack(sizes: Sequence[int], indexes: Sequence[int], budget: int) -> List[List[int]]:
+    """Group record indexes so each group's rendered size stays under ``budget``"""
+    groups, current, used = [], [], 0
+    for index in indexes:
+        if current and used + sizes[index] > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += sizes[index]
+    if current or not groups:
+        groups.append(current)
+    return groups
+
+def _write_part(records: Sequence[dict], indexes: Iterable[int], header: bytes, footer: bytes,
+                render: Callable[[dict], bytes], compress: bool, spool_bytes: int) -> Transcript:
+    transcript = Transcript(spool_bytes)
+    try:
+        if compress:
+            out = gzip.GzipFile(fileobj=transcript.buffer, mode='wb', compresslevel=6, mtime=0)
+        else:
+            out = transcript.buffer
+        out.write(header)
+        for index in indexes:
+            out.write(render(records[index]))
+            transcript.message_count += 1
+        out.write(footer)
+        if compress:
+            out.close()  # Writes the gzip trailer, leaves the spool open
+    except BaseException:
+        transcript.close()
+        raise
+    return transcript
+
+def render_parts(records: Sequence[dict], render: Callable[[dict], bytes], header: Callable[[int], bytes],
+                 footer: bytes, base: str, extension: str, max_bytes: int = TRANSCRIPT_MAX_BYTES,
+                 gzip_bytes: int = TRANSCRIPT_GZIP_BYTES,
+                 spool_bytes: int = TRANSCRIPT_SPOOL_BYTES) -> List[Tuple[str, Transcript]]:
+    """Render records into (filename, Transcript) parts, each at most ``max_bytes``.
+
+    ``header(n)`` opens part ``n`` and ``footer`` closes every part. Output
+    over ``gzip_bytes`` is gzipped and named ``<base><extension>.gz``.
+    """
+    sizes = [len(render(record)) for record in records]
+    overhead = len(header(1)) + len(footer)
+    compress = overhead + sum(sizes) > gzip_bytes
+    budget = max(max_bytes * (GZIP_RATIO if compress else 1) - overhead, 1)
+
+    pending = _pack(sizes, range(len(records)), budget)
+    parts: List[Transcript] = []
+    try:
+        while pending:
+            indexes = pending.pop(0)
+            part = _write_part(records, indexes, header(len(parts) + 1), footer, render, compress, spool_bytes)
+            if part.size > max_bytes and len(indexes) > 1:
+                # Compressed worse than expected: split this group and retry
+                part.close()
+                half = len(indexes) // 2
+                pending[:0] = [indexes[:half], indexes[half:]]
+                continue
+            parts.append(part)
+    except BaseException:
+        for part in parts:
+            part.close()
+        raise
+
+    if compress:
+        extension += '.gz'
+    logger.debug(
+        f"Transcript {base}{extension}: {len(records)} message(s), {len(parts)} part(s), "
+        f"{sum(part.size for part in parts)} bytes"
+    )
+    if len(parts) == 1:
+        return [(base + extension, parts[0])]
+    return [(f"{base}-parte{i}de{len(parts)}{extension}", part) for i, part in enumerate(parts, 1)]
+
+def _render_header(channel: discord.TextChannel, user: discord.abc.User, part: int) -> bytes:
+    title = f"Transcript del Ticket: {channel.name}"
+    if part > 1:
+        title += f" (parte {part})"
+    return (
+        f"{title}\n"
+        f"Usuario: {user.display_name} ({user.name}#{user.discriminator})\n"
+        f"Creado: {channel.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"Cerrado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        + "=" * 50 + "\n\n"
+    ).encode('utf-8')
+
+def build_transcript(channel: discord.TextChannel, user: discord.abc.User, records: Sequence[dict],
+                     max_bytes: int = TRANSCRIPT_MAX_BYTES, gzip_bytes: int = TRANSCRIPT_GZIP_BYTES,
+                     spool_bytes: int = TRANSCRIPT_SPOOL_BYTES) -> List[Tuple[str, Transcript]]:
+    """Render journaled message records into text transcript parts (no network access)"""
+    return render_parts(
+        records, lambda record: format_record(record).encode('utf-8'),
+        lambda part: _render_header(channel, user, part), b'',
+        f"transcript-{channel.name}", '.txt', max_bytes, gzip_bytes, spool_bytes
+    )